@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+Memória das conversas guardadas por sessão.
+
+Simula `--sessions` sessões da interface, cada uma com `--turns` turnos
+(perguntas curtas, respostas de alguns KB e, a cada `--pdf-every` turnos, a
+explicação de um PDF), e mede com tracemalloc a memória retida por:
+
+- legacy:     list[ChatMessage] com dataclass comum (antes dos __slots__)
+- list:       list[ChatMessage] com a ChatMessage atual
+- compressed: Conversation sem limite de bytes (só compressão das antigas)
+- capped:     Conversation com o limite de bytes por sessão (--max-kb)
+
+Também mede o tempo de gravar todas as sessões limitadas no SQLite e de
+restaurá-las, e o tamanho do arquivo.
+
+Uso:
+    python -m benchmarks.bench_conversation_memory [--sessions 1000] [--turns 20] [--max-kb 256]
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import random
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence
+
+from src.application.conversation import Conversation
+from src.domain.models import ChatMessage
+from src.infrastructure.conversation_store import SqliteConversationStore
+
+_WORDS = (
+    "contrato cláusula prestação serviços vigência rescisão pagamento multa "
+    "fornecedor contratante objeto prazo reajuste índice garantia foro comarca "
+    "obrigações entrega medição aditivo notificação penalidade documento página "
+    "o a de do da que em para com não uma os no se na por mais as dos como"
+).split()
+
+
+@dataclass(frozen=True)
+class _LegacyMessage:
+    # ChatMessage antes dos __slots__ (referência)
+    role: str
+    content: str
+
+
+def _text(rnd: random.Random, size: int) -> str:
+    words = rnd.choices(_WORDS, k=max(1, size // 7))
+    return " ".join(words).capitalize() + "."
+
+
+def _session(rnd: random.Random, turns: int, pdf_every: int) -> List[tuple]:
+    messages = []
+    for turn in range(turns):
+        if pdf_every and turn % pdf_every == pdf_every - 1:
+            messages.append(("user", f"[PDF] contrato_{rnd.randint(1, 999)}.pdf — {_text(rnd, 80)}"))
+            messages.append(("assistant", _text(rnd, rnd.randint(8_000, 16_000))))
+        else:
+            messages.append(("user", _text(rnd, rnd.randint(60, 300))))
+            messages.append(("assistant", _text(rnd, rnd.randint(800, 3_000))))
+    return messages
+
+
+def _build(factory: Callable[[], object], add: Callable[[object, str, str], None],
+           args: argparse.Namespace) -> tuple:
+    """Constrói todas as sessões dentro do tracemalloc; devolve (sessões, bytes retidos, segundos)."""
+    rnd = random.Random(args.seed)
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    sessions = []
+    for _ in range(args.sessions):
+        session = factory()
+        for role, content in _session(rnd, args.turns, args.pdf_every):
+            add(session, role, content)
+        sessions.append(session)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return sessions, retained, elapsed
+
+
+def _iterate_ms(sessions: Sequence, repeat: int = 3) -> float:
+    # Equivale a redesenhar o histórico de todas as sessões uma vez
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for session in sessions:
+            for message in session:
+                _ = message.content
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=1_000)
+    parser.add_argument("--turns", type=int, default=20, help="turnos (pergunta + resposta) por sessão")
+    parser.add_argument("--pdf-every", type=int, default=5, help="a cada N turnos, uma explicação de PDF")
+    parser.add_argument("--max-kb", type=int, default=256, help="limite por sessão no cenário capped")
+    parser.add_argument("--keep-recent", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", type=Path, default=None, help="grava o resultado em JSON")
+    args = parser.parse_args()
+
+    scenarios: Dict[str, tuple] = {
+        "legacy": (list, lambda s, role, content: s.append(_LegacyMessage(role, content))),
+        "list": (list, lambda s, role, content: s.append(ChatMessage(role=role, content=content))),
+        "compressed": (
+            lambda: Conversation(max_bytes=0, keep_recent=args.keep_recent),
+            lambda s, role, content: s.append(ChatMessage(role=role, content=content)),
+        ),
+        "capped": (
+            lambda: Conversation(max_bytes=args.max_kb * 1024, keep_recent=args.keep_recent),
+            lambda s, role, content: s.append(ChatMessage(role=role, content=content)),
+        ),
+    }
+
+    results: Dict[str, Dict[str, float]] = {}
+    capped: List[Conversation] = []
+    for name, (factory, add) in scenarios.items():
+        sessions, retained, elapsed = _build(factory, add, args)
+        results[name] = {
+            "retained_mb": round(retained / 2**20, 2),
+            "per_session_kb": round(retained / 1024 / args.sessions, 1),
+            "build_s": round(elapsed, 3),
+            "iterate_all_ms": round(_iterate_ms(sessions), 1),
+            "messages": sum(len(s) for s in sessions),
+        }
+        if name == "capped":
+            results[name]["evicted"] = sum(s.evicted for s in sessions)
+            capped = sessions
+        del sessions
+        gc.collect()
+
+    # Descarrega as sessões limitadas no SQLite e restaura
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SqliteConversationStore(Path(tmp) / "conversations.sqlite3")
+        start = time.perf_counter()
+        for i, conversation in enumerate(capped):
+            store.save(f"s{i}", conversation.dumps())
+        save_s = time.perf_counter() - start
+        db_bytes = (Path(tmp) / "conversations.sqlite3").stat().st_size
+
+        del capped
+        gc.collect()
+        start = time.perf_counter()
+        restored = [
+            Conversation.loads(store.load(f"s{i}"), max_bytes=args.max_kb * 1024,
+                               keep_recent=args.keep_recent)
+            for i in range(args.sessions)
+        ]
+        restore_s = time.perf_counter() - start
+        results["sqlite"] = {
+            "save_all_s": round(save_s, 3),
+            "restore_all_s": round(restore_s, 3),
+            "db_mb": round(db_bytes / 2**20, 2),
+            "messages": sum(len(c) for c in restored),
+        }
+
+    baseline = results["legacy"]["retained_mb"]
+    for name in ("list", "compressed", "capped"):
+        results[name]["vs_legacy"] = round(results[name]["retained_mb"] / baseline, 3) if baseline else 0.0
+
+    report = {"args": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()}, **results}
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
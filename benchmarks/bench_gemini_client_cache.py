@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Microbenchmark: overhead por chamada do GeminiLLMAdapter com e sem cache de clientes.
+
+A chamada de rede é substituída por um stub (generate_content devolve na hora),
+então o tempo medido é só o custo local: montar o system prompt, construir o
+GenerativeModel e converter as mensagens.
+
+Uso:
+    python -m benchmarks.bench_gemini_client_cache [--calls 2000]
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from unittest import mock
+
+import google.generativeai as genai
+
+from src.domain.agent_identity import AGENT_IDENTITY
+from src.domain.models import ChatMessage
+from src.infrastructure.gemini_llm import GeminiLLMAdapter
+
+
+class _StubResponse:
+    text = "ok"
+
+
+def _measure(adapter: GeminiLLMAdapter, calls: int) -> list[float]:
+    messages = [
+        ChatMessage(role="system", content=AGENT_IDENTITY.strip()),
+        ChatMessage(role="user", content="Qual é a missão do Grupo Fácil?"),
+    ]
+
+    samples: list[float] = []
+    for _ in range(calls):
+        t0 = time.perf_counter_ns()
+        adapter.chat(model="gemini-2.5-flash", messages=messages)
+        samples.append((time.perf_counter_ns() - t0) / 1000)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+
+    with mock.patch.object(genai.GenerativeModel, "generate_content", return_value=_StubResponse()):
+        results = {
+            "sem cache": _measure(GeminiLLMAdapter(api_key="bench", client_cache_size=0), args.calls),
+            "com cache": _measure(GeminiLLMAdapter(api_key="bench"), args.calls),
+        }
+
+    print(f"{'modo':<10} {'média µs':>10} {'p50 µs':>10} {'p95 µs':>10}")
+    for label, samples in results.items():
+        samples.sort()
+        p95 = samples[int(len(samples) * 0.95) - 1]
+        print(
+            f"{label:<10} {statistics.fmean(samples):>10.1f} "
+            f"{statistics.median(samples):>10.1f} {p95:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Tempo de importação das entradas da aplicação (partida a frio).
+
+Roda `python -X importtime -c "import <módulo>"` num processo novo para cada
+entrada, soma o tempo cumulativo e lista os módulos mais caros. Falha (código
+de saída 1) se alguma entrada passar do orçamento ou importar um SDK que só
+deveria ser carregado no primeiro uso (google.generativeai, openai, anthropic,
+pypdf, pytesseract, PIL).
+
+Uso:
+    python -m benchmarks.bench_import_time [--budget-ms 600] [--repeat 3] [--top 8]
+    python -m benchmarks.bench_import_time --module src.bootstrap --module src.batch
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+
+_ENTRY_POINTS = ("src.bootstrap", "src.batch", "src.presentation.api")
+
+# Carregados sob demanda: a montagem das dependências não deve importá-los
+_DEFERRED = ("google.generativeai", "openai", "anthropic", "pypdf", "pytesseract", "PIL")
+
+# "import time: self [us] | cumulative | imported package"
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def _measure(module: str) -> Tuple[float, List[Tuple[str, float]], List[str]]:
+    env = dict(os.environ, PYTHONPATH=str(ROOT) + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Falha ao importar {module}:\n{proc.stderr.strip()[-2000:]}")
+
+    # A saída vem em pós-ordem (filhos antes do pai); lida de trás para frente, a
+    # pilha guarda os ancestrais de cada linha
+    total_us = 0
+    by_package: Dict[str, int] = {}
+    seen: List[str] = []
+    stack: List[Tuple[int, str]] = []
+    for line in reversed(proc.stderr.splitlines()):
+        match = _LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, name = int(match.group(2)), len(match.group(3)), match.group(4)
+        while stack and stack[-1][0] >= indent:
+            stack.pop()
+        ancestors = [parent for _, parent in stack]
+        stack.append((indent, name))
+        if name == module:
+            total_us = cumulative
+        if module not in ancestors:
+            continue
+        seen.append(name)
+        # Culpado = pacote importado diretamente por um módulo do projeto (o
+        # cumulativo já inclui as dependências dele)
+        root = name.split(".")[0]
+        if root != "src" and ancestors[-1].split(".")[0] == "src":
+            by_package[root] = by_package.get(root, 0) + cumulative
+
+    deferred = sorted({
+        prefix for prefix in _DEFERRED
+        for name in seen if name == prefix or name.startswith(prefix + ".")
+    })
+    offenders = sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)
+    return total_us / 1000, [(name, us / 1000) for name, us in offenders], deferred
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", action="append", default=None,
+                        help=f"entrada a medir (padrão: {', '.join(_ENTRY_POINTS)})")
+    parser.add_argument("--budget-ms", type=float, default=600.0,
+                        help="tempo máximo de importação por entrada (melhor de --repeat)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=8, help="módulos mais caros exibidos")
+    parser.add_argument("--output", type=Path, default=None, help="grava o resultado em JSON")
+    args = parser.parse_args()
+
+    results = []
+    failed = False
+    for module in args.module or _ENTRY_POINTS:
+        # Melhor de N: a primeira rodada paga o disco frio e a compilação dos .pyc
+        runs = [_measure(module) for _ in range(max(1, args.repeat))]
+        total_ms, offenders, deferred = min(runs, key=lambda run: run[0])
+        over = total_ms > args.budget_ms
+        failed = failed or over or bool(deferred)
+
+        status = "ESTOUROU" if over else "ok"
+        print(f"{module:<24} {total_ms:8.1f} ms  ({status}, orçamento {args.budget_ms:.0f} ms)")
+        for name, ms in offenders[:args.top]:
+            print(f"    {name:<30} {ms:8.1f} ms")
+        if deferred:
+            print(f"    importados antes do uso: {', '.join(deferred)}")
+        results.append({
+            "module": module,
+            "import_ms": round(total_ms, 1),
+            "budget_ms": args.budget_ms,
+            "top": [{"module": name, "ms": round(ms, 1)} for name, ms in offenders[:args.top]],
+            "deferred_imported": deferred,
+        })
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
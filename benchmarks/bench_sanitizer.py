@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Throughput da sanitização de dados pessoais em textos de vários MB.
+
+Compara as três passadas de re.sub antigas do PolicyService (e-mail, CPF, CNPJ)
+com a varredura única do PiiSanitizer (que cobre também RG, telefone e CEP),
+no texto inteiro e em modo stream. Também mede um caso patológico para a regex
+de e-mail antiga: sequências longas de caracteres válidos sem "@".
+
+Uso:
+    python -m benchmarks.bench_sanitizer [--mb 8] [--repeat 3]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import time
+from typing import Callable
+
+from src.application.sanitizer import PiiSanitizer
+
+# Regexes do PolicyService antes da varredura única (referência)
+_LEGACY = (
+    (re.compile(r"[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+"), "[EMAIL_REDACTED]"),
+    (re.compile(r"\b\d{3}\.\d{3}\.\d{3}-\d{2}\b"), "[CPF_REDACTED]"),
+    (re.compile(r"\b\d{2}\.\d{3}\.\d{3}/\d{4}-\d{2}\b"), "[CNPJ_REDACTED]"),
+)
+
+_WORDS = (
+    "contrato cláusula prestação serviços vigência rescisão pagamento multa "
+    "fornecedor contratante objeto prazo reajuste índice garantia foro comarca"
+).split()
+
+
+def _legacy_sanitize(text: str) -> str:
+    for regex, replacement in _LEGACY:
+        text = regex.sub(replacement, text)
+    return text
+
+
+def _synthetic_document(size_bytes: int, seed: int = 42) -> str:
+    rnd = random.Random(seed)
+    parts: list[str] = []
+    size = 0
+    while size < size_bytes:
+        roll = rnd.random()
+        if roll < 0.01:
+            piece = f"{rnd.choice(_WORDS)}.{rnd.randint(1, 999)}@empresa{rnd.randint(1, 9)}.com.br"
+        elif roll < 0.02:
+            piece = f"{rnd.randint(100, 999)}.{rnd.randint(100, 999)}.{rnd.randint(100, 999)}-{rnd.randint(10, 99)}"
+        elif roll < 0.025:
+            piece = f"{rnd.randint(10, 99)}.{rnd.randint(100, 999)}.{rnd.randint(100, 999)}/0001-{rnd.randint(10, 99)}"
+        elif roll < 0.03:
+            piece = f"({rnd.randint(11, 99)}) 9{rnd.randint(1000, 9999)}-{rnd.randint(1000, 9999)}"
+        elif roll < 0.035:
+            piece = f"{rnd.randint(10000, 99999)}-{rnd.randint(100, 999)}"
+        else:
+            piece = rnd.choice(_WORDS)
+        parts.append(piece)
+        size += len(piece) + 1
+    return " ".join(parts)
+
+
+def _pathological(size_bytes: int) -> str:
+    # Tokens longos de caracteres "de e-mail" sem @: cada posição reabre a tentativa
+    token = "a.b-c_d+" * 256
+    return (token + " ") * (size_bytes // (len(token) + 1))
+
+
+def _chunks(text: str, size: int):
+    for start in range(0, len(text), size):
+        yield text[start:start + size]
+
+
+def _best_of(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mb", type=float, default=8.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    sanitizer = PiiSanitizer()
+    size = int(args.mb * 1024 * 1024)
+
+    for label, text in (
+        ("documento sintético", _synthetic_document(size)),
+        ("caso patológico (sem @)", _pathological(size // 8)),
+    ):
+        mb = len(text.encode("utf-8")) / (1024 * 1024)
+
+        expected = sanitizer.sanitize(text)
+        streamed = "".join(sanitizer.sanitize_stream(_chunks(text, 4096)))
+        assert streamed == expected.text, "modo stream divergiu da varredura completa"
+
+        print(f"\n{label}: {mb:.1f} MB, {expected.total} ocorrências {expected.counts}")
+        for name, fn in (
+            ("legado (3 passadas)", lambda: _legacy_sanitize(text)),
+            ("varredura única", lambda: sanitizer.sanitize(text)),
+            ("stream, pedaços de 64 KB", lambda: "".join(sanitizer.sanitize_stream(_chunks(text, 65536)))),
+            ("stream, pedaços de 4 KB", lambda: "".join(sanitizer.sanitize_stream(_chunks(text, 4096)))),
+        ):
+            elapsed = _best_of(fn, args.repeat)
+            print(f"  {name:<26} {elapsed * 1000:8.1f} ms  {mb / elapsed:8.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+"""
+Suíte de benchmarks sem rede: LLM falso, Vision falso e PDFs sintéticos.
+
+Mede `PdfTextExtractor.extract`, `ChatAgentUC.run` e `ExplainPdfUC.run`
+(throughput, percentis de latência e pico de memória via tracemalloc) e grava
+um relatório JSON para comparar entre commits. Cenários que dependem de
+ferramentas externas ausentes (Poppler, Tesseract) aparecem como "skipped".
+
+Uso:
+    python -m benchmarks.bench_suite [--output bench.json] [--baseline anterior.json]
+                                     [--iterations 20] [--llm-latency-ms 40] [--only extract]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.synthetic_pdfs import synthetic_pdf
+from src.application.document_use_cases import ExplainPdfUC
+from src.application.use_cases import ChatAgentUC
+from src.domain.models import ChatMessage
+from src.infrastructure.extraction_cache import PdfExtractionCache
+from src.infrastructure.fake_llm import FakeLLMAdapter, LatencyProfile
+from src.infrastructure.image_preprocessing import PagePreprocessor
+from src.infrastructure.pdf_extractor import PdfTextExtractor, format_page
+from src.infrastructure.rasterizer import default_rasterizer
+from src.infrastructure.vision_analyzer import ClaudeVisionAnalyzer
+
+REPORT_VERSION = 1
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    iterations: int = 0
+    ops_per_s: float = 0.0
+    pages_per_s: Optional[float] = None
+    mean_ms: float = 0.0
+    p50_ms: float = 0.0
+    p90_ms: float = 0.0
+    p95_ms: float = 0.0
+    p99_ms: float = 0.0
+    max_ms: float = 0.0
+    peak_mem_kib: float = 0.0
+    skipped: Optional[str] = None
+    params: Dict[str, Any] = field(default_factory=dict)
+
+
+# ---------------------------------------------------------------------------
+# Fakes de rede
+# ---------------------------------------------------------------------------
+class _FakeVisionMessages:
+    def __init__(self, latency_ms: float) -> None:
+        self.latency_ms = latency_ms
+
+    def create(self, **_: Any) -> Any:
+        time.sleep(self.latency_ms / 1000)
+        block = type("Block", (), {"text": "Diagrama: caixa A → caixa B → caixa C."})()
+        return type("Message", (), {"content": [block]})()
+
+
+class _FakeVisionClient:
+    def __init__(self, latency_ms: float) -> None:
+        self.messages = _FakeVisionMessages(latency_ms)
+
+
+# ---------------------------------------------------------------------------
+# Medição
+# ---------------------------------------------------------------------------
+def _percentile(ordered: List[float], q: float) -> float:
+    # Nearest-rank: estável para amostras pequenas
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))]
+
+
+def _measure(
+    name: str,
+    fn: Callable[[], Any],
+    *,
+    iterations: int,
+    pages: Optional[int] = None,
+    warmup: int = 1,
+    **params: Any,
+) -> ScenarioResult:
+    for _ in range(warmup):
+        fn()
+
+    samples: List[float] = []
+    t0 = time.perf_counter()
+    for _ in range(iterations):
+        start = time.perf_counter_ns()
+        fn()
+        samples.append((time.perf_counter_ns() - start) / 1e6)
+    wall = time.perf_counter() - t0
+
+    # Pico de memória numa execução à parte: tracemalloc distorce os tempos
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    ordered = sorted(samples)
+    return ScenarioResult(
+        name=name,
+        iterations=iterations,
+        ops_per_s=round(iterations / wall, 3),
+        pages_per_s=round(pages * iterations / wall, 2) if pages else None,
+        mean_ms=round(sum(samples) / len(samples), 3),
+        p50_ms=round(_percentile(ordered, 0.50), 3),
+        p90_ms=round(_percentile(ordered, 0.90), 3),
+        p95_ms=round(_percentile(ordered, 0.95), 3),
+        p99_ms=round(_percentile(ordered, 0.99), 3),
+        max_ms=round(ordered[-1], 3),
+        peak_mem_kib=round(peak / 1024, 1),
+        params=params,
+    )
+
+
+def _safe(name: str, run: Callable[[], ScenarioResult]) -> ScenarioResult:
+    try:
+        return run()
+    except Exception as exc:
+        # Ex.: sem Poppler/Tesseract nesta máquina — o relatório registra em vez de abortar
+        return ScenarioResult(name=name, skipped=f"{type(exc).__name__}: {exc}")
+
+
+# ---------------------------------------------------------------------------
+# Cenários
+# ---------------------------------------------------------------------------
+def _extract_scenarios(args: argparse.Namespace) -> List[ScenarioResult]:
+    try:
+        rasterizer = default_rasterizer()
+    except RuntimeError:
+        rasterizer = None
+
+    def _extractor(**kwargs: Any) -> PdfTextExtractor:
+        return PdfTextExtractor(
+            ocr_workers=args.ocr_workers,
+            vision=ClaudeVisionAnalyzer(
+                client=_FakeVisionClient(args.vision_latency_ms), requests_per_minute=60_000
+            ),
+            preprocessor=PagePreprocessor(),
+            rasterizer=rasterizer,
+            **kwargs,
+        )
+
+    heavy = max(3, args.iterations // 5)
+    results = []
+    for name, kind, pages, iterations in (
+        ("extract.text_10p", "text", 10, args.iterations),
+        ("extract.large_300p", "large", 300, heavy),
+        ("extract.mixed_14p", "mixed", 14, heavy),
+        ("extract.scan_5p", "scan", 5, heavy),
+    ):
+        pdf = synthetic_pdf(kind, pages)
+        extractor = _extractor()
+        results.append(_safe(name, lambda: _measure(
+            name,
+            lambda: extractor.extract(pdf),
+            iterations=iterations,
+            pages=pages,
+            pdf_kib=round(len(pdf) / 1024, 1),
+        )))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf = synthetic_pdf("large", 300)
+        extractor = _extractor(cache=PdfExtractionCache(Path(tmp) / "cache.sqlite3"))
+        results.append(_safe("extract.large_300p_cached", lambda: _measure(
+            "extract.large_300p_cached",
+            lambda: extractor.extract(pdf),
+            iterations=args.iterations,
+            pages=300,
+        )))
+    return results
+
+
+def _fake_llm(args: argparse.Namespace) -> FakeLLMAdapter:
+    return FakeLLMAdapter(
+        latency=LatencyProfile(median_ms=args.llm_latency_ms, sigma=args.llm_sigma),
+        seed=args.seed,
+    )
+
+
+def _chat_scenarios(args: argparse.Namespace) -> List[ScenarioResult]:
+    uc = ChatAgentUC(_fake_llm(args))
+    history = [
+        ChatMessage(role="user" if i % 2 == 0 else "assistant", content=f"Mensagem {i} sobre o contrato.")
+        for i in range(20)
+    ]
+    question = "Qual o prazo de pagamento? Meu e-mail é joao.silva@empresa.com.br e CPF 123.456.789-09."
+    return [_measure(
+        "chat.run",
+        lambda: uc.run(model="fake", history=history, user_text=question),
+        iterations=args.iterations,
+        llm_latency_ms=args.llm_latency_ms,
+    )]
+
+
+def _explain_scenarios(args: argparse.Namespace) -> List[ScenarioResult]:
+    extractor = PdfTextExtractor(vision=ClaudeVisionAnalyzer(client=_FakeVisionClient(0)))
+    short_text = extractor.extract(synthetic_pdf("text", 3)).text
+    long_text = extractor.extract(synthetic_pdf("large", 60)).text
+
+    uc = ExplainPdfUC(_fake_llm(args))
+    goal = "Explique as obrigações de cada parte."
+    return [
+        _measure(
+            "explain_pdf.run_short",
+            lambda: uc.run(model="fake", history=[], pdf_text=short_text, user_goal=goal),
+            iterations=args.iterations,
+            text_chars=len(short_text),
+        ),
+        _measure(
+            "explain_pdf.run_long",
+            lambda: uc.run(model="fake", history=[], pdf_text=long_text, user_goal=goal),
+            iterations=max(3, args.iterations // 5),
+            text_chars=len(long_text),
+            max_fan_out=uc.max_fan_out,
+        ),
+        *_lazy_scenarios(args, extractor, goal),
+    ]
+
+
+def _lazy_scenarios(
+    args: argparse.Namespace,
+    extractor: PdfTextExtractor,
+    goal: str,
+) -> List[ScenarioResult]:
+    # PDF grande com o caso de uso truncando o texto: extrair tudo vs. sob demanda
+    pdf = synthetic_pdf("large", 300)
+    uc = ExplainPdfUC(_fake_llm(args), long_document=False)
+    iterations = max(3, args.iterations // 5)
+    return [
+        _measure(
+            "explain_pdf.extract_then_run_300p",
+            lambda: uc.run(
+                model="fake", history=[], pdf_text=extractor.extract(pdf).text, user_goal=goal
+            ),
+            iterations=iterations,
+        ),
+        _measure(
+            "explain_pdf.lazy_300p",
+            lambda: uc.run(
+                model="fake", history=[], pages=map(format_page, extractor.iter_pages(pdf)), user_goal=goal
+            ),
+            iterations=iterations,
+        ),
+    ]
+
+
+_GROUPS = {
+    "extract": _extract_scenarios,
+    "chat": _chat_scenarios,
+    "explain": _explain_scenarios,
+}
+
+
+# ---------------------------------------------------------------------------
+# Relatório
+# ---------------------------------------------------------------------------
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return out.stdout.strip() or None
+
+
+def _print_results(results: List[ScenarioResult], baseline: Dict[str, Dict[str, Any]]) -> None:
+    print(f"\n{'cenário':<36} {'ops/s':>9} {'p50 ms':>10} {'p95 ms':>10} {'pico KiB':>10}  vs. base (p50)")
+    for r in results:
+        if r.skipped:
+            print(f"{r.name:<36} pulado — {r.skipped}")
+            continue
+        delta = ""
+        base = baseline.get(r.name)
+        if base and not base.get("skipped") and base.get("p50_ms"):
+            change = (r.p50_ms - base["p50_ms"]) / base["p50_ms"]
+            delta = f"{change:+.1%}"
+        print(
+            f"{r.name:<36} {r.ops_per_s:>9.2f} {r.p50_ms:>10.2f} {r.p95_ms:>10.2f} "
+            f"{r.peak_mem_kib:>10.1f}  {delta}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--output", type=Path, default=Path("bench_report.json"))
+    parser.add_argument("--baseline", type=Path, default=None,
+                        help="relatório anterior para comparar (ex.: do commit base)")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--only", choices=sorted(_GROUPS), action="append")
+    parser.add_argument("--llm-latency-ms", type=float, default=40.0)
+    parser.add_argument("--llm-sigma", type=float, default=0.5, help="forma da lognormal (0 = constante)")
+    parser.add_argument("--vision-latency-ms", type=float, default=200.0)
+    parser.add_argument("--ocr-workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results: List[ScenarioResult] = []
+    for group in args.only or list(_GROUPS):
+        print(f"rodando {group}...", file=sys.stderr)
+        results.extend(_GROUPS[group](args))
+
+    report = {
+        "version": REPORT_VERSION,
+        "commit": _git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "args": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+        "scenarios": {r.name: asdict(r) for r in results},
+    }
+    args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+    baseline: Dict[str, Dict[str, Any]] = {}
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8")).get("scenarios", {})
+    _print_results(results, baseline)
+    print(f"\nRelatório gravado em {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
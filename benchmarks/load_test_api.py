@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+Teste de carga da API HTTP, sem rede externa nem chave de API.
+
+Por padrão sobe a API neste processo (uvicorn numa thread, porta livre) com o
+LLM falso — latência lognormal em torno de `--llm-latency-ms` — e dispara
+`--clients` clientes concorrentes até completar `--requests` requisições.
+Mede throughput, percentis de latência (e do primeiro pedaço, com --stream) e
+quantas requisições foram recusadas com 429 pelo limitador de concorrência.
+
+Uso:
+    python -m benchmarks.load_test_api --clients 64 --requests 2000
+    python -m benchmarks.load_test_api --stream --llm-latency-ms 300
+    python -m benchmarks.load_test_api --url http://127.0.0.1:8000   # servidor já no ar
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import socket
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+_QUESTIONS = (
+    "Quais são as obrigações do fornecedor no contrato?",
+    "Explique a cláusula de reajuste em linguagem simples.",
+    "Qual o prazo de vigência e como funciona a rescisão?",
+    "Resuma as penalidades previstas por atraso na entrega.",
+)
+
+
+@dataclass
+class _Sample:
+    status: int
+    latency_ms: float
+    ttft_ms: Optional[float] = None
+    retry_after_s: float = 0.0
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    # Nearest-rank, como na suíte de benchmarks
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_local_server(args: argparse.Namespace) -> Tuple[str, Any]:
+    import uvicorn
+
+    from src.infrastructure.fake_llm import FakeLLMAdapter, LatencyProfile
+    from src.presentation.api import create_app
+
+    llm = FakeLLMAdapter(
+        latency=LatencyProfile(median_ms=args.llm_latency_ms, sigma=args.llm_sigma),
+        chunk_delay_ms=args.chunk_delay_ms,
+        seed=args.seed,
+    )
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(
+        create_app(llm=llm), host="127.0.0.1", port=port, log_level="warning",
+    ))
+    thread = threading.Thread(target=server.run, name="api-server", daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("A API não subiu (veja o log acima).")
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}", server
+
+
+async def _one(client: httpx.AsyncClient, i: int, stream: bool) -> _Sample:
+    body = {"message": _QUESTIONS[i % len(_QUESTIONS)] + f" (#{i})"}
+    start = time.perf_counter()
+    if not stream:
+        resp = await client.post("/v1/chat", json=body)
+        return _Sample(resp.status_code, (time.perf_counter() - start) * 1000,
+                       retry_after_s=float(resp.headers.get("retry-after", 0)))
+
+    ttft = None
+    async with client.stream("POST", "/v1/chat/stream", json=body) as resp:
+        async for line in resp.aiter_lines():
+            if ttft is None and line.startswith("event: delta"):
+                ttft = (time.perf_counter() - start) * 1000
+    return _Sample(resp.status_code, (time.perf_counter() - start) * 1000, ttft,
+                   retry_after_s=float(resp.headers.get("retry-after", 0)))
+
+
+async def _run(url: str, args: argparse.Namespace) -> Tuple[List[_Sample], float, Dict[str, Any]]:
+    counter = iter(range(args.requests))
+    samples: List[_Sample] = []
+    errors: Counter[str] = Counter()
+
+    async def _client_loop(client: httpx.AsyncClient) -> None:
+        for i in counter:
+            try:
+                sample = await _one(client, i, args.stream)
+            except httpx.HTTPError as exc:
+                errors[type(exc).__name__] += 1
+                continue
+            samples.append(sample)
+            # Cliente educado: respeita o Retry-After em vez de martelar a API recusada
+            if sample.status == 429:
+                await asyncio.sleep(sample.retry_after_s)
+
+    # Um cliente (e uma conexão keep-alive) por usuário simulado: um pool único com
+    # centenas de conexões vira gargalo do próprio gerador de carga
+    timeout = httpx.Timeout(args.timeout_s)
+    limits = httpx.Limits(max_connections=1)
+    clients = [httpx.AsyncClient(base_url=url, limits=limits, timeout=timeout) for _ in range(args.clients)]
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(_client_loop(client) for client in clients))
+        elapsed = time.perf_counter() - start
+        health = (await clients[0].get("/health")).json()
+    finally:
+        await asyncio.gather(*(client.aclose() for client in clients))
+    health["client_errors"] = dict(errors)
+    return samples, elapsed, health
+
+
+def _summary(samples: List[_Sample], elapsed: float, health: Dict[str, Any]) -> Dict[str, Any]:
+    by_status = Counter(s.status for s in samples)
+    ok = sorted(s.latency_ms for s in samples if s.status == 200)
+    ttft = sorted(s.ttft_ms for s in samples if s.status == 200 and s.ttft_ms is not None)
+
+    def _stats(values: List[float]) -> Dict[str, float]:
+        if not values:
+            return {}
+        return {
+            "p50_ms": round(_percentile(values, 0.50), 1),
+            "p95_ms": round(_percentile(values, 0.95), 1),
+            "p99_ms": round(_percentile(values, 0.99), 1),
+            "max_ms": round(values[-1], 1),
+        }
+
+    return {
+        "requests": len(samples),
+        "elapsed_s": round(elapsed, 3),
+        "ok_per_s": round(len(ok) / elapsed, 2) if elapsed else 0.0,
+        "status": {str(k): v for k, v in sorted(by_status.items())},
+        "rejected_rate": round(by_status.get(429, 0) / len(samples), 4) if samples else 0.0,
+        "latency": _stats(ok),
+        "ttft": _stats(ttft),
+        "server": health,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default=None, help="API já em execução (padrão: sobe uma local)")
+    parser.add_argument("--clients", type=int, default=32, help="clientes concorrentes")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--stream", action="store_true", help="usa /v1/chat/stream (mede o TTFT)")
+    parser.add_argument("--timeout-s", type=float, default=60.0)
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0)
+    parser.add_argument("--llm-sigma", type=float, default=0.5, help="forma da lognormal (0 = constante)")
+    parser.add_argument("--chunk-delay-ms", type=float, default=20.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=None, help="grava o resumo em JSON")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        url, server = _start_local_server(args)
+        print(f"API local em {url} (LLM falso, mediana {args.llm_latency_ms:.0f} ms)", file=sys.stderr)
+
+    try:
+        samples, elapsed, health = asyncio.run(_run(url, args))
+    finally:
+        if server is not None:
+            server.should_exit = True
+
+    summary = _summary(samples, elapsed, health)
+    summary["args"] = {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()}
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+    if args.output is not None:
+        args.output.write_text(json.dumps(summary, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
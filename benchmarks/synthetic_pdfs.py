@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+Gerador de PDFs sintéticos para benchmarks (sem dependência além do Pillow).
+
+Tipos de página:
+- "text": camada de texto selecionável (caminho barato do extrator);
+- "scan": imagem de um parágrafo impresso, sem camada de texto (vai para OCR);
+- "diagram": caixas e setas com poucas palavras (OCR devolve pouco → Vision);
+- "blank": página em branco digitalizada (descartada antes do OCR).
+
+Uso (grava um corpus numa pasta, ex.: para testar o lote):
+    python -m benchmarks.synthetic_pdfs saida/ [--docs 20] [--pages 10] [--kind mixed]
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import random
+from pathlib import Path
+from typing import List, Sequence
+
+_WORDS = (
+    "contrato cláusula prestação serviços vigência rescisão pagamento multa "
+    "fornecedor contratante objeto prazo reajuste índice garantia foro comarca "
+    "obrigações partes entrega medição aditivo penalidade notificação"
+).split()
+
+_PAGE_W, _PAGE_H = 612, 792  # pontos (carta)
+_SCAN_DPI = 100
+
+KINDS = ("text", "scan", "mixed", "large")
+
+
+def _paragraphs(rnd: random.Random, lines: int, words_per_line: int = 12) -> List[str]:
+    return [
+        " ".join(rnd.choice(_WORDS) for _ in range(words_per_line)).capitalize() + "."
+        for _ in range(lines)
+    ]
+
+
+def _pdf_string(text: str) -> bytes:
+    escaped = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return b"(" + escaped.encode("latin-1", "replace") + b")"
+
+
+def _text_page(lines: Sequence[str]) -> bytes:
+    ops = [b"BT /F1 11 Tf 14 TL 50 750 Td"]
+    ops.extend(_pdf_string(line) + b" '" for line in lines)
+    ops.append(b"ET")
+    return b"\n".join(ops)
+
+
+def _scan_image(rnd: random.Random, kind: str) -> bytes:
+    from PIL import Image, ImageDraw
+
+    w, h = int(_PAGE_W * _SCAN_DPI / 72), int(_PAGE_H * _SCAN_DPI / 72)
+    img = Image.new("L", (w, h), 255)
+    draw = ImageDraw.Draw(img)
+
+    if kind == "scan":
+        y = 60
+        for line in _paragraphs(rnd, 40, 9):
+            draw.text((50, y), line, fill=0)
+            y += 22
+    elif kind == "diagram":
+        boxes = [(80 + 170 * i, 200 + 120 * (i % 2)) for i in range(4)]
+        for i, (x, y) in enumerate(boxes):
+            draw.rectangle((x, y, x + 120, y + 60), outline=0, width=3)
+            draw.text((x + 20, y + 25), rnd.choice(_WORDS), fill=0)
+            if i:
+                px, py = boxes[i - 1]
+                draw.line((px + 120, py + 30, x, y + 30), fill=0, width=3)
+
+    # Ruído leve de digitalização (evita páginas "perfeitas" que comprimem demais)
+    for _ in range(w * h // 400):
+        img.putpixel((rnd.randrange(w), rnd.randrange(h)), rnd.randrange(200, 256))
+
+    out = io.BytesIO()
+    img.save(out, format="JPEG", quality=75)
+    return out.getvalue()
+
+
+def build_pdf(page_kinds: Sequence[str], *, seed: int = 0) -> bytes:
+    """Monta o PDF à mão: catálogo, árvore de páginas, fonte Helvetica e uma página por item."""
+    rnd = random.Random(seed)
+    objects: List[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",  # /Pages, preenchido depois de saber os filhos
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    kids: List[str] = []
+
+    def _add(obj: bytes) -> int:
+        objects.append(obj)
+        return len(objects)
+
+    def _stream(data: bytes, extra: str = "") -> bytes:
+        return f"<< /Length {len(data)}{extra} >>\nstream\n".encode() + data + b"\nendstream"
+
+    for kind in page_kinds:
+        resources = "/Font << /F1 3 0 R >>"
+        if kind == "text":
+            content = _text_page(_paragraphs(rnd, 48))
+        elif kind in ("scan", "diagram", "blank"):
+            jpeg = _scan_image(rnd, kind)
+            w, h = int(_PAGE_W * _SCAN_DPI / 72), int(_PAGE_H * _SCAN_DPI / 72)
+            image_id = _add(_stream(
+                jpeg,
+                f" /Type /XObject /Subtype /Image /Width {w} /Height {h} "
+                "/ColorSpace /DeviceGray /BitsPerComponent 8 /Filter /DCTDecode",
+            ))
+            resources = f"/XObject << /Im1 {image_id} 0 R >>"
+            content = f"q {_PAGE_W} 0 0 {_PAGE_H} 0 0 cm /Im1 Do Q".encode()
+        else:
+            raise ValueError(f"tipo de página desconhecido: {kind}")
+
+        content_id = _add(_stream(content))
+        page_id = _add(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {_PAGE_W} {_PAGE_H}] "
+            f"/Resources << {resources} >> /Contents {content_id} 0 R >>".encode()
+        )
+        kids.append(f"{page_id} 0 R")
+
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode()
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n".encode() + obj + b"\nendobj\n")
+
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    out.writelines(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out.write(
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    )
+    return out.getvalue()
+
+
+def page_kinds(kind: str, pages: int) -> List[str]:
+    if kind in ("text", "large"):
+        return ["text"] * pages
+    if kind == "scan":
+        return ["scan"] * pages
+    if kind == "mixed":
+        # Maioria com texto, algumas digitalizadas, um diagrama e uma em branco
+        cycle = ("text", "text", "scan", "text", "diagram", "text", "blank")
+        return [cycle[i % len(cycle)] for i in range(pages)]
+    raise ValueError(f"tipo de documento desconhecido: {kind} (use {', '.join(KINDS)})")
+
+
+def synthetic_pdf(kind: str, pages: int, *, seed: int = 0) -> bytes:
+    return build_pdf(page_kinds(kind, pages), seed=seed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("output_dir", type=Path)
+    parser.add_argument("--docs", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--kind", choices=KINDS, default="mixed")
+    args = parser.parse_args()
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    for i in range(args.docs):
+        path = args.output_dir / f"{args.kind}_{i:04d}.pdf"
+        path.write_bytes(synthetic_pdf(args.kind, args.pages, seed=i))
+    print(f"{args.docs} PDFs gravados em {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
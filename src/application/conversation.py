@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+Conversa de uma sessão com memória limitada.
+
+Substitui a `list[ChatMessage]` guardada por sessão: cada mensagem vira um
+registro com __slots__ (papel internado, corpo e tamanho); mensagens que saem
+da janela recente e têm corpo grande (ex.: explicação de um PDF) ficam
+comprimidas com zlib; e, quando a sessão passa do limite de bytes, as mais
+antigas são descartadas. Para o resto do código a conversa continua sendo uma
+sequência de ChatMessage (índice, fatia, iteração).
+
+`dumps`/`loads` produzem um formato binário compacto para descarregar a sessão
+num ConversationStorePort (ex.: SQLite) e restaurá-la depois.
+"""
+from __future__ import annotations
+
+import struct
+import sys
+import threading
+import zlib
+from collections.abc import Sequence
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Union, overload
+
+from src.domain.models import ChatMessage
+
+_ROLES = ("system", "user", "assistant")
+_ROLE_CODES = {role: code for code, role in enumerate(_ROLES)}
+
+_MAGIC = b"GFC1"
+_HEADER = struct.Struct("<BBI")  # papel, corpo comprimido?, tamanho do corpo
+_ZLIB_LEVEL = 6
+
+
+class _Record:
+    __slots__ = ("role", "body", "size")
+
+    def __init__(self, role: str, body: Union[str, bytes], size: int) -> None:
+        self.role = role  # internado: milhares de mensagens apontam para 3 strings
+        self.body = body  # str, ou bytes (zlib do UTF-8) quando comprimido
+        self.size = size  # bytes do conteúdo em UTF-8
+
+    @property
+    def compressed(self) -> bool:
+        return isinstance(self.body, bytes)
+
+    @property
+    def stored_bytes(self) -> int:
+        return len(self.body) if isinstance(self.body, bytes) else self.size
+
+    def content(self) -> str:
+        body = self.body
+        return zlib.decompress(body).decode("utf-8") if isinstance(body, bytes) else body
+
+
+class Conversation(Sequence):
+    def __init__(
+        self,
+        messages: Iterable[ChatMessage] = (),
+        *,
+        max_bytes: int = 256 * 1024,
+        keep_recent: int = 8,
+        compress_min_bytes: int = 1_024,
+        on_evict: Optional[Callable[[int], None]] = None,
+    ) -> None:
+        """
+        `max_bytes`: soma dos corpos guardados (já comprimidos); 0 = sem limite.
+        `on_evict`: recebe quantas mensagens antigas saíram (ex.: HistoryManager.discard_oldest).
+        """
+        self.max_bytes = max_bytes
+        self.keep_recent = keep_recent
+        self.compress_min_bytes = compress_min_bytes
+        self.on_evict = on_evict
+
+        self._records: List[_Record] = []
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evicted = 0  # total de mensagens descartadas pelo limite de bytes
+        self.extend(messages)
+
+    # ------------------------------------------------------------------
+    # Sequência de ChatMessage
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self._records)
+
+    @overload
+    def __getitem__(self, index: int) -> ChatMessage: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[ChatMessage]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[ChatMessage, List[ChatMessage]]:
+        # Fatia devolve lista: quem recebe o histórico (casos de uso) não precisa conhecer a classe
+        if isinstance(index, slice):
+            return [_message(record) for record in self._records[index]]
+        return _message(self._records[index])
+
+    def __iter__(self) -> Iterator[ChatMessage]:
+        # Cópia rasa das referências: a iteração não vê appends concorrentes
+        for record in list(self._records):
+            yield _message(record)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def append(self, message: ChatMessage) -> None:
+        content = message.content
+        record = _Record(sys.intern(message.role), content, len(content.encode("utf-8")))
+        with self._lock:
+            self._records.append(record)
+            self._bytes += record.size
+            # Só a mensagem que acabou de sair da janela recente é candidata
+            old = len(self._records) - self.keep_recent - 1
+            if old >= 0:
+                self._compress(self._records[old])
+            dropped = self._evict()
+        if dropped and self.on_evict is not None:
+            self.on_evict(dropped)
+
+    def extend(self, messages: Iterable[ChatMessage]) -> None:
+        for message in messages:
+            self.append(message)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records = []
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        records = list(self._records)
+        return {
+            "messages": len(records),
+            "bytes": self._bytes,
+            "raw_bytes": sum(r.size for r in records),
+            "compressed": sum(1 for r in records if r.compressed),
+            "evicted": self.evicted,
+        }
+
+    # ------------------------------------------------------------------
+    # Descarregar / restaurar
+    # ------------------------------------------------------------------
+    def dumps(self) -> bytes:
+        parts = [_MAGIC]
+        for record in list(self._records):
+            body = record.body
+            compressed = isinstance(body, bytes)
+            data = body if compressed else body.encode("utf-8")
+            parts.append(_HEADER.pack(_ROLE_CODES[record.role], compressed, len(data)))
+            parts.append(data)
+        return b"".join(parts)
+
+    @classmethod
+    def loads(cls, payload: bytes, **limits) -> "Conversation":
+        """`limits`: os mesmos parâmetros do construtor (max_bytes, keep_recent...)."""
+        if payload[:len(_MAGIC)] != _MAGIC:
+            raise ValueError("Formato de conversa desconhecido.")
+        conversation = cls(**limits)
+        view = memoryview(payload)
+        offset = len(_MAGIC)
+        try:
+            while offset < len(payload):
+                role_code, compressed, length = _HEADER.unpack_from(view, offset)
+                offset += _HEADER.size
+                if offset + length > len(payload):
+                    raise ValueError("Conversa truncada.")
+                data = bytes(view[offset:offset + length])
+                offset += length
+                role = _ROLES[role_code]
+                if compressed:
+                    # Entra já comprimido, sem a volta por str
+                    size = len(zlib.decompress(data))
+                    conversation._push(_Record(role, data, size))
+                else:
+                    conversation.append(ChatMessage(role=role, content=data.decode("utf-8")))
+        except (struct.error, zlib.error, UnicodeDecodeError, IndexError) as exc:
+            raise ValueError(f"Conversa corrompida: {exc}") from exc
+        return conversation
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+    def _push(self, record: _Record) -> None:
+        with self._lock:
+            self._records.append(record)
+            self._bytes += record.stored_bytes
+            dropped = self._evict()
+        if dropped and self.on_evict is not None:
+            self.on_evict(dropped)
+
+    def _compress(self, record: _Record) -> None:
+        body = record.body
+        if isinstance(body, bytes) or record.size < self.compress_min_bytes:
+            return
+        packed = zlib.compress(body.encode("utf-8"), _ZLIB_LEVEL)
+        if len(packed) < record.size:
+            record.body = packed
+            self._bytes -= record.size - len(packed)
+
+    def _evict(self) -> int:
+        if not self.max_bytes or self._bytes <= self.max_bytes:
+            return 0
+        # A mensagem mais recente sempre fica, mesmo sozinha acima do limite
+        count = 0
+        excess = self._bytes - self.max_bytes
+        while count < len(self._records) - 1 and excess > 0:
+            excess -= self._records[count].stored_bytes
+            count += 1
+        for record in self._records[:count]:
+            self._bytes -= record.stored_bytes
+        del self._records[:count]
+        self.evicted += count
+        return count
+
+
+def _message(record: _Record) -> ChatMessage:
+    return ChatMessage(role=record.role, content=record.content())
@@ -1,12 +1,21 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import time
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
 
+from src.application.history_manager import HistoryManager
+from src.application.policy_service import PolicyService
+from src.application.streaming import AsyncResponseStream, ResponseStream
+from src.application.text_chunking import TextChunk, pack_chunks, split_pages
 from src.domain.agent_identity import AGENT_IDENTITY
-from src.domain.models import AgentResponse, ChatMessage
-from src.domain.ports import LLMPort
+from src.domain.models import AgentResponse, BatchJob, BatchRequest, BatchResult, ChatMessage
+from src.domain.ports import AsyncLLMPort, BatchLLMPort, LLMPort
+from src.telemetry import Trace, bind, span
 
 _PDF_SYSTEM = (
     AGENT_IDENTITY.strip()
@@ -18,37 +27,599 @@ _PDF_SYSTEM = (
     "- Ao final, sugira 3 perguntas úteis que o usuário pode fazer sobre o documento.\n"
 )
 
+_MAP_SYSTEM = (
+    "Você está lendo um trecho de um documento longo, dividido em partes.\n"
+    "- Extraia apenas o que for relevante para o objetivo do usuário.\n"
+    "- Preserve números, datas, valores, nomes de partes e cláusulas citadas.\n"
+    "- Não faça introduções nem conclusões; responda em tópicos curtos.\n"
+    "- Se o trecho não tiver nada relevante, responda apenas: (sem conteúdo relevante)\n"
+)
+
 _MAX_PDF_CHARS = 18_000
 
+# Modo documento longo: tamanho de cada trecho da fase map e chamadas simultâneas
+_CHUNK_TOKENS = 3_000
+_MAX_FAN_OUT = 4
+
+# Teto do texto lido no modo documento longo (~100 mil tokens, ~35 chamadas na fase map)
+_MAX_DOCUMENT_CHARS = 400_000
+
+
+def _redact(policy: PolicyService, pdf_text: str, user_goal: str) -> tuple[str, str, List[str]]:
+    """Remove dados pessoais do texto do PDF (e do objetivo) antes de qualquer chamada ao LLM."""
+    pdf = policy.redact(pdf_text)
+    goal = policy.redact(user_goal)
+
+    counts = dict(pdf.counts)
+    for name, n in goal.counts.items():
+        counts[name] = counts.get(name, 0) + n
+
+    notes = []
+    if counts:
+        notes.append(
+            "Dados pessoais removidos antes do envio: "
+            + ", ".join(f"{name} ×{n}" for name, n in sorted(counts.items()))
+        )
+    return pdf.text, goal.text, notes
+
+
+def _collect_pages(pages: Iterable[str], budget: int) -> tuple[str, List[str]]:
+    """
+    Consome páginas (já com o marcador "--- Página N ---") só até o orçamento de
+    caracteres; o restante do iterável nunca é pedido — com um extrator
+    preguiçoso, as páginas seguintes não chegam a ser lidas.
+    """
+    parts: List[str] = []
+    size = 0
+    read = 0
+    stopped = False
+    it = iter(pages)
+    with span("pdf.collect", budget=budget) as attrs:
+        try:
+            for page in it:
+                read += 1
+                if not page:
+                    continue
+                parts.append(page)
+                size += len(page) + 1
+                if size >= budget:
+                    stopped = True
+                    break
+        finally:
+            close = getattr(it, "close", None)
+            if close is not None:
+                close()
+        attrs["pages"] = read
+
+    notes = []
+    if stopped:
+        notes.append(
+            f"Leitura do PDF interrompida na página {read}: "
+            f"limite de {budget:,} caracteres atingido.".replace(",", ".")
+        )
+    return "\n".join(parts).strip(), notes
+
+
+def _build_messages(
+    history: List[ChatMessage],
+    pdf_text: str,
+    user_goal: str,
+) -> List[ChatMessage]:
+    system = ChatMessage(role="system", content=_PDF_SYSTEM)
+
+    user = ChatMessage(
+        role="user",
+        content=(
+            f"OBJETIVO DO USUÁRIO:\n{user_goal}\n\n"
+            f"TEXTO EXTRAÍDO DO PDF (pode estar parcial):\n{pdf_text[:_MAX_PDF_CHARS]}"
+        ),
+    )
+
+    return [system, *history, user]
+
+
+def _build_map_messages(chunk: TextChunk, total: int, user_goal: str) -> List[ChatMessage]:
+    return [
+        ChatMessage(role="system", content=_MAP_SYSTEM),
+        ChatMessage(
+            role="user",
+            content=(
+                f"OBJETIVO DO USUÁRIO:\n{user_goal}\n\n"
+                f"TRECHO ({chunk.label}, parte de um total de {total}):\n{chunk.text}"
+            ),
+        ),
+    ]
+
+
+def _build_reduce_messages(
+    history: List[ChatMessage],
+    chunks: List[TextChunk],
+    partials: List[str],
+    user_goal: str,
+) -> List[ChatMessage]:
+    notes = "\n\n".join(
+        f"[{chunk.label.capitalize()}]\n{partial.strip()}"
+        for chunk, partial in zip(chunks, partials)
+    )
+
+    user = ChatMessage(
+        role="user",
+        content=(
+            f"OBJETIVO DO USUÁRIO:\n{user_goal}\n\n"
+            "O documento é longo e foi lido por partes. Abaixo estão as notas de cada "
+            f"parte, em ordem, cobrindo o documento inteiro:\n\n{notes}"
+        ),
+    )
+
+    return [ChatMessage(role="system", content=_PDF_SYSTEM), *history, user]
+
 
 class ExplainPdfUC:
-    def __init__(self, llm: LLMPort) -> None:
+    def __init__(
+        self,
+        llm: LLMPort,
+        history_manager: Optional[HistoryManager] = None,
+        *,
+        long_document: bool = True,
+        chunk_tokens: int = _CHUNK_TOKENS,
+        max_fan_out: int = _MAX_FAN_OUT,
+        max_document_chars: int = _MAX_DOCUMENT_CHARS,
+    ) -> None:
         self.llm = llm
+        self.history_manager = history_manager
+        self.policy = PolicyService()
+        # Documentos acima de _MAX_PDF_CHARS são lidos por inteiro em map-reduce
+        # em vez de truncados; documentos curtos seguem com uma única chamada.
+        self.long_document = long_document
+        self.chunk_tokens = chunk_tokens
+        self.max_fan_out = max(1, max_fan_out)
+        self.max_document_chars = max_document_chars
+
+    @property
+    def text_budget(self) -> int:
+        """Caracteres do PDF que de fato chegam ao LLM — o resto nem precisa ser extraído."""
+        return self.max_document_chars if self.long_document else _MAX_PDF_CHARS
 
     def run(
         self,
         *,
         model: str,
         history: List[ChatMessage],
-        pdf_text: str,
         user_goal: str,
+        pdf_text: str = "",
+        pages: Optional[Iterable[str]] = None,
     ) -> AgentResponse:
-        t0 = time.time()
+        """`pages`: alternativa a `pdf_text` — páginas consumidas sob demanda até `text_budget`."""
+        trace = Trace("explain_pdf")
+        with trace.activate():
+            pdf_text, read_notes = self._read(pdf_text, pages)
+            if self.history_manager is not None:
+                history = self.history_manager.prepare(history, model=model)
 
-        system = ChatMessage(role="system", content=_PDF_SYSTEM)
+            pdf_text, user_goal, notes = _redact(self.policy, pdf_text, user_goal)
+            latencies: List[int] = []
+            messages = self._prepare_messages(model, history, pdf_text, user_goal, latencies)
+            text = self.llm.chat(model=model, messages=messages)
+        trace.finish()
 
-        user = ChatMessage(
-            role="user",
-            content=(
-                f"OBJETIVO DO USUÁRIO:\n{user_goal}\n\n"
-                f"TEXTO EXTRAÍDO DO PDF (pode estar parcial):\n{pdf_text[:_MAX_PDF_CHARS]}"
-            ),
+        return AgentResponse(
+            text=text,
+            used_model=model,
+            latency_ms=trace.elapsed_ms(),
+            safety_notes=read_notes + notes,
+            chunk_latencies_ms=latencies,
+            call_info=self.llm.last_call_info(),
+            breakdown_ms=trace.breakdown_ms(),
+        )
+
+    def stream(
+        self,
+        *,
+        model: str,
+        history: List[ChatMessage],
+        user_goal: str,
+        pdf_text: str = "",
+        pages: Optional[Iterable[str]] = None,
+    ) -> ResponseStream:
+        trace = Trace("explain_pdf")
+        with trace.activate():
+            pdf_text, read_notes = self._read(pdf_text, pages)
+            if self.history_manager is not None:
+                history = self.history_manager.prepare(history, model=model)
+
+            pdf_text, user_goal, notes = _redact(self.policy, pdf_text, user_goal)
+        latencies: List[int] = []
+
+        def _chunks() -> Iterator[str]:
+            # No modo longo a fase map roda antes do primeiro pedaço da resposta final
+            messages = self._prepare_messages(model, history, pdf_text, user_goal, latencies)
+            yield from self.llm.stream_chat(model=model, messages=messages)
+
+        return ResponseStream(
+            _chunks(),
+            model=model,
+            trace=trace,
+            chunk_latencies_ms=latencies,
+            call_info=self.llm.last_call_info,
+            safety_notes=read_notes + notes,
         )
 
-        text = self.llm.chat(model=model, messages=[system, *history, user])
+    def _read(self, pdf_text: str, pages: Optional[Iterable[str]]) -> tuple[str, List[str]]:
+        if pages is None:
+            return pdf_text, []
+        return _collect_pages(pages, self.text_budget)
+
+    def _prepare_messages(
+        self,
+        model: str,
+        history: List[ChatMessage],
+        pdf_text: str,
+        user_goal: str,
+        latencies: List[int],
+    ) -> List[ChatMessage]:
+        if not self.long_document or len(pdf_text) <= _MAX_PDF_CHARS:
+            return _build_messages(history, pdf_text, user_goal)
+
+        chunks = pack_chunks(split_pages(pdf_text), self.chunk_tokens)
+
+        def _map_one(chunk: TextChunk) -> tuple[str, int]:
+            t = time.perf_counter()
+            out = self.llm.chat(model=model, messages=_build_map_messages(chunk, len(chunks), user_goal))
+            return out, int((time.perf_counter() - t) * 1000)
+
+        workers = min(self.max_fan_out, len(chunks))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pdf-map") as pool:
+            # bind: as chamadas da fase map entram no trace da requisição
+            results = list(pool.map(bind(_map_one), chunks))
+
+        latencies.extend(ms for _, ms in results)
+        return _build_reduce_messages(history, chunks, [out for out, _ in results], user_goal)
+
+
+class AsyncExplainPdfUC:
+    def __init__(
+        self,
+        llm: AsyncLLMPort,
+        history_manager: Optional[HistoryManager] = None,
+        *,
+        long_document: bool = True,
+        chunk_tokens: int = _CHUNK_TOKENS,
+        max_fan_out: int = _MAX_FAN_OUT,
+    ) -> None:
+        self.llm = llm
+        self.history_manager = history_manager
+        self.policy = PolicyService()
+        self.long_document = long_document
+        self.chunk_tokens = chunk_tokens
+        self.max_fan_out = max(1, max_fan_out)
+
+    async def run(
+        self,
+        *,
+        model: str,
+        history: List[ChatMessage],
+        pdf_text: str,
+        user_goal: str,
+    ) -> AgentResponse:
+        trace = Trace("explain_pdf")
+        with trace.activate():
+            if self.history_manager is not None:
+                history = await self.history_manager.aprepare(history, model=model)
+
+            pdf_text, user_goal, notes = _redact(self.policy, pdf_text, user_goal)
+            latencies: List[int] = []
+            messages = await self._prepare_messages(model, history, pdf_text, user_goal, latencies)
+            text = await self.llm.chat(model=model, messages=messages)
+        trace.finish()
 
         return AgentResponse(
             text=text,
             used_model=model,
-            latency_ms=int((time.time() - t0) * 1000),
-        )
\ No newline at end of file
+            latency_ms=trace.elapsed_ms(),
+            safety_notes=notes,
+            chunk_latencies_ms=latencies,
+            call_info=self.llm.last_call_info(),
+            breakdown_ms=trace.breakdown_ms(),
+        )
+
+    def stream(
+        self,
+        *,
+        model: str,
+        history: List[ChatMessage],
+        pdf_text: str,
+        user_goal: str,
+    ) -> AsyncResponseStream:
+        trace = Trace("explain_pdf")
+        with trace.activate():
+            pdf_text, user_goal, notes = _redact(self.policy, pdf_text, user_goal)
+        latencies: List[int] = []
+
+        async def _chunks() -> AsyncIterator[str]:
+            # Dentro do gerador: o resumo inline do histórico roda fora do event loop
+            prepared = history
+            if self.history_manager is not None:
+                prepared = await self.history_manager.aprepare(history, model=model)
+
+            messages = await self._prepare_messages(model, prepared, pdf_text, user_goal, latencies)
+            async for chunk in self.llm.stream_chat(model=model, messages=messages):
+                yield chunk
+
+        return AsyncResponseStream(
+            _chunks(),
+            model=model,
+            trace=trace,
+            chunk_latencies_ms=latencies,
+            call_info=self.llm.last_call_info,
+            safety_notes=notes,
+        )
+
+    async def _prepare_messages(
+        self,
+        model: str,
+        history: List[ChatMessage],
+        pdf_text: str,
+        user_goal: str,
+        latencies: List[int],
+    ) -> List[ChatMessage]:
+        if not self.long_document or len(pdf_text) <= _MAX_PDF_CHARS:
+            return _build_messages(history, pdf_text, user_goal)
+
+        chunks = pack_chunks(split_pages(pdf_text), self.chunk_tokens)
+        limiter = asyncio.Semaphore(self.max_fan_out)
+
+        async def _map_one(chunk: TextChunk) -> tuple[str, int]:
+            async with limiter:
+                t = time.perf_counter()
+                out = await self.llm.chat(
+                    model=model, messages=_build_map_messages(chunk, len(chunks), user_goal)
+                )
+                return out, int((time.perf_counter() - t) * 1000)
+
+        results = await asyncio.gather(*(_map_one(c) for c in chunks))
+
+        latencies.extend(ms for _, ms in results)
+        return _build_reduce_messages(history, chunks, [out for out, _ in results], user_goal)
+
+
+# ---------------------------------------------------------------------------
+# Modo lote do provedor
+# ---------------------------------------------------------------------------
+@dataclass
+class PreparedExplain:
+    """Documento pronto para o modo lote: texto lido, sanitizado e, se longo, dividido em trechos."""
+    key: str
+    pdf_text: str
+    user_goal: str
+    safety_notes: List[str] = field(default_factory=list)
+    chunks: List[TextChunk] = field(default_factory=list)  # vazio = uma única chamada
+
+
+@dataclass
+class BatchExplainResult:
+    key: str
+    response: Optional[AgentResponse] = None
+    error: Optional[str] = None
+
+
+class BatchExplainPdfUC:
+    """
+    Explica muitos PDFs com o modo lote do provedor em vez de uma chamada
+    interativa por documento. Mesmos prompts do ExplainPdfUC: documentos curtos
+    viram uma requisição; longos passam por duas rodadas (map, depois reduce).
+    """
+
+    def __init__(
+        self,
+        batch_llm: BatchLLMPort,
+        *,
+        long_document: bool = True,
+        chunk_tokens: int = _CHUNK_TOKENS,
+        max_document_chars: int = _MAX_DOCUMENT_CHARS,
+        poll_interval_s: float = 30.0,
+        max_poll_interval_s: float = 300.0,
+        timeout_s: Optional[float] = None,
+    ) -> None:
+        self.batch_llm = batch_llm
+        self.policy = PolicyService()
+        self.long_document = long_document
+        self.chunk_tokens = chunk_tokens
+        self.max_document_chars = max_document_chars
+        self.poll_interval_s = poll_interval_s
+        self.max_poll_interval_s = max(poll_interval_s, max_poll_interval_s)
+        self.timeout_s = timeout_s
+
+    @property
+    def text_budget(self) -> int:
+        return self.max_document_chars if self.long_document else _MAX_PDF_CHARS
+
+    def prepare(
+        self,
+        key: str,
+        *,
+        user_goal: str,
+        pdf_text: str = "",
+        pages: Optional[Iterable[str]] = None,
+    ) -> PreparedExplain:
+        """Leitura e sanitização (CPU/disco): pode rodar em paralelo, antes do envio."""
+        read_notes: List[str] = []
+        if pages is not None:
+            pdf_text, read_notes = _collect_pages(pages, self.text_budget)
+        pdf_text, user_goal, notes = _redact(self.policy, pdf_text, user_goal)
+
+        chunks: List[TextChunk] = []
+        if self.long_document and len(pdf_text) > _MAX_PDF_CHARS:
+            chunks = pack_chunks(split_pages(pdf_text), self.chunk_tokens)
+        return PreparedExplain(key, pdf_text, user_goal, read_notes + notes, chunks)
+
+    def run(
+        self,
+        items: Sequence[PreparedExplain],
+        *,
+        model: str,
+        jobs: Optional[Dict[str, List[str]]] = None,
+        on_jobs: Optional[Callable[[Dict[str, List[str]]], None]] = None,
+        progress: Optional[Callable[[BatchJob], None]] = None,
+    ) -> List[BatchExplainResult]:
+        """
+        `jobs`: ids já enviados por rodada ("map", "reduce"), ex.: de uma execução
+        interrompida — são acompanhados até o fim em vez de reenviar as mesmas
+        requisições. `on_jobs` recebe o dicionário a cada job criado (para gravar).
+        """
+        keys = [item.key for item in items]
+        if len(set(keys)) != len(keys):
+            raise ValueError("Chaves de documento repetidas no lote.")
+        jobs = {} if jobs is None else jobs
+
+        trace = Trace("batch_explain_pdf")
+        with trace.activate():
+            ids = {item.key: _request_id(item, model) for item in items}
+            first: List[BatchRequest] = []
+            for item in items:
+                rid = ids[item.key]
+                if item.chunks:
+                    first.extend(
+                        BatchRequest(f"{rid}-m{i}", model, _build_map_messages(chunk, len(item.chunks), item.user_goal))
+                        for i, chunk in enumerate(item.chunks)
+                    )
+                else:
+                    first.append(BatchRequest(f"{rid}-f", model, _build_messages([], item.pdf_text, item.user_goal)))
+            done = self._phase("map", first, jobs, on_jobs, progress)
+
+            finals: Dict[str, BatchResult] = {}
+            second: List[BatchRequest] = []
+            for item in items:
+                rid = ids[item.key]
+                if not item.chunks:
+                    finals[item.key] = _result(done, f"{rid}-f")
+                    continue
+                partials = [_result(done, f"{rid}-m{i}") for i in range(len(item.chunks))]
+                failed = next((p for p in partials if p.error is not None), None)
+                if failed is not None:
+                    finals[item.key] = BatchResult(f"{rid}-r", error=f"Fase map: {failed.error}")
+                    continue
+                second.append(BatchRequest(
+                    f"{rid}-r",
+                    model,
+                    _build_reduce_messages([], item.chunks, [p.text or "" for p in partials], item.user_goal),
+                ))
+            if second:
+                done = self._phase("reduce", second, jobs, on_jobs, progress)
+                for item in items:
+                    if item.key not in finals:
+                        finals[item.key] = _result(done, f"{ids[item.key]}-r")
+        trace.finish()
+
+        results = []
+        for item in items:
+            final = finals[item.key]
+            if final.error is not None:
+                results.append(BatchExplainResult(item.key, error=final.error))
+                continue
+            results.append(BatchExplainResult(item.key, response=AgentResponse(
+                text=final.text or "",
+                used_model=model,
+                latency_ms=trace.elapsed_ms(),  # tempo de volta do lote inteiro
+                safety_notes=item.safety_notes,
+                breakdown_ms=trace.breakdown_ms(),
+            )))
+        return results
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+    def _phase(
+        self,
+        name: str,
+        requests: List[BatchRequest],
+        jobs: Dict[str, List[str]],
+        on_jobs: Optional[Callable[[Dict[str, List[str]]], None]],
+        progress: Optional[Callable[[BatchJob], None]],
+    ) -> Dict[str, BatchResult]:
+        wanted = {r.custom_id for r in requests}
+        results: Dict[str, BatchResult] = {}
+        with span(f"batch.{name}", requests=len(requests)) as attrs:
+            attached = list(jobs.get(name, []))
+            if attached:
+                try:
+                    self._wait(attached, progress)
+                    results.update(self._collect(attached, wanted))
+                except TimeoutError:
+                    raise
+                except Exception:
+                    # Job antigo desconhecido ou apagado no provedor: reenvia o que faltar
+                    jobs[name] = []
+
+            missing = [r for r in requests if r.custom_id not in results]
+            submitted: List[str] = []
+            for pack in _pack(missing, self.batch_llm.max_requests, self.batch_llm.max_bytes):
+                job_id = self.batch_llm.submit(pack)
+                submitted.append(job_id)
+                jobs.setdefault(name, []).append(job_id)
+                if on_jobs is not None:
+                    on_jobs(jobs)
+            if submitted:
+                self._wait(submitted, progress)
+                results.update(self._collect(submitted, wanted))
+            attrs["jobs"] = len(jobs.get(name, []))
+        return results
+
+    def _wait(self, job_ids: List[str], progress: Optional[Callable[[BatchJob], None]]) -> None:
+        deadline = None if self.timeout_s is None else time.monotonic() + self.timeout_s
+        interval = self.poll_interval_s
+        pending = list(job_ids)
+        while True:
+            states = [self.batch_llm.poll(job_id) for job_id in pending]
+            if progress is not None:
+                for state in states:
+                    progress(state)
+            pending = [state.job_id for state in states if not state.done]
+            if not pending:
+                return
+            if deadline is not None and time.monotonic() + interval > deadline:
+                raise TimeoutError(
+                    f"Jobs em lote sem resultado após {self.timeout_s:.0f} s: {', '.join(pending)}"
+                )
+            time.sleep(interval)
+            # Jobs levam de minutos a horas: consultas cada vez mais espaçadas
+            interval = min(interval * 2, self.max_poll_interval_s)
+
+    def _collect(self, job_ids: List[str], wanted: set[str]) -> Dict[str, BatchResult]:
+        results: Dict[str, BatchResult] = {}
+        for job_id in job_ids:
+            for result in self.batch_llm.results(job_id):
+                if result.custom_id in wanted:
+                    results[result.custom_id] = result
+        return results
+
+
+def _request_id(item: PreparedExplain, model: str) -> str:
+    # Estável entre execuções: permite reaproveitar jobs já enviados para o mesmo documento
+    digest = hashlib.sha256("\0".join((item.key, model, item.user_goal)).encode("utf-8"))
+    return digest.hexdigest()[:24]
+
+
+def _result(done: Dict[str, BatchResult], custom_id: str) -> BatchResult:
+    return done.get(custom_id) or BatchResult(custom_id, error="Sem resultado no job (vencido ou cancelado).")
+
+
+def _pack(requests: List[BatchRequest], max_requests: int, max_bytes: int) -> Iterator[List[BatchRequest]]:
+    """Divide as requisições em jobs dentro dos limites do provedor (um modelo por job)."""
+    by_model: Dict[str, List[BatchRequest]] = {}
+    for request in requests:
+        by_model.setdefault(request.model, []).append(request)
+
+    for group in by_model.values():
+        pack: List[BatchRequest] = []
+        size = 0
+        for request in group:
+            # Tamanho aproximado da linha JSONL: conteúdo em UTF-8 + envelope
+            request_bytes = 256 + sum(len(m.content.encode("utf-8")) + 32 for m in request.messages)
+            if pack and (len(pack) >= max_requests or size + request_bytes > max_bytes):
+                yield pack
+                pack, size = [], 0
+            pack.append(request)
+            size += request_bytes
+        if pack:
+            yield pack
+
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+Histórico de conversa com orçamento de tokens.
+
+As mensagens mais recentes entram inteiras até o orçamento; as mais antigas
+são condensadas num resumo mantido de forma incremental. O resumo é gerado
+fora do caminho crítico (thread em background): a resposta atual usa o
+último resumo disponível e a próxima já recebe a versão atualizada. Com
+`background=False` (ex.: API sem estado) o resumo é feito na hora e já entra
+na resposta atual.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from src.application.tokens import TokenCounter, estimate_tokens
+from src.domain.models import ChatMessage
+from src.domain.ports import LLMPort
+from src.telemetry import span
+
+_SUMMARY_SYSTEM = (
+    "Você mantém o resumo de uma conversa entre um usuário e o assistente do Grupo Fácil.\n"
+    "- Atualize o resumo existente incorporando as novas mensagens.\n"
+    "- Preserve fatos, decisões, pendências e preferências do usuário.\n"
+    "- Seja conciso: no máximo 12 tópicos curtos.\n"
+    "- Responda apenas com o resumo atualizado."
+)
+
+_SUMMARY_PREFIX = "RESUMO DA CONVERSA ANTERIOR:\n"
+
+
+class HistoryManager:
+    def __init__(
+        self,
+        llm: LLMPort,
+        *,
+        token_budget: int = 6_000,
+        summary_model: Optional[str] = None,
+        token_counter: TokenCounter = estimate_tokens,
+        background: bool = True,
+    ) -> None:
+        self.llm = llm
+        self.token_budget = token_budget
+        self.summary_model = summary_model
+        self.token_counter = token_counter
+
+        self._token_cache: Dict[ChatMessage, int] = {}
+        self._lock = threading.Lock()
+        self._summary = ""
+        self._summarized_upto = 0  # quantas mensagens antigas já estão no resumo
+        self._anchor: Optional[ChatMessage] = None  # última mensagem resumida
+        self._generation = 0  # incrementado a cada reset
+        self._dropped = 0  # mensagens descartadas do início do histórico (discard_oldest)
+        self._pending: Optional[Future] = None
+        self._executor = (
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="history-summary")
+            if background else None
+        )
+
+    @property
+    def summary(self) -> str:
+        with self._lock:
+            return self._summary
+
+    def count_tokens(self, message: ChatMessage) -> int:
+        tokens = self._token_cache.get(message)
+        if tokens is None:
+            tokens = self.token_counter(message.content)
+            self._token_cache[message] = tokens
+        return tokens
+
+    def prepare(self, history: List[ChatMessage], *, model: str) -> List[ChatMessage]:
+        """Histórico a ser enviado ao LLM: [resumo?] + turnos recentes dentro do orçamento."""
+        with span("history.prepare", messages=len(history)):
+            return self._prepare(history, model=model)
+
+    async def aprepare(self, history: List[ChatMessage], *, model: str) -> List[ChatMessage]:
+        """`prepare` para casos de uso assíncronos: o resumo inline chama o LLM e não pode bloquear o event loop."""
+        return await asyncio.to_thread(self.prepare, history, model=model)
+
+    def _prepare(self, history: List[ChatMessage], *, model: str) -> List[ChatMessage]:
+        self._forget_stale(history)
+
+        while True:
+            with self._lock:
+                summary = self._summary
+                summarized_upto = self._summarized_upto
+            recent, older = self._split(history, summary)
+
+            # Mensagens que saíram da janela e ainda não estão no resumo. Em
+            # background elas ficam de fora até o resumo ficar pronto — o trade-off
+            # é manter a latência da resposta atual independente da sumarização.
+            if len(older) <= summarized_upto:
+                break
+            self._schedule_summary(older, model=model)
+            if self._executor is not None:
+                break
+            # Sem background o resumo acabou de ser calculado: usa já nesta resposta.
+            # Ele ocupa orçamento, então a janela é recortada de novo (e o que sair
+            # dela entra no resumo na próxima volta).
+            with self._lock:
+                if self._summarized_upto <= summarized_upto:
+                    break  # resumo descartado (reset concorrente)
+
+        if not summary:
+            return list(recent)
+        return [ChatMessage(role="system", content=_SUMMARY_PREFIX + summary), *recent]
+
+    def _split(
+        self, history: List[ChatMessage], summary: str
+    ) -> Tuple[List[ChatMessage], List[ChatMessage]]:
+        """(turnos recentes que cabem no orçamento, mensagens mais antigas)."""
+        budget = self.token_budget - (self.token_counter(summary) if summary else 0)
+
+        cut = len(history)
+        used = 0
+        while cut > 0:
+            tokens = self.count_tokens(history[cut - 1])
+            if used + tokens > budget:
+                break
+            used += tokens
+            cut -= 1
+
+        return list(history[cut:]), list(history[:cut])
+
+    def wait(self) -> None:
+        """Bloqueia até a sumarização pendente terminar (útil em lote/testes)."""
+        pending = self._pending
+        if pending is not None:
+            pending.result()
+
+    def discard_oldest(self, count: int) -> None:
+        """
+        O histórico perdeu as `count` mensagens mais antigas (limite de memória da
+        sessão). O resumo continua valendo; só a posição do que já foi resumido muda.
+        """
+        with self._lock:
+            self._dropped += count
+            self._summarized_upto = max(0, self._summarized_upto - count)
+            if not self._summarized_upto:
+                self._anchor = None
+
+    def reset(self) -> None:
+        with self._lock:
+            self._summary = ""
+            self._summarized_upto = 0
+            self._anchor = None
+            self._generation += 1
+        self._token_cache.clear()
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+    def _forget_stale(self, history: List[ChatMessage]) -> None:
+        # Histórico foi limpo ou reescrito: o resumo não corresponde mais a ele
+        with self._lock:
+            upto, anchor = self._summarized_upto, self._anchor
+        if upto and (len(history) < upto or history[upto - 1] != anchor):
+            self.reset()
+
+        # Mantém o cache de contagem limitado às mensagens ainda presentes
+        if len(self._token_cache) > 2 * len(history) + 16:
+            alive = set(history)
+            self._token_cache = {m: t for m, t in self._token_cache.items() if m in alive}
+
+    def _schedule_summary(self, older: List[ChatMessage], *, model: str) -> None:
+        if self._pending is not None and not self._pending.done():
+            return  # a próxima chamada agenda o restante
+
+        with self._lock:
+            start = self._summarized_upto
+            current = self._summary
+            generation = self._generation
+            dropped = self._dropped
+        new_messages = list(older[start:])
+        upto = len(older)
+
+        def _run() -> None:
+            updated = self._summarize(current, new_messages, model=model)
+            with self._lock:
+                # Descartado se o histórico foi resetado enquanto resumia
+                if self._generation == generation:
+                    self._summary = updated
+                    # Descontando o que saiu do início do histórico enquanto resumia
+                    self._summarized_upto = max(0, upto - (self._dropped - dropped))
+                    self._anchor = new_messages[-1] if self._summarized_upto else None
+
+        if self._executor is None:
+            _run()
+        else:
+            self._pending = self._executor.submit(_run)
+
+    def _summarize(self, current: str, new_messages: List[ChatMessage], *, model: str) -> str:
+        transcript = "\n".join(
+            f"{'Usuário' if m.role == 'user' else 'Assistente'}: {m.content}"
+            for m in new_messages
+            if m.role != "system"
+        )
+        prompt = (
+            f"RESUMO ATUAL:\n{current or '(vazio)'}\n\n"
+            f"NOVAS MENSAGENS:\n{transcript}"
+        )
+        return self.llm.chat(
+            model=self.summary_model or model,
+            messages=[
+                ChatMessage(role="system", content=_SUMMARY_SYSTEM),
+                ChatMessage(role="user", content=prompt),
+            ],
+        ).strip()
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+Execução de tarefas longas em segundo plano (extração + explicação de PDFs).
+
+Quem submete recebe um id e consulta o estado quando quiser; a tarefa informa
+progresso (etapa, páginas concluídas) e pode publicar texto parcial enquanto a
+resposta do LLM chega. Tarefas com a mesma chave reaproveitam o job existente
+em vez de refazer o trabalho.
+"""
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Any, Callable, List, Optional
+
+
+@dataclass(frozen=True)
+class JobStatus:
+    id: str
+    label: str
+    state: str = "queued"  # "queued", "running", "done" ou "error"
+    stage: str = ""
+    done: int = 0
+    total: int = 0
+    partial_text: str = ""
+    result: Any = None
+    error: Optional[str] = None
+    created_at: float = 0.0
+    finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.state in ("done", "error")
+
+    @property
+    def fraction(self) -> float:
+        return self.done / self.total if self.total else 0.0
+
+
+class JobContext:
+    """Entregue à função do job para reportar progresso sem conhecer o gerenciador."""
+
+    def __init__(self, manager: JobManager, job_id: str) -> None:
+        self._manager = manager
+        self._job_id = job_id
+
+    def progress(self, stage: str, done: int = 0, total: int = 0) -> None:
+        self._manager._update(self._job_id, stage=stage, done=done, total=total)
+
+    def append_text(self, chunk: str) -> None:
+        self._manager._append_text(self._job_id, chunk)
+
+
+JobFn = Callable[[JobContext], Any]
+
+
+class JobManager:
+    def __init__(self, *, max_workers: int = 2, max_finished: int = 100) -> None:
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._jobs: OrderedDict[str, JobStatus] = OrderedDict()
+        self._by_key: dict[str, str] = {}
+        # Texto parcial ainda não incorporado ao snapshot: concatenar a cada pedaço
+        # copiaria o texto inteiro (quadrático); a junção acontece quando alguém lê
+        self._pending_text: dict[str, List[str]] = {}
+        self.max_finished = max_finished
+
+    def submit(self, fn: JobFn, *, label: str = "", key: Optional[str] = None) -> str:
+        with self._lock:
+            if key is not None:
+                existing = self._by_key.get(key)
+                job = self._jobs.get(existing) if existing else None
+                # Mesmo trabalho já em andamento ou concluído: reaproveita (erros são refeitos)
+                if job is not None and job.state != "error":
+                    return job.id
+
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = JobStatus(id=job_id, label=label, created_at=time.time())
+            if key is not None:
+                self._by_key[key] = job_id
+            self._prune()
+
+        self._pool.submit(self._run, job_id, fn)
+        return job_id
+
+    def get(self, job_id: str) -> Optional[JobStatus]:
+        with self._lock:
+            return self._snapshot(job_id)
+
+    def active(self) -> int:
+        with self._lock:
+            return sum(1 for j in self._jobs.values() if not j.finished)
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+    def _run(self, job_id: str, fn: JobFn) -> None:
+        self._update(job_id, state="running")
+        try:
+            result = fn(JobContext(self, job_id))
+        except Exception as exc:
+            self._update(
+                job_id, state="error", error=f"{type(exc).__name__}: {exc}", finished_at=time.time()
+            )
+        else:
+            self._update(job_id, state="done", result=result, finished_at=time.time())
+
+    def _update(self, job_id: str, **changes: Any) -> None:
+        with self._lock:
+            job = self._snapshot(job_id)
+            if job is not None:
+                # Snapshots imutáveis: quem leu um JobStatus nunca o vê mudar pela metade
+                self._jobs[job_id] = replace(job, **changes)
+
+    def _append_text(self, job_id: str, chunk: str) -> None:
+        with self._lock:
+            if job_id in self._jobs:
+                self._pending_text.setdefault(job_id, []).append(chunk)
+
+    def _snapshot(self, job_id: str) -> Optional[JobStatus]:
+        # Chamado com o lock adquirido: incorpora o texto pendente num snapshot novo
+        job = self._jobs.get(job_id)
+        parts = self._pending_text.pop(job_id, None)
+        if job is not None and parts:
+            job = replace(job, partial_text=job.partial_text + "".join(parts))
+            self._jobs[job_id] = job
+        return job
+
+    def _prune(self) -> None:
+        # Chamado com o lock adquirido: descarta os jobs concluídos mais antigos
+        finished = [j.id for j in self._jobs.values() if j.finished]
+        for job_id in finished[: max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+            self._pending_text.pop(job_id, None)
+        live = set(self._jobs)
+        self._by_key = {k: v for k, v in self._by_key.items() if v in live}
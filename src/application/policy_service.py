@@ -5,20 +5,25 @@ Pode evoluir para LGPD, compliance e auditoria.
 """
 from __future__ import annotations
 
-import re
+from src.application.sanitizer import PiiSanitizer, SanitizeResult, default_sanitizer
+from src.telemetry import span
 
 
 class PolicyService:
-    _EMAIL_REGEX = re.compile(r"[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+")
-    _CPF_REGEX = re.compile(r"\b\d{3}\.\d{3}\.\d{3}-\d{2}\b")
-    _CNPJ_REGEX = re.compile(r"\b\d{2}\.\d{3}\.\d{3}/\d{4}-\d{2}\b")
+    def __init__(self, sanitizer: PiiSanitizer | None = None) -> None:
+        # Uma única regex combinada (e-mail, CPF, CNPJ, RG, telefone, CEP), uma varredura
+        self.sanitizer = sanitizer or default_sanitizer()
 
     def sanitize(self, text: str) -> str:
         """Remove dados sensíveis antes de enviar ao LLM."""
-        text = self._EMAIL_REGEX.sub("[EMAIL_REDACTED]", text)
-        text = self._CPF_REGEX.sub("[CPF_REDACTED]", text)
-        text = self._CNPJ_REGEX.sub("[CNPJ_REDACTED]", text)
-        return text
+        return self.redact(text).text
+
+    def redact(self, text: str) -> SanitizeResult:
+        """Como `sanitize`, mas informa quantas ocorrências de cada tipo foram removidas."""
+        with span("policy.sanitize", chars=len(text)) as attrs:
+            result = self.sanitizer.sanitize(text)
+            attrs["redacted"] = result.total
+        return result
 
     def validate(self, text: str) -> str:
         """
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+RAG sobre documentos internos.
+
+DocumentIndexer quebra o texto extraído por página em trechos pequenos e
+indexa os vetores; AskDocumentsUC responde perguntas usando apenas os
+trechos recuperados — o tamanho do prompt não cresce com o acervo.
+"""
+from __future__ import annotations
+
+from typing import List, Optional
+
+from src.application.history_manager import HistoryManager
+from src.application.policy_service import PolicyService
+from src.application.streaming import ResponseStream
+from src.application.text_chunking import pack_chunks, split_pages
+from src.domain.agent_identity import AGENT_IDENTITY
+from src.domain.models import AgentResponse, ChatMessage, DocumentChunk, RetrievedChunk
+from src.domain.ports import EmbedderPort, LLMPort, VectorIndexPort
+from src.telemetry import Trace, span
+
+_RAG_SYSTEM = (
+    AGENT_IDENTITY.strip()
+    + "\n\n"
+    "TAREFA ATUAL:\n"
+    "- Responda usando SOMENTE os trechos de documentos fornecidos.\n"
+    "- Cite o documento e a página de onde veio cada informação.\n"
+    "- Se os trechos não forem suficientes, diga explicitamente que não encontrou a resposta.\n"
+)
+
+_INDEX_CHUNK_TOKENS = 400
+
+
+class DocumentIndexer:
+    def __init__(
+        self,
+        embedder: EmbedderPort,
+        index: VectorIndexPort,
+        *,
+        chunk_tokens: int = _INDEX_CHUNK_TOKENS,
+    ) -> None:
+        self.embedder = embedder
+        self.index = index
+        self.chunk_tokens = chunk_tokens
+        self.policy = PolicyService()
+
+    def index_document(self, *, doc_id: str, title: str, text: str) -> int:
+        """Indexa o documento (uma vez por doc_id). Retorna quantos trechos foram adicionados."""
+        if self.index.has_document(doc_id):
+            return 0
+
+        # Os trechos vão para o embedder e, recuperados, para o LLM: dados pessoais
+        # saem antes de indexar
+        text = self.policy.sanitize(text)
+
+        chunks = [
+            DocumentChunk(
+                doc_id=doc_id,
+                title=title,
+                first_page=c.first_page,
+                last_page=c.last_page,
+                text=c.text,
+            )
+            for c in pack_chunks(split_pages(text), self.chunk_tokens)
+        ]
+        if not chunks:
+            return 0
+
+        self.index.add(chunks, self.embedder.embed([c.text for c in chunks]))
+        return len(chunks)
+
+
+def _format_context(hits: List[RetrievedChunk]) -> str:
+    blocks = []
+    for hit in hits:
+        c = hit.chunk
+        pages = f"p. {c.first_page}" if c.first_page == c.last_page else f"pp. {c.first_page}–{c.last_page}"
+        blocks.append(f"[{c.title} — {pages}]\n{c.text}")
+    return "\n\n".join(blocks)
+
+
+class AskDocumentsUC:
+    def __init__(
+        self,
+        llm: LLMPort,
+        embedder: EmbedderPort,
+        index: VectorIndexPort,
+        history_manager: Optional[HistoryManager] = None,
+        *,
+        top_k: int = 6,
+    ) -> None:
+        self.llm = llm
+        self.embedder = embedder
+        self.index = index
+        self.history_manager = history_manager
+        self.top_k = top_k
+        self.policy = PolicyService()
+
+    def retrieve(self, question: str) -> List[RetrievedChunk]:
+        with span("rag.embed"):
+            vector = self.embedder.embed([question])[0]
+        with span("rag.search", top_k=self.top_k):
+            return self.index.search(vector, self.top_k)
+
+    def run(
+        self,
+        *,
+        model: str,
+        history: List[ChatMessage],
+        question: str,
+    ) -> AgentResponse:
+        trace = Trace("ask_documents")
+        with trace.activate():
+            messages = self._build_messages(model, history, question)
+            text = self.llm.chat(model=model, messages=messages)
+        trace.finish()
+
+        return AgentResponse(
+            text=text,
+            used_model=model,
+            latency_ms=trace.elapsed_ms(),
+            call_info=self.llm.last_call_info(),
+            breakdown_ms=trace.breakdown_ms(),
+        )
+
+    def stream(
+        self,
+        *,
+        model: str,
+        history: List[ChatMessage],
+        question: str,
+    ) -> ResponseStream:
+        trace = Trace("ask_documents")
+        with trace.activate():
+            messages = self._build_messages(model, history, question)
+        return ResponseStream(
+            self.llm.stream_chat(model=model, messages=messages),
+            model=model,
+            trace=trace,
+            call_info=self.llm.last_call_info,
+        )
+
+    def _build_messages(
+        self,
+        model: str,
+        history: List[ChatMessage],
+        question: str,
+    ) -> List[ChatMessage]:
+        if self.history_manager is not None:
+            history = self.history_manager.prepare(history, model=model)
+
+        clean_question = self.policy.validate(self.policy.sanitize(question))
+        hits = self.retrieve(clean_question)
+        # Sanitiza de novo na saída: índices gravados antes da redação na indexação
+        context = self.policy.sanitize(_format_context(hits)) if hits else "(nenhum trecho encontrado)"
+
+        user = ChatMessage(
+            role="user",
+            content=(
+                f"PERGUNTA:\n{clean_question}\n\n"
+                f"TRECHOS DOS DOCUMENTOS:\n{context}"
+            ),
+        )
+
+        return [ChatMessage(role="system", content=_RAG_SYSTEM), *history, user]
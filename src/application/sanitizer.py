@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+Remoção de dados pessoais (LGPD) numa única varredura.
+
+Todos os padrões viram uma só alternação compilada com grupos nomeados: o texto
+é percorrido uma vez, independente de quantos padrões existam. Os quantificadores
+são limitados onde a ocorrência ainda não está garantida (antes do domínio do
+e-mail, por exemplo), o que evita backtracking caro e dá a retenção máxima — é
+ela que permite sanitizar um stream de pedaços sem perder dados que caiam na
+fronteira entre dois pedaços.
+"""
+from __future__ import annotations
+
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import groupby
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+
+@dataclass(frozen=True)
+class PiiPattern:
+    name: str  # vira o nome do grupo na regex e o rótulo da substituição
+    regex: str  # sem âncora à esquerda: a fronteira de token é comum a todos
+    # Maior trecho que ainda pode não casar por falta de texto (retenção no modo
+    # stream). Uma ocorrência já iniciada pode passar disso: fica retida até terminar.
+    max_len: int
+    first: str  # classe dos caracteres que podem iniciar a ocorrência
+
+    @property
+    def replacement(self) -> str:
+        return f"[{self.name}_REDACTED]"
+
+
+_DIGIT_START = r"[\d(+]"
+
+# DDDs em uso no Brasil (Anatel). Sem DDD válido, "item 12 2023-2024" não é telefone.
+_DDD = r"(?:1[1-9]|2[12478]|3[1-578]|4[1-9]|5[1345]|6[1-9]|7[134579]|8[1-9]|9[1-9])"
+_MOBILE = r"9\d{4}[- ]?\d{4}"
+_LANDLINE = r"[2-5]\d{3}-?\d{4}"
+# Com a palavra-chave antes, DDD solto também vale para fixo e número sem separador.
+# O re só aceita lookbehind de largura fixa: um por largura, com as variações
+# ("tel. ", "fone: "...) daquela largura alternadas dentro dele.
+_PHONE_PREFIXES = sorted(
+    {
+        word + sep
+        for word in ("tel", "fone", "telefone", "cel", "celular", "whatsapp")
+        for sep in (" ", ". ", ": ")
+    },
+    key=lambda p: (len(p), p),
+)
+_PHONE_KEYWORD = "(?:" + "|".join(
+    r"(?<=\b(?i:" + "|".join(re.escape(p) for p in group) + "))"
+    for _, group in groupby(_PHONE_PREFIXES, key=len)
+) + ")"
+
+# A ordem importa: na mesma posição vence o primeiro padrão que casar.
+DEFAULT_PATTERNS: Sequence[PiiPattern] = (
+    PiiPattern(
+        "EMAIL",
+        # Rótulos do domínio sem limite de quantidade: "a@b.c.d.e.f.g.com" sai inteiro
+        r"[A-Za-z0-9_.+-]{1,64}@[A-Za-z0-9-]{1,63}(?:\.[A-Za-z0-9-]{1,63})+",
+        64 + 1 + 64 * 2,
+        r"[A-Za-z0-9_.+-]",
+    ),
+    PiiPattern("CNPJ", r"\d{2}\.\d{3}\.\d{3}/\d{4}-\d{2}\b", 18, _DIGIT_START),
+    PiiPattern("CPF", r"\d{3}\.\d{3}\.\d{3}-\d{2}\b", 14, _DIGIT_START),
+    # Fixo só com o DDD entre parênteses, com +55 ou depois de "tel"/"fone"/...;
+    # DDD solto sem palavra-chave exige celular (9 na frente) e separador
+    PiiPattern(
+        "TELEFONE",
+        # O lookahead antes da palavra-chave barra os lookbehinds em números que nem parecem telefone
+        rf"(?:(?:\+55[ -]?(?:\({_DDD}\)|{_DDD})[ -]?|\({_DDD}\) ?"
+        rf"|(?={_DDD}[ -]?[2-59]\d{{3}}){_PHONE_KEYWORD}{_DDD}[ -]?)"
+        rf"(?:{_MOBILE}|{_LANDLINE})|{_DDD}[ -]{_MOBILE})(?!\d)",
+        20,
+        _DIGIT_START,
+    ),
+    PiiPattern("CEP", r"\d{5}-\d{3}\b", 9, _DIGIT_START),
+    # Só com a palavra-chave antes: sem ela, "1.234.567-8" é tão provável um valor quanto um RG
+    PiiPattern(
+        "RG",
+        r"(?i:rg|r\.g\.|identidade)[\s:nº°o.-]{0,6}\d{1,2}\.?\d{3}\.?\d{3}-?[\dXx]\b",
+        10 + 6 + 12,
+        r"[RrIi]",
+    ),
+)
+
+# Ocorrências só começam no início de um token. Além de evitar falsos positivos
+# no meio de palavras/números, é o que deixa a varredura rápida: no meio de uma
+# palavra a alternação inteira falha num único teste, e uma sequência longa sem
+# "@" não é reexaminada a partir de cada caractere.
+_TOKEN_START = r"(?<![A-Za-z0-9_.+-])"
+
+
+def _compile(patterns: Sequence[PiiPattern]) -> re.Pattern:
+    # Padrões vizinhos com o mesmo primeiro caractere ficam atrás de um único lookahead
+    branches = []
+    for first, group in groupby(patterns, key=lambda p: p.first):
+        alternatives = "|".join(f"(?P<{p.name}>{p.regex})" for p in group)
+        branches.append(f"(?={first})(?:{alternatives})")
+    return re.compile(_TOKEN_START + "(?:" + "|".join(branches) + ")")
+
+
+# Caracteres já emitidos que continuam visíveis para lookbehind e \b no modo stream
+# (o maior lookbehind é o da palavra-chave de telefone: "\btelefone: ")
+_CONTEXT_CHARS = 16
+
+
+@dataclass(frozen=True)
+class SanitizeResult:
+    text: str
+    counts: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+
+class PiiSanitizer:
+    def __init__(self, patterns: Sequence[PiiPattern] = DEFAULT_PATTERNS) -> None:
+        self.patterns = tuple(patterns)
+        self._regex = _compile(self.patterns)
+        self._replacements = {p.name: p.replacement for p in self.patterns}
+        self.max_match_len = max(p.max_len for p in self.patterns)
+
+    def sanitize(self, text: str) -> SanitizeResult:
+        counts: Counter[str] = Counter()
+
+        def _replace(m: re.Match) -> str:
+            counts[m.lastgroup] += 1
+            return self._replacements[m.lastgroup]
+
+        return SanitizeResult(text=self._regex.sub(_replace, text), counts=dict(counts))
+
+    def stream(self) -> StreamSanitizer:
+        return StreamSanitizer(self)
+
+    def sanitize_stream(self, chunks: Iterable[str]) -> Iterator[str]:
+        """Sanitiza pedaço a pedaço; o resultado concatenado é igual ao de `sanitize` no texto inteiro."""
+        s = self.stream()
+        for chunk in chunks:
+            out = s.feed(chunk)
+            if out:
+                yield out
+        tail = s.flush()
+        if tail:
+            yield tail
+
+
+class StreamSanitizer:
+    """
+    Retém no buffer só o final do texto que ainda pode fazer parte de uma
+    ocorrência (até `max_match_len` caracteres); o resto é liberado na hora.
+    """
+
+    def __init__(self, sanitizer: PiiSanitizer) -> None:
+        self._regex = sanitizer._regex
+        self._replacements = sanitizer._replacements
+        self._holdback = sanitizer.max_match_len
+        self._buf = ""
+        self._pos = 0  # início do trecho ainda não emitido (antes dele: só contexto)
+        self.counts: Counter[str] = Counter()
+
+    def feed(self, chunk: str) -> str:
+        self._buf += chunk
+        return self._drain(final=False)
+
+    def flush(self) -> str:
+        return self._drain(final=True)
+
+    def _drain(self, *, final: bool) -> str:
+        buf = self._buf
+        # Ocorrências que terminam antes do corte não podem mais crescer com dados futuros
+        cut = len(buf) if final else len(buf) - self._holdback
+        if cut <= self._pos:
+            return ""
+
+        out: List[str] = []
+        emitted = self._pos
+        for m in self._regex.finditer(buf, self._pos):
+            if not final and m.end() > cut:
+                cut = min(cut, m.start())
+                break
+            out.append(buf[emitted:m.start()])
+            out.append(self._replacements[m.lastgroup])
+            self.counts[m.lastgroup] += 1
+            emitted = m.end()
+
+        if emitted < cut:
+            out.append(buf[emitted:cut])
+            emitted = cut
+
+        keep_from = max(0, emitted - _CONTEXT_CHARS)
+        self._buf = buf[keep_from:]
+        self._pos = emitted - keep_from
+        return "".join(out)
+
+
+_default: Optional[PiiSanitizer] = None
+
+
+def default_sanitizer() -> PiiSanitizer:
+    global _default
+    if _default is None:
+        _default = PiiSanitizer()
+    return _default
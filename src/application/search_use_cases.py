@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Busca por termos no acervo de PDFs já extraídos.
+
+LexicalIndexer guarda cada página do texto extraído no índice invertido;
+ExplainPageHitsUC localiza as páginas mais relevantes para uma consulta (ex.:
+um CNPJ ou uma cláusula) e entrega só essas ao ExplainPdfUC, em vez das
+primeiras páginas do documento.
+"""
+from __future__ import annotations
+
+from typing import Iterator, List, Optional
+
+from src.application.document_use_cases import ExplainPdfUC
+from src.application.streaming import ResponseStream
+from src.application.text_chunking import PAGE_MARKER, split_pages
+from src.domain.models import AgentResponse, ChatMessage, PageHit
+from src.domain.ports import LexicalIndexPort
+from src.telemetry import span
+
+_TOP_PAGES = 8
+
+
+class LexicalIndexer:
+    def __init__(self, index: LexicalIndexPort) -> None:
+        self.index = index
+
+    def index_document(self, *, doc_id: str, title: str, text: str) -> int:
+        """Indexa o documento (uma vez por doc_id). Retorna quantas páginas foram adicionadas."""
+        if self.index.has_document(doc_id):
+            return 0
+        pages = [
+            (page.number, PAGE_MARKER.sub("", page.text, count=1).strip())
+            for page in split_pages(text)
+        ]
+        return self.index.add_document(doc_id=doc_id, title=title, pages=pages)
+
+
+class ExplainPageHitsUC:
+    def __init__(
+        self,
+        index: LexicalIndexPort,
+        explain_uc: ExplainPdfUC,
+        *,
+        top_pages: int = _TOP_PAGES,
+    ) -> None:
+        self.index = index
+        self.explain_uc = explain_uc
+        self.top_pages = top_pages
+
+    def search(
+        self,
+        query: str,
+        *,
+        doc_id: Optional[str] = None,
+        k: Optional[int] = None,
+        max_per_document: Optional[int] = None,
+    ) -> List[PageHit]:
+        k = self.top_pages if k is None else k
+        with span("lexical.search", top_k=k) as attrs:
+            hits = self.index.search(query, k, doc_id=doc_id, max_per_document=max_per_document)
+            attrs["hits"] = len(hits)
+        return hits
+
+    def run(
+        self,
+        *,
+        model: str,
+        history: List[ChatMessage],
+        query: str,
+        user_goal: Optional[str] = None,
+        doc_id: Optional[str] = None,
+        hits: Optional[List[PageHit]] = None,
+    ) -> AgentResponse:
+        """`hits`: resultado de uma busca já exibida ao usuário (evita buscar de novo)."""
+        return self.explain_uc.run(
+            model=model,
+            history=history,
+            user_goal=user_goal or _default_goal(query),
+            pages=self._pages(query, doc_id, hits),
+        )
+
+    def stream(
+        self,
+        *,
+        model: str,
+        history: List[ChatMessage],
+        query: str,
+        user_goal: Optional[str] = None,
+        doc_id: Optional[str] = None,
+        hits: Optional[List[PageHit]] = None,
+    ) -> ResponseStream:
+        return self.explain_uc.stream(
+            model=model,
+            history=history,
+            user_goal=user_goal or _default_goal(query),
+            pages=self._pages(query, doc_id, hits),
+        )
+
+    def _pages(
+        self,
+        query: str,
+        doc_id: Optional[str],
+        hits: Optional[List[PageHit]],
+    ) -> Iterator[str]:
+        # Gerador: a busca e a leitura das páginas rodam dentro do trace do ExplainPdfUC
+        if hits is None:
+            hits = self.search(query, doc_id=doc_id)
+        if not hits:
+            return
+
+        # Ordem de leitura: documento a documento (pela melhor página), páginas em sequência
+        doc_order = {h.doc_id: i for i, h in reversed(list(enumerate(hits)))}
+        several_docs = len(doc_order) > 1
+        for hit in sorted(hits, key=lambda h: (doc_order[h.doc_id], h.page)):
+            text = self.index.page_text(hit.doc_id, hit.page)
+            if not text:
+                continue
+            header = f"--- Página {hit.page} ---"
+            if several_docs:
+                header += f"\n[Documento: {hit.title}]"
+            yield f"{header}\n{text}"
+
+
+def _default_goal(query: str) -> str:
+    return f"Explique o que o documento diz sobre: {query}"
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+from typing import AsyncIterator, Callable, Iterator, List, Optional
+
+from src.domain.models import AgentResponse, LLMCallInfo
+from src.telemetry import Trace
+
+
+class ResponseStream:
+    """
+    Iterável de pedaços de texto da resposta do LLM.
+    Depois de consumido por completo, `response` traz o AgentResponse final
+    com a latência total, o tempo até o primeiro pedaço (TTFT) e a quebra por etapa.
+    """
+
+    def __init__(
+        self,
+        chunks: Iterator[str],
+        *,
+        model: str,
+        trace: Trace,
+        chunk_latencies_ms: Optional[List[int]] = None,
+        call_info: Optional[Callable[[], Optional[LLMCallInfo]]] = None,
+        safety_notes: Optional[List[str]] = None,
+    ) -> None:
+        self._chunks = chunks
+        self._model = model
+        # Reativado a cada pedaço: o produtor roda só quando o consumidor pede o próximo
+        self._trace = trace
+        # Preenchida pelo produtor durante a iteração (fase map do modo documento longo)
+        self._chunk_latencies_ms = chunk_latencies_ms
+        # Consultado só no fim: o status do cache depende de o stream ter terminado
+        self._call_info = call_info
+        self._safety_notes = safety_notes
+        self._parts: List[str] = []
+        self._ttft_ms: Optional[int] = None
+        self._response: Optional[AgentResponse] = None
+
+    def __iter__(self) -> Iterator[str]:
+        it = iter(self._chunks)
+        while True:
+            with self._trace.activate():
+                chunk = next(it, None)
+            if chunk is None:
+                break
+            if self._ttft_ms is None:
+                self._ttft_ms = self._trace.elapsed_ms()
+            self._parts.append(chunk)
+            yield chunk
+
+        self._trace.finish()
+        self._response = AgentResponse(
+            text="".join(self._parts),
+            used_model=self._model,
+            latency_ms=self._trace.elapsed_ms(),
+            ttft_ms=self._ttft_ms,
+            safety_notes=list(self._safety_notes or []),
+            chunk_latencies_ms=list(self._chunk_latencies_ms or []),
+            call_info=self._call_info() if self._call_info is not None else None,
+            breakdown_ms=self._trace.breakdown_ms(),
+        )
+
+    @property
+    def response(self) -> AgentResponse:
+        if self._response is None:
+            raise RuntimeError("A resposta só fica disponível depois que o stream é consumido.")
+        return self._response
+
+
+class AsyncResponseStream:
+    """Equivalente assíncrono do ResponseStream (`async for`)."""
+
+    def __init__(
+        self,
+        chunks: AsyncIterator[str],
+        *,
+        model: str,
+        trace: Trace,
+        chunk_latencies_ms: Optional[List[int]] = None,
+        call_info: Optional[Callable[[], Optional[LLMCallInfo]]] = None,
+        safety_notes: Optional[List[str]] = None,
+    ) -> None:
+        self._chunks = chunks
+        self._model = model
+        self._trace = trace
+        self._chunk_latencies_ms = chunk_latencies_ms
+        self._call_info = call_info
+        self._safety_notes = safety_notes
+        self._parts: List[str] = []
+        self._ttft_ms: Optional[int] = None
+        self._response: Optional[AgentResponse] = None
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        it = self._chunks.__aiter__()
+        while True:
+            with self._trace.activate():
+                try:
+                    chunk = await it.__anext__()
+                except StopAsyncIteration:
+                    break
+            if self._ttft_ms is None:
+                self._ttft_ms = self._trace.elapsed_ms()
+            self._parts.append(chunk)
+            yield chunk
+
+        self._trace.finish()
+        self._response = AgentResponse(
+            text="".join(self._parts),
+            used_model=self._model,
+            latency_ms=self._trace.elapsed_ms(),
+            ttft_ms=self._ttft_ms,
+            safety_notes=list(self._safety_notes or []),
+            chunk_latencies_ms=list(self._chunk_latencies_ms or []),
+            call_info=self._call_info() if self._call_info is not None else None,
+            breakdown_ms=self._trace.breakdown_ms(),
+        )
+
+    @property
+    def response(self) -> AgentResponse:
+        if self._response is None:
+            raise RuntimeError("A resposta só fica disponível depois que o stream é consumido.")
+        return self._response
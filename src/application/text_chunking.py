@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Divisão do texto extraído de PDFs em páginas e trechos.
+
+O extrator marca cada página com "--- Página N ---" (ou "(OCR)"/"(Vision)");
+aqui esse texto volta a ser separado por página e reagrupado em trechos que
+cabem num orçamento de tokens.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import List
+
+from src.application.tokens import TokenCounter, estimate_tokens
+
+PAGE_MARKER = re.compile(r"^--- Página (\d+)(?: \((?:OCR|Vision)\))? ---$", re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class PageText:
+    number: int
+    text: str  # inclui o marcador da página
+
+
+@dataclass(frozen=True)
+class TextChunk:
+    first_page: int
+    last_page: int
+    text: str
+
+    @property
+    def label(self) -> str:
+        if self.first_page == self.last_page:
+            return f"página {self.first_page}"
+        return f"páginas {self.first_page}–{self.last_page}"
+
+
+def split_pages(text: str) -> List[PageText]:
+    """Separa o texto pelos marcadores de página; sem marcadores vira uma página só."""
+    matches = list(PAGE_MARKER.finditer(text))
+    if not matches:
+        return [PageText(number=1, text=text.strip())] if text.strip() else []
+
+    pages: List[PageText] = []
+    for i, m in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        pages.append(PageText(number=int(m.group(1)), text=text[m.start():end].strip()))
+    return pages
+
+
+def pack_chunks(
+    pages: List[PageText],
+    max_tokens: int,
+    token_counter: TokenCounter = estimate_tokens,
+) -> List[TextChunk]:
+    """Agrupa páginas consecutivas em trechos de até `max_tokens` (páginas enormes são fatiadas)."""
+    chunks: List[TextChunk] = []
+    buf: List[str] = []
+    buf_tokens = 0
+    first = last = 0
+
+    def _flush() -> None:
+        nonlocal buf, buf_tokens
+        if buf:
+            chunks.append(TextChunk(first_page=first, last_page=last, text="\n\n".join(buf)))
+        buf, buf_tokens = [], 0
+
+    for page in pages:
+        for piece in _split_oversized(page.text, max_tokens, token_counter):
+            tokens = token_counter(piece)
+            if buf and buf_tokens + tokens > max_tokens:
+                _flush()
+            if not buf:
+                first = page.number
+            buf.append(piece)
+            buf_tokens += tokens
+            last = page.number
+
+    _flush()
+    return chunks
+
+
+def _split_oversized(text: str, max_tokens: int, token_counter: TokenCounter) -> List[str]:
+    if token_counter(text) <= max_tokens:
+        return [text]
+
+    # Quebra por parágrafos; um parágrafo sozinho grande demais é cortado por tamanho
+    pieces: List[str] = []
+    current = ""
+    for para in text.split("\n\n"):
+        candidate = f"{current}\n\n{para}" if current else para
+        if token_counter(candidate) <= max_tokens:
+            current = candidate
+            continue
+        if current:
+            pieces.append(current)
+        while token_counter(para) > max_tokens:
+            cut = max(1, len(para) * max_tokens // token_counter(para))
+            pieces.append(para[:cut])
+            para = para[cut:]
+        current = para
+    if current:
+        pieces.append(current)
+    return pieces
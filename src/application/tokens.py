@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+"""
+Estimativa de tokens sem depender do tokenizer de cada provedor.
+
+~4 caracteres por token é a média usada por Gemini/OpenAI para texto em
+português/inglês; suficiente para orçamento de prompt.
+"""
+from __future__ import annotations
+
+from typing import Callable
+
+TokenCounter = Callable[[str], int]
+
+_CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + _CHARS_PER_TOKEN - 1) // _CHARS_PER_TOKEN
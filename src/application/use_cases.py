@@ -1,18 +1,34 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
-import time
-from typing import List
+from typing import AsyncIterator, List, Optional
 
+from src.application.history_manager import HistoryManager
 from src.application.policy_service import PolicyService
+from src.application.streaming import AsyncResponseStream, ResponseStream
 from src.domain.agent_identity import AGENT_IDENTITY
 from src.domain.models import AgentResponse, ChatMessage
-from src.domain.ports import LLMPort
+from src.domain.ports import AsyncLLMPort, LLMPort
+from src.telemetry import Trace
+
+
+def _build_messages(
+    policy: PolicyService,
+    history: List[ChatMessage],
+    user_text: str,
+) -> List[ChatMessage]:
+    system = ChatMessage(role="system", content=AGENT_IDENTITY.strip())
+
+    clean_text = policy.sanitize(user_text)
+    validated_text = policy.validate(clean_text)
+
+    return [system, *history, ChatMessage(role="user", content=validated_text)]
 
 
 class ChatAgentUC:
-    def __init__(self, llm: LLMPort) -> None:
+    def __init__(self, llm: LLMPort, history_manager: Optional[HistoryManager] = None) -> None:
         self.llm = llm
+        self.history_manager = history_manager
         self.policy = PolicyService()
 
     def run(
@@ -22,18 +38,96 @@ class ChatAgentUC:
         history: List[ChatMessage],
         user_text: str,
     ) -> AgentResponse:
-        t0 = time.time()
+        trace = Trace("chat")
+        with trace.activate():
+            if self.history_manager is not None:
+                history = self.history_manager.prepare(history, model=model)
+
+            messages = _build_messages(self.policy, history, user_text)
+            text = self.llm.chat(model=model, messages=messages)
+        trace.finish()
+
+        return AgentResponse(
+            text=text,
+            used_model=model,
+            latency_ms=trace.elapsed_ms(),
+            call_info=self.llm.last_call_info(),
+            breakdown_ms=trace.breakdown_ms(),
+        )
+
+    def stream(
+        self,
+        *,
+        model: str,
+        history: List[ChatMessage],
+        user_text: str,
+    ) -> ResponseStream:
+        trace = Trace("chat")
+        with trace.activate():
+            if self.history_manager is not None:
+                history = self.history_manager.prepare(history, model=model)
+
+            messages = _build_messages(self.policy, history, user_text)
+        return ResponseStream(
+            self.llm.stream_chat(model=model, messages=messages),
+            model=model,
+            trace=trace,
+            call_info=self.llm.last_call_info,
+        )
+
 
-        system = ChatMessage(role="system", content=AGENT_IDENTITY.strip())
+class AsyncChatAgentUC:
+    def __init__(self, llm: AsyncLLMPort, history_manager: Optional[HistoryManager] = None) -> None:
+        self.llm = llm
+        self.history_manager = history_manager
+        self.policy = PolicyService()
 
-        clean_text = self.policy.sanitize(user_text)
-        validated_text = self.policy.validate(clean_text)
+    async def run(
+        self,
+        *,
+        model: str,
+        history: List[ChatMessage],
+        user_text: str,
+    ) -> AgentResponse:
+        trace = Trace("chat")
+        with trace.activate():
+            if self.history_manager is not None:
+                history = await self.history_manager.aprepare(history, model=model)
 
-        messages = [system, *history, ChatMessage(role="user", content=validated_text)]
-        text = self.llm.chat(model=model, messages=messages)
+            messages = _build_messages(self.policy, history, user_text)
+            text = await self.llm.chat(model=model, messages=messages)
+        trace.finish()
 
         return AgentResponse(
             text=text,
             used_model=model,
-            latency_ms=int((time.time() - t0) * 1000),
-        )
\ No newline at end of file
+            latency_ms=trace.elapsed_ms(),
+            call_info=self.llm.last_call_info(),
+            breakdown_ms=trace.breakdown_ms(),
+        )
+
+    def stream(
+        self,
+        *,
+        model: str,
+        history: List[ChatMessage],
+        user_text: str,
+    ) -> AsyncResponseStream:
+        trace = Trace("chat")
+
+        async def _chunks() -> AsyncIterator[str]:
+            # Dentro do gerador: o histórico é preparado quando o stream é consumido, já no event loop
+            prepared = history
+            if self.history_manager is not None:
+                prepared = await self.history_manager.aprepare(history, model=model)
+
+            messages = _build_messages(self.policy, prepared, user_text)
+            async for chunk in self.llm.stream_chat(model=model, messages=messages):
+                yield chunk
+
+        return AsyncResponseStream(
+            _chunks(),
+            model=model,
+            trace=trace,
+            call_info=self.llm.last_call_info,
+        )
@@ -0,0 +1,604 @@
+# -*- coding: utf-8 -*-
+"""
+Processamento em lote de PDFs (fora da interface).
+
+Percorre uma pasta, extrai o texto e gera a explicação de cada PDF com um pool
+de workers, gravando um registro JSONL por documento. O próprio arquivo de
+saída é o checkpoint: ao rodar de novo, documentos já processados com sucesso
+(mesmo caminho e mesmo conteúdo) são pulados; os que falharam são refeitos.
+
+Uso:
+    python -m src.batch PASTA [--output resultados.jsonl] [--workers 4]
+                              [--max-pages 50] [--goal "..."] [--model ...]
+                              [--index] [--provider-batch [openai|gemini|fake]]
+
+Com --index, cada documento é lido até o fim (depois da explicação) e suas
+páginas entram no índice de busca por termos (LEXICAL_INDEX_PATH).
+
+Com --provider-batch, os PDFs são extraídos em paralelo e as explicações vão
+para o modo lote do provedor (jobs assíncronos, mais baratos, resultado em até
+24 h) em vez de uma chamada interativa por documento. Os ids dos jobs ficam em
+`<saída>.jobs.json`: interrompida a espera, a próxima execução volta a
+acompanhar os mesmos jobs em vez de reenviar.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sys
+import itertools
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, TextIO
+
+from src.application.document_use_cases import BatchExplainPdfUC, ExplainPdfUC, PreparedExplain
+from src.bootstrap import (
+    build_batch_explain_uc,
+    build_batch_llm,
+    build_explain_pdf_uc,
+    build_extraction_cache,
+    build_lexical_index,
+    build_llm,
+    build_pdf_extractor,
+    build_rasterizer,
+    build_vision_analyzer,
+    configure_telemetry,
+)
+from src.config import get_settings
+from src.domain.models import BatchJob
+from src.domain.ports import LexicalIndexPort
+from src.infrastructure.pdf_extractor import PdfTextExtractor, format_page, overall_method
+from src.telemetry import Trace, span
+
+DEFAULT_GOAL = "Explique o conteúdo em linguagem simples e destaque os pontos importantes."
+
+
+@dataclass
+class BatchRecord:
+    path: str  # relativo à pasta de entrada
+    sha256: str
+    status: str  # "ok" ou "error"
+    pages: int = 0  # páginas no arquivo
+    pages_processed: int = 0
+    method: Optional[str] = None
+    page_methods: dict = field(default_factory=dict)
+    explanation: Optional[str] = None
+    model: Optional[str] = None
+    extract_ms: int = 0
+    llm_ms: int = 0
+    safety_notes: List[str] = field(default_factory=list)
+    breakdown_ms: dict = field(default_factory=dict)  # tempo por etapa (extração + LLM)
+    error: Optional[str] = None
+    processed_at: str = ""
+
+
+@dataclass
+class BatchReport:
+    documents: int = 0
+    failed: int = 0
+    skipped: int = 0
+    pages: int = 0
+    elapsed_s: float = 0.0
+
+    @property
+    def pages_per_s(self) -> float:
+        return self.pages / self.elapsed_s if self.elapsed_s else 0.0
+
+    @property
+    def docs_per_min(self) -> float:
+        return self.documents * 60 / self.elapsed_s if self.elapsed_s else 0.0
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as fh:
+        for block in iter(lambda: fh.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def iter_pdfs(root: Path, pattern: str = "*.pdf") -> Iterator[Path]:
+    for path in sorted(root.rglob(pattern)):
+        if path.is_file():
+            yield path
+
+
+def load_checkpoint(output: Path) -> set[tuple[str, str]]:
+    """
+    (caminho, sha256) dos documentos já concluídos com sucesso.
+    Uma última linha incompleta (execução interrompida no meio da escrita) é descartada.
+    """
+    done: set[tuple[str, str]] = set()
+    if not output.exists():
+        return done
+
+    valid_bytes = 0
+    with output.open("rb") as fh:
+        for raw in fh:
+            try:
+                record = json.loads(raw)
+            except ValueError:
+                break
+            valid_bytes += len(raw)
+            if record.get("status") == "ok":
+                done.add((record["path"], record["sha256"]))
+
+    if valid_bytes < output.stat().st_size:
+        with output.open("r+b") as fh:
+            fh.truncate(valid_bytes)
+    return done
+
+
+class _PageReader:
+    """Páginas formatadas sob demanda, com o tempo de extração e o texto guardado para o índice."""
+
+    def __init__(
+        self,
+        extractor: PdfTextExtractor,
+        record: BatchRecord,
+        *,
+        max_pages: Optional[int],
+        index_pages: Optional[List[tuple[int, str]]],
+    ) -> None:
+        self.extractor = extractor
+        self.record = record
+        self.max_pages = max_pages
+        self.index_pages = index_pages
+        self.extract_ns = 0
+
+    def pages(self, file_bytes: bytes) -> Iterator[str]:
+        # Sob demanda: o caso de uso para de pedir páginas ao atingir o limite de texto
+        extracted = self.extractor.iter_pages(file_bytes, max_pages=self.max_pages)
+        while True:
+            t = time.perf_counter_ns()
+            page = next(extracted, None)
+            self.extract_ns += time.perf_counter_ns() - t
+            if page is None:
+                return
+            self.record.page_methods[str(page.number)] = page.method
+            if self.index_pages is not None and page.method != "empty":
+                self.index_pages.append((page.number, page.text.strip()))
+            yield format_page(page)
+
+    def finish(self) -> None:
+        record = self.record
+        record.extract_ms = self.extract_ns // 1_000_000
+        record.pages_processed = len(record.page_methods)
+        record.method = overall_method(record.page_methods.values()) if record.page_methods else None
+        record.processed_at = _now()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def _index_rest(
+    pages: Iterator[str],
+    index: Optional[LexicalIndexPort],
+    reader: _PageReader,
+    *,
+    doc_id: str,
+) -> None:
+    # O índice precisa do documento inteiro, não só do que coube no orçamento do LLM
+    if index is None or reader.index_pages is None:
+        return
+    for _ in pages:
+        pass
+    with span("lexical.index", pages=len(reader.index_pages)):
+        index.add_document(doc_id=doc_id, title=reader.record.path, pages=reader.index_pages)
+
+
+def process_document(
+    path: Path,
+    *,
+    root: Path,
+    sha256: str,
+    extractor: PdfTextExtractor,
+    explain_uc: ExplainPdfUC,
+    model: str,
+    goal: str,
+    max_pages: Optional[int],
+    index: Optional[LexicalIndexPort] = None,
+) -> BatchRecord:
+    record = BatchRecord(path=path.relative_to(root).as_posix(), sha256=sha256, status="error")
+
+    trace = Trace("batch_document")
+    reader = _PageReader(
+        extractor,
+        record,
+        max_pages=max_pages,
+        index_pages=[] if index is not None and not index.has_document(sha256) else None,
+    )
+
+    pages: Optional[Iterator[str]] = None
+    try:
+        file_bytes = path.read_bytes()
+        with trace.activate():
+            record.pages = extractor.page_count(file_bytes)
+            pages = reader.pages(file_bytes)
+            # Só chama o LLM se houver texto em alguma página
+            first = next((p for p in pages if p), None)
+        if first is None:
+            raise RuntimeError("Não foi possível extrair texto desse PDF.")
+
+        resp = explain_uc.run(
+            model=model, history=[], pages=itertools.chain([first], pages), user_goal=goal
+        )
+        record.explanation = resp.text
+        record.model = resp.used_model
+        record.safety_notes = resp.safety_notes
+        record.llm_ms = max(0, resp.latency_ms - reader.extract_ns // 1_000_000)
+
+        with trace.activate():
+            _index_rest(pages, index, reader, doc_id=sha256)
+        record.breakdown_ms = {**trace.breakdown_ms(), **resp.breakdown_ms}
+        record.status = "ok"
+    except Exception as exc:  # um PDF com problema não derruba o lote
+        record.error = f"{type(exc).__name__}: {exc}"
+        record.breakdown_ms = trace.breakdown_ms()
+    finally:
+        if pages is not None:
+            pages.close()
+    trace.finish()
+
+    reader.finish()
+    return record
+
+
+def prepare_document(
+    path: Path,
+    *,
+    root: Path,
+    sha256: str,
+    extractor: PdfTextExtractor,
+    batch_uc: BatchExplainPdfUC,
+    goal: str,
+    max_pages: Optional[int],
+    index: Optional[LexicalIndexPort] = None,
+) -> tuple[BatchRecord, Optional[PreparedExplain]]:
+    """Fase local do modo lote: extrai, sanitiza e indexa; a explicação vem depois, do provedor."""
+    record = BatchRecord(path=path.relative_to(root).as_posix(), sha256=sha256, status="error")
+
+    trace = Trace("batch_document")
+    reader = _PageReader(
+        extractor,
+        record,
+        max_pages=max_pages,
+        index_pages=[] if index is not None and not index.has_document(sha256) else None,
+    )
+
+    prepared: Optional[PreparedExplain] = None
+    pages: Optional[Iterator[str]] = None
+    try:
+        file_bytes = path.read_bytes()
+        with trace.activate():
+            record.pages = extractor.page_count(file_bytes)
+            pages = reader.pages(file_bytes)
+            first = next((p for p in pages if p), None)
+            if first is None:
+                raise RuntimeError("Não foi possível extrair texto desse PDF.")
+            item = batch_uc.prepare(
+                f"{record.path}@{sha256}", user_goal=goal, pages=itertools.chain([first], pages)
+            )
+            _index_rest(pages, index, reader, doc_id=sha256)
+        prepared = item
+    except Exception as exc:  # um PDF com problema não derruba o lote
+        record.error = f"{type(exc).__name__}: {exc}"
+    finally:
+        if pages is not None:
+            pages.close()
+    trace.finish()
+
+    record.breakdown_ms = trace.breakdown_ms()
+    reader.finish()
+    return record, prepared
+
+
+def _pending_documents(root: Path, output: Path, pattern: str, report: BatchReport) -> List[tuple[Path, str]]:
+    done = load_checkpoint(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    todo = []
+    for path in iter_pdfs(root, pattern):
+        sha256 = _sha256(path)
+        if (path.relative_to(root).as_posix(), sha256) in done:
+            report.skipped += 1
+            continue
+        todo.append((path, sha256))
+
+    print(
+        f"{len(todo)} PDFs para processar ({report.skipped} já concluídos em execuções anteriores).",
+        file=sys.stderr,
+    )
+    return todo
+
+
+def _write_record(out: TextIO, record: BatchRecord, report: BatchReport) -> None:
+    # Uma linha completa (com flush) por documento: o arquivo de saída é o checkpoint
+    out.write(json.dumps(asdict(record), ensure_ascii=False) + "\n")
+    out.flush()
+
+    report.documents += 1
+    report.pages += record.pages_processed
+    if record.status != "ok":
+        report.failed += 1
+
+
+def run_batch(
+    root: Path,
+    output: Path,
+    *,
+    extractor: PdfTextExtractor,
+    explain_uc: ExplainPdfUC,
+    model: str,
+    goal: str = DEFAULT_GOAL,
+    max_pages: Optional[int] = None,
+    workers: int = 4,
+    pattern: str = "*.pdf",
+    index: Optional[LexicalIndexPort] = None,
+) -> BatchReport:
+    report = BatchReport()
+    todo = _pending_documents(root, output, pattern, report)
+    total = len(todo)
+
+    t0 = time.perf_counter()
+    pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="batch")
+    try:
+        # Cada worker lê o próprio arquivo: a fila não segura todos os PDFs em memória
+        futures: dict[Future, Path] = {
+            pool.submit(
+                process_document,
+                path,
+                root=root,
+                sha256=sha256,
+                extractor=extractor,
+                explain_uc=explain_uc,
+                model=model,
+                goal=goal,
+                max_pages=max_pages,
+                index=index,
+            ): path
+            for path, sha256 in todo
+        }
+
+        # Só a thread principal escreve
+        with output.open("a", encoding="utf-8") as out:
+            for i, future in enumerate(as_completed(futures), start=1):
+                record = future.result()
+                _write_record(out, record, report)
+
+                elapsed = time.perf_counter() - t0
+                status = "ok" if record.status == "ok" else f"ERRO ({record.error})"
+                print(
+                    f"[{i}/{total}] {record.path}: {status} · "
+                    f"{record.pages_processed} págs · {report.pages / elapsed:.1f} págs/s",
+                    file=sys.stderr,
+                )
+    except KeyboardInterrupt:
+        print("\nInterrompido — o progresso gravado será retomado na próxima execução.", file=sys.stderr)
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    finally:
+        report.elapsed_s = time.perf_counter() - t0
+
+    pool.shutdown()
+    return report
+
+
+def _jobs_path(output: Path) -> Path:
+    return output.with_name(output.name + ".jobs.json")
+
+
+def _load_jobs(path: Path, *, model: str, goal: str) -> Dict[str, List[str]]:
+    # Jobs de uma execução com outro modelo ou objetivo não servem (e seriam ignorados de qualquer forma)
+    try:
+        state = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if state.get("model") != model or state.get("goal") != goal:
+        return {}
+    return {phase: list(ids) for phase, ids in state.get("jobs", {}).items()}
+
+
+def _save_jobs(path: Path, jobs: Dict[str, List[str]], *, model: str, goal: str) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps({"model": model, "goal": goal, "jobs": jobs}, indent=2), encoding="utf-8")
+    tmp.replace(path)
+
+
+def _print_job(job: BatchJob) -> None:
+    counts = f" · {job.completed}/{job.total}" if job.total else ""
+    print(f"  job {job.job_id}: {job.state}{counts}", file=sys.stderr)
+
+
+def run_provider_batch(
+    root: Path,
+    output: Path,
+    *,
+    extractor: PdfTextExtractor,
+    batch_uc: BatchExplainPdfUC,
+    model: str,
+    goal: str = DEFAULT_GOAL,
+    max_pages: Optional[int] = None,
+    workers: int = 4,
+    pattern: str = "*.pdf",
+    index: Optional[LexicalIndexPort] = None,
+) -> BatchReport:
+    report = BatchReport()
+    todo = _pending_documents(root, output, pattern, report)
+    total = len(todo)
+    state_path = _jobs_path(output)
+    jobs = _load_jobs(state_path, model=model, goal=goal)
+
+    t0 = time.perf_counter()
+    try:
+        with output.open("a", encoding="utf-8") as out:
+            # 1) Extração local em paralelo; falhas já entram no checkpoint
+            records: Dict[str, BatchRecord] = {}
+            prepared: List[PreparedExplain] = []
+            pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="batch")
+            try:
+                futures = [
+                    pool.submit(
+                        prepare_document,
+                        path,
+                        root=root,
+                        sha256=sha256,
+                        extractor=extractor,
+                        batch_uc=batch_uc,
+                        goal=goal,
+                        max_pages=max_pages,
+                        index=index,
+                    )
+                    for path, sha256 in todo
+                ]
+                for i, future in enumerate(as_completed(futures), start=1):
+                    record, item = future.result()
+                    if item is None:
+                        _write_record(out, record, report)
+                        status = f"ERRO ({record.error})"
+                    else:
+                        records[item.key] = record
+                        prepared.append(item)
+                        status = "extraído"
+                    print(f"[{i}/{total}] {record.path}: {status} · {record.pages_processed} págs",
+                          file=sys.stderr)
+            except KeyboardInterrupt:
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+            pool.shutdown()
+
+            if not prepared:
+                return report
+
+            # 2) Explicações no modo lote do provedor
+            print(f"Enviando {len(prepared)} documentos ao modo lote ({model})...", file=sys.stderr)
+            results = batch_uc.run(
+                prepared,
+                model=model,
+                jobs=jobs,
+                on_jobs=lambda current: _save_jobs(state_path, current, model=model, goal=goal),
+                progress=_print_job,
+            )
+            for result in results:
+                record = records[result.key]
+                if result.response is not None:
+                    record.explanation = result.response.text
+                    record.model = result.response.used_model
+                    record.safety_notes = result.response.safety_notes
+                    record.llm_ms = result.response.latency_ms
+                    record.breakdown_ms = {**record.breakdown_ms, **result.response.breakdown_ms}
+                    record.status = "ok"
+                else:
+                    record.error = result.error
+                record.processed_at = _now()
+                _write_record(out, record, report)
+        state_path.unlink(missing_ok=True)
+    except KeyboardInterrupt:
+        print(
+            "\nInterrompido — jobs já enviados seguem no provedor; a próxima execução "
+            f"volta a acompanhá-los ({state_path}).",
+            file=sys.stderr,
+        )
+        raise
+    finally:
+        report.elapsed_s = time.perf_counter() - t0
+    return report
+
+
+def _print_report(report: BatchReport) -> None:
+    print(
+        "\nResumo do lote\n"
+        f"  documentos processados: {report.documents} "
+        f"({report.failed} com erro, {report.skipped} pulados pelo checkpoint)\n"
+        f"  páginas: {report.pages}\n"
+        f"  tempo: {report.elapsed_s:.1f} s\n"
+        f"  throughput: {report.pages_per_s:.2f} págs/s · {report.docs_per_min:.1f} docs/min",
+        file=sys.stderr,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(
+        prog="python -m src.batch",
+        description="Extrai e explica todos os PDFs de uma pasta, com checkpoint em JSONL.",
+    )
+    parser.add_argument("input_dir", type=Path, help="pasta com os PDFs (busca recursiva)")
+    parser.add_argument("--output", type=Path, default=Path("batch_results.jsonl"))
+    parser.add_argument("--workers", type=int, default=settings.batch_workers,
+                        help="documentos processados em paralelo")
+    parser.add_argument("--ocr-workers", type=int, default=None,
+                        help="processos de OCR por documento (padrão: OCR_WORKERS)")
+    parser.add_argument("--max-pages", type=int, default=None)
+    parser.add_argument("--goal", default=DEFAULT_GOAL)
+    parser.add_argument("--model", default=None,
+                        help="padrão: GEMINI_MODEL (OPENAI_MODEL com --provider-batch openai)")
+    parser.add_argument("--pattern", default="*.pdf")
+    parser.add_argument("--index", action="store_true",
+                        help="indexa as páginas para a busca por termos (lê cada PDF inteiro)")
+    parser.add_argument("--provider-batch", nargs="?", const=settings.batch_provider, default=None,
+                        metavar="PROVEDOR",
+                        help=f"explica pelo modo lote do provedor (padrão: {settings.batch_provider})")
+    args = parser.parse_args(argv)
+
+    if not args.input_dir.is_dir():
+        parser.error(f"pasta não encontrada: {args.input_dir}")
+
+    index = None
+    if args.index:
+        index = build_lexical_index()
+        if index is None:
+            parser.error("--index exige LEXICAL_INDEX_PATH configurado")
+
+    configure_telemetry()
+    extractor = build_pdf_extractor(
+        cache=build_extraction_cache(),
+        vision=build_vision_analyzer(),
+        rasterizer=build_rasterizer(),
+        ocr_workers=args.ocr_workers,
+    )
+
+    if args.provider_batch:
+        model = args.model or (
+            settings.openai_model if args.provider_batch == "openai" else settings.gemini_model
+        )
+        try:
+            report = run_provider_batch(
+                args.input_dir.resolve(),
+                args.output,
+                extractor=extractor,
+                batch_uc=build_batch_explain_uc(build_batch_llm(args.provider_batch)),
+                model=model,
+                goal=args.goal,
+                max_pages=args.max_pages,
+                workers=args.workers,
+                pattern=args.pattern,
+                index=index,
+            )
+        except TimeoutError as exc:
+            print(f"{exc}\nRode de novo para continuar acompanhando os jobs.", file=sys.stderr)
+            return 1
+    else:
+        report = run_batch(
+            args.input_dir.resolve(),
+            args.output,
+            extractor=extractor,
+            explain_uc=build_explain_pdf_uc(build_llm()),
+            model=args.model or settings.gemini_model,
+            goal=args.goal,
+            max_pages=args.max_pages,
+            workers=args.workers,
+            pattern=args.pattern,
+            index=index,
+        )
+    _print_report(report)
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+"""
+Montagem das dependências a partir do Settings.
+
+Compartilhada pelas entradas da aplicação (Streamlit, API e CLI de lote), que
+só decidem o ciclo de vida das instâncias (cache de recurso, uma por processo...).
+
+Otimizada para a partida a frio: os adaptadores de infraestrutura são
+importados dentro das funções que os montam, e os provedores de LLM saem de um
+registro por nome que só importa o SDK (google.generativeai, openai, anthropic)
+na primeira chamada ao provedor. `python -m benchmarks.bench_import_time`
+confere o orçamento de importação.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable, Dict, Optional
+
+from src import telemetry
+from src.config import Settings, get_settings
+from src.domain.ports import LLMPort
+
+if TYPE_CHECKING:
+    from src.application.conversation import Conversation
+    from src.application.document_use_cases import BatchExplainPdfUC, ExplainPdfUC
+    from src.application.history_manager import HistoryManager
+    from src.domain.ports import BatchLLMPort, ConversationStorePort, EmbedderPort, LexicalIndexPort
+    from src.infrastructure.extraction_cache import PdfExtractionCache
+    from src.infrastructure.llm_router import ProviderRoute
+    from src.infrastructure.pdf_extractor import PdfTextExtractor
+    from src.infrastructure.rasterizer import PageRasterizer
+    from src.infrastructure.vector_store import NumpyVectorStore
+    from src.infrastructure.vision_analyzer import ClaudeVisionAnalyzer
+
+
+# ---------------------------------------------------------------------------
+# Registro de provedores de LLM
+# ---------------------------------------------------------------------------
+# Cada fábrica decide só com o Settings (sem importar o SDK) se o provedor entra
+# no roteamento; o adaptador real é criado pelo LazyLLMAdapter no primeiro uso.
+ProviderFactory = Callable[[Settings, Optional[str]], Optional["ProviderRoute"]]
+
+
+def _gemini_route(settings: Settings, gemini_api_key: Optional[str]) -> ProviderRoute:
+    from src.infrastructure.lazy_llm import LazyLLMAdapter
+    from src.infrastructure.llm_router import ProviderRoute
+
+    def _build() -> LLMPort:
+        from src.infrastructure.gemini_llm import GeminiLLMAdapter
+
+        return GeminiLLMAdapter(
+            api_key=gemini_api_key or settings.gemini_api_key,
+            client_cache_size=settings.gemini_client_cache_size,
+            context_cache=settings.gemini_context_cache,
+        )
+
+    # O modelo pedido pelo chamador (ex.: barra lateral) vale para o Gemini
+    return ProviderRoute("gemini", LazyLLMAdapter(_build))
+
+
+def _openai_route(settings: Settings, _: Optional[str]) -> Optional[ProviderRoute]:
+    if not settings.openai_api_key:
+        return None
+    from src.infrastructure.lazy_llm import LazyLLMAdapter
+    from src.infrastructure.llm_router import ProviderRoute
+
+    def _build() -> LLMPort:
+        from src.infrastructure.openai_llm import OpenAILLMAdapter
+
+        return OpenAILLMAdapter(api_key=settings.openai_api_key)
+
+    return ProviderRoute("openai", LazyLLMAdapter(_build), settings.openai_model)
+
+
+def _anthropic_route(settings: Settings, _: Optional[str]) -> Optional[ProviderRoute]:
+    if not settings.anthropic_api_key:
+        return None
+    from src.infrastructure.lazy_llm import LazyLLMAdapter
+    from src.infrastructure.llm_router import ProviderRoute
+
+    def _build() -> LLMPort:
+        from src.infrastructure.anthropic_llm import AnthropicLLMAdapter
+
+        return AnthropicLLMAdapter(api_key=settings.anthropic_api_key)
+
+    return ProviderRoute("anthropic", LazyLLMAdapter(_build), settings.anthropic_model)
+
+
+def _fake_route(settings: Settings, _: Optional[str]) -> ProviderRoute:
+    # Sem rede nem chave: testes de carga da API e demonstrações
+    from src.infrastructure.fake_llm import FakeLLMAdapter, LatencyProfile
+    from src.infrastructure.llm_router import ProviderRoute
+
+    return ProviderRoute("fake", FakeLLMAdapter(
+        latency=LatencyProfile(
+            median_ms=settings.fake_llm_latency_ms, sigma=settings.fake_llm_latency_sigma
+        ),
+        chunk_delay_ms=settings.fake_llm_chunk_delay_ms,
+    ))
+
+
+LLM_PROVIDERS: Dict[str, ProviderFactory] = {
+    "gemini": _gemini_route,
+    "openai": _openai_route,
+    "anthropic": _anthropic_route,
+    "fake": _fake_route,
+}
+
+
+def build_router(gemini_api_key: str | None = None) -> LLMPort:
+    settings = get_settings()
+    routes: list[ProviderRoute] = []
+    for name in (p.strip().lower() for p in settings.llm_providers.split(",")):
+        factory = LLM_PROVIDERS.get(name)
+        route = factory(settings, gemini_api_key) if factory is not None else None
+        if route is not None:
+            routes.append(route)
+
+    if len(routes) == 1:
+        return routes[0].llm
+
+    from src.infrastructure.llm_router import RoutingLLMAdapter
+
+    return RoutingLLMAdapter(
+        routes,
+        timeout_s=settings.llm_timeout_s,
+        hedge=settings.llm_hedge,
+        # O mesmo roteador atende a API, os jobs da interface e o lote
+        max_concurrency=max(settings.api_max_concurrency, settings.job_workers, settings.batch_workers),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Demais dependências
+# ---------------------------------------------------------------------------
+def configure_telemetry() -> None:
+    settings = get_settings()
+    telemetry.configure(
+        metrics_path=settings.metrics_path,
+        flush_interval_s=settings.metrics_flush_interval_s,
+        otel=settings.otel_enabled,
+    )
+
+
+def build_llm(gemini_api_key: str | None = None) -> LLMPort:
+    from src.infrastructure.llm_tracing import TracingLLMAdapter
+
+    llm = build_router(gemini_api_key)
+    if get_settings().response_cache:
+        llm = _build_response_cache(llm)
+    # Por fora de tudo: o span mede o que o caso de uso esperou (cache e roteador inclusos)
+    return TracingLLMAdapter(llm)
+
+
+def _build_response_cache(llm: LLMPort) -> LLMPort:
+    from src.infrastructure.embedders import HashingEmbedder
+    from src.infrastructure.response_cache import CachingLLMAdapter, SqliteResponseStore
+
+    settings = get_settings()
+    return CachingLLMAdapter(
+        llm,
+        max_entries=settings.response_cache_max_entries,
+        ttl_s=settings.response_cache_ttl_s,
+        store=(
+            SqliteResponseStore(settings.response_cache_path, ttl_s=settings.response_cache_ttl_s)
+            if settings.response_cache_path
+            else None
+        ),
+        embedder=HashingEmbedder() if settings.response_cache_semantic else None,
+        similarity_threshold=settings.response_cache_similarity,
+    )
+
+
+def build_extraction_cache() -> PdfExtractionCache | None:
+    settings = get_settings()
+    if not settings.extraction_cache_path:
+        return None
+    from src.infrastructure.extraction_cache import PdfExtractionCache
+
+    return PdfExtractionCache(
+        settings.extraction_cache_path,
+        max_bytes=settings.extraction_cache_max_mb * 1024 * 1024,
+    )
+
+
+def build_vision_analyzer() -> ClaudeVisionAnalyzer:
+    from src.infrastructure.vision_analyzer import ClaudeVisionAnalyzer
+
+    settings = get_settings()
+    return ClaudeVisionAnalyzer(
+        api_key=settings.anthropic_api_key,
+        model=settings.vision_model,
+        max_concurrency=settings.vision_max_concurrency,
+        requests_per_minute=settings.vision_requests_per_minute,
+    )
+
+
+def build_rasterizer() -> PageRasterizer | None:
+    from src.infrastructure.rasterizer import default_rasterizer
+
+    settings = get_settings()
+    try:
+        return default_rasterizer(kind=settings.pdf_rasterizer, poppler_path=settings.poppler_path)
+    except RuntimeError:
+        # Sem Poppler: PDFs com texto continuam funcionando; o erro aparece só se precisar de OCR
+        return None
+
+
+def build_pdf_extractor(
+    *,
+    cache: Optional[PdfExtractionCache] = None,
+    vision: Optional[ClaudeVisionAnalyzer] = None,
+    rasterizer: Optional[PageRasterizer] = None,
+    ocr_workers: Optional[int] = None,
+) -> PdfTextExtractor:
+    from src.infrastructure.image_preprocessing import PagePreprocessor, PreprocessConfig
+    from src.infrastructure.pdf_extractor import PdfTextExtractor
+
+    settings = get_settings()
+    return PdfTextExtractor(
+        ocr_workers=settings.ocr_workers if ocr_workers is None else ocr_workers,
+        cache=cache,
+        vision=vision,
+        rasterizer=rasterizer,
+        tesseract_cmd=settings.tesseract_cmd,
+        preprocessor=PagePreprocessor(
+            PreprocessConfig(
+                max_long_edge=settings.image_max_long_edge,
+                vision_format=settings.vision_image_format,
+                crop_margins=settings.image_crop_margins,
+                skip_blank_pages=settings.skip_blank_pages,
+            )
+        ),
+    )
+
+
+def build_explain_pdf_uc(
+    llm: LLMPort,
+    history_manager: Optional[HistoryManager] = None,
+) -> ExplainPdfUC:
+    from src.application.document_use_cases import ExplainPdfUC
+
+    settings = get_settings()
+    return ExplainPdfUC(
+        llm=llm,
+        history_manager=history_manager,
+        long_document=settings.pdf_long_document,
+        chunk_tokens=settings.pdf_chunk_tokens,
+        max_fan_out=settings.pdf_max_fan_out,
+        max_document_chars=settings.pdf_max_document_chars,
+    )
+
+
+def build_rag_components() -> tuple[EmbedderPort, NumpyVectorStore]:
+    from src.infrastructure.embedders import HashingEmbedder, OpenAIEmbedder
+    from src.infrastructure.vector_store import NumpyVectorStore
+
+    settings = get_settings()
+    if settings.rag_embedder == "openai":
+        embedder: EmbedderPort = OpenAIEmbedder(api_key=settings.openai_api_key)
+    else:
+        embedder = HashingEmbedder()
+    return embedder, NumpyVectorStore(settings.rag_index_path, dim=embedder.dim)
+
+
+def build_lexical_index() -> LexicalIndexPort | None:
+    settings = get_settings()
+    if not settings.lexical_index_path:
+        return None
+    from src.infrastructure.lexical_index import InvertedIndex
+
+    return InvertedIndex(settings.lexical_index_path)
+
+
+def build_conversation(
+    *,
+    store: ConversationStorePort | None = None,
+    session_id: str | None = None,
+) -> Conversation:
+    """Conversa da sessão, restaurada do `store` quando já existe para `session_id`."""
+    from src.application.conversation import Conversation
+
+    settings = get_settings()
+    limits = dict(
+        max_bytes=settings.conversation_max_kb * 1024,
+        keep_recent=settings.conversation_keep_recent,
+        compress_min_bytes=settings.conversation_compress_min_bytes,
+    )
+    payload = store.load(session_id) if store is not None and session_id else None
+    try:
+        conversation = Conversation.loads(payload, **limits) if payload else Conversation(**limits)
+    except ValueError:
+        # Sessão gravada ilegível (ex.: formato antigo): começa do zero
+        conversation = Conversation(**limits)
+    return conversation
+
+
+def build_conversation_store() -> ConversationStorePort | None:
+    settings = get_settings()
+    if not settings.conversation_store_path:
+        return None
+    from src.infrastructure.conversation_store import SqliteConversationStore
+
+    return SqliteConversationStore(
+        settings.conversation_store_path, ttl_s=settings.conversation_store_ttl_days * 24 * 3600
+    )
+
+
+def build_batch_llm(provider: str | None = None) -> BatchLLMPort:
+    settings = get_settings()
+    provider = (provider or settings.batch_provider).strip().lower()
+    if provider == "openai":
+        from src.infrastructure.openai_llm import OpenAIBatchLLMAdapter
+
+        return OpenAIBatchLLMAdapter(api_key=settings.openai_api_key)
+    if provider == "gemini":
+        from src.infrastructure.gemini_llm import GeminiBatchLLMAdapter
+
+        return GeminiBatchLLMAdapter(api_key=settings.gemini_api_key)
+    if provider == "fake":
+        from src.infrastructure.fake_llm import FakeBatchLLMAdapter
+
+        return FakeBatchLLMAdapter(completion_s=settings.fake_batch_completion_s)
+    raise RuntimeError(f"Provedor de lote desconhecido: {provider!r} (use openai, gemini ou fake).")
+
+
+def build_batch_explain_uc(batch_llm: BatchLLMPort) -> BatchExplainPdfUC:
+    from src.application.document_use_cases import BatchExplainPdfUC
+
+    settings = get_settings()
+    return BatchExplainPdfUC(
+        batch_llm,
+        long_document=settings.pdf_long_document,
+        chunk_tokens=settings.pdf_chunk_tokens,
+        max_document_chars=settings.pdf_max_document_chars,
+        poll_interval_s=settings.batch_poll_interval_s,
+        timeout_s=settings.batch_timeout_h * 3600,
+    )
+
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+from functools import lru_cache
+from typing import Any
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -9,14 +12,118 @@ class Settings(BaseSettings):
     # LLM providers
     gemini_api_key: str | None = None
     gemini_model: str = "gemini-2.5-flash"
+    gemini_client_cache_size: int = 32  # 0 desativa o cache de GenerativeModel
+    gemini_context_cache: bool = False  # context caching do system prompt (prompts longos)
 
     openai_api_key: str | None = None
+    openai_model: str = "gpt-4o-mini"
 
     anthropic_api_key: str | None = None
+    anthropic_model: str = "claude-sonnet-4-5"
+
+    # Roteamento entre provedores (ordem inicial de preferência; só entram os que têm chave)
+    llm_providers: str = "gemini"  # ex.: "gemini,openai,anthropic"
+    llm_timeout_s: float = 60.0
+    llm_hedge: bool = True  # duplica a requisição quando o provedor passa do próprio p95
+
+    # Provedor "fake" (LLM_PROVIDERS=fake): respostas simuladas, para testes de carga
+    fake_llm_latency_ms: float = 300.0  # mediana até o primeiro pedaço
+    fake_llm_latency_sigma: float = 0.5
+    fake_llm_chunk_delay_ms: float = 20.0
+
+    # Cache de respostas do LLM (memória + SQLite opcional)
+    response_cache: bool = True
+    response_cache_max_entries: int = 1_000
+    response_cache_ttl_s: int = 24 * 3600
+    response_cache_path: str | None = ".cache/llm_responses.sqlite3"  # None = só memória
+    response_cache_semantic: bool = False  # reaproveita perguntas quase idênticas
+    response_cache_similarity: float = 0.95
+
+    # Histórico enviado ao LLM (turnos antigos viram um resumo)
+    history_token_budget: int = 6_000
+
+    # Conversa guardada por sessão na interface (memória limitada)
+    conversation_max_kb: int = 256  # acima disso as mensagens mais antigas saem da sessão
+    conversation_keep_recent: int = 8  # mensagens recentes mantidas sem compressão
+    conversation_compress_min_bytes: int = 1_024  # corpos menores não são comprimidos
+    conversation_store_path: str | None = None  # SQLite para restaurar sessões; None desativa
+    conversation_store_ttl_days: int = 7
 
     # Infraestrutura local
     poppler_path: str = r"C:\poppler\poppler-23.11.0\poppler-23.11.0\Library\bin"
     tesseract_cmd: str = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
 
+    # Extração de PDF
+    ocr_workers: int = 4  # 1 = OCR sequencial
+    extraction_cache_path: str | None = ".cache/pdf_extractions.sqlite3"  # None desativa
+    extraction_cache_max_mb: int = 512
+
+    # Claude Vision (diagramas)
+    vision_model: str = "claude-opus-4-6"
+    vision_max_concurrency: int = 4
+    vision_requests_per_minute: int = 50
+
+    # Rasterização: "pdftoppm" (stdout, fallback em disco), "pdfium" ou "tempdir"
+    pdf_rasterizer: str = "pdftoppm"
+
+    # Pré-processamento das páginas rasterizadas
+    image_max_long_edge: int = 1600
+    vision_image_format: str = "jpeg"  # "png", "jpeg" ou "webp"
+    image_crop_margins: bool = True
+    skip_blank_pages: bool = True
+
+    # Explicação de documentos longos (map-reduce em vez de truncar)
+    pdf_long_document: bool = True
+    pdf_chunk_tokens: int = 3_000
+    pdf_max_fan_out: int = 4
+    pdf_max_document_chars: int = 400_000  # leitura sob demanda para aqui (CLI de lote)
+
+    # Jobs em segundo plano na interface (extração + explicação de PDFs)
+    job_workers: int = 2
+    job_poll_interval_s: float = 1.0
+
+    # Telemetria: quebra de latência por etapa e métricas em formato Prometheus
+    metrics_path: str | None = ".cache/metrics.prom"  # None desativa o arquivo
+    metrics_flush_interval_s: float = 10.0
+    otel_enabled: bool = False  # encaminha os spans ao OpenTelemetry (opentelemetry-api)
+
+    # API HTTP (python -m src.presentation.api)
+    api_host: str = "127.0.0.1"
+    api_port: int = 8000
+    api_max_concurrency: int = 16  # requisições ao LLM atendidas ao mesmo tempo
+    api_max_queue: int = 64  # esperando vaga; acima disso a API responde 429
+    api_queue_timeout_s: float = 10.0  # espera máxima na fila antes do 429
+    api_pdf_max_concurrency: int = 2  # extrações de PDF simultâneas (CPU/OCR)
+    api_max_pdf_mb: int = 20
+    api_max_body_kb: int = 512  # demais requisições (chat com histórico)
+
+    # Processamento em lote (python -m src.batch)
+    batch_workers: int = 4
+
+    # Modo lote do provedor (python -m src.batch --provider-batch): mais barato, resultado em horas
+    batch_provider: str = "openai"  # "openai", "gemini" (requer google-genai) ou "fake"
+    batch_poll_interval_s: float = 30.0  # dobra a cada consulta, até 5 min
+    batch_timeout_h: float = 26.0  # janela do provedor (24 h) + folga
+    fake_batch_completion_s: float = 2.0
+
+    # RAG com documentos internos
+    rag_index_path: str = ".cache/rag_index"
+    rag_embedder: str = "hashing"  # "hashing" (local/offline) ou "openai"
+    rag_top_k: int = 6
+
+    # Busca por termos (BM25 por página) no texto dos PDFs já extraídos
+    lexical_index_path: str | None = ".cache/lexical_index"  # None desativa
+    lexical_top_pages: int = 8  # páginas encontradas enviadas ao LLM
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Lido do ambiente e do .env no primeiro uso, não na importação do módulo."""
+    return Settings()
+
 
-settings = Settings()
\ No newline at end of file
+def __getattr__(name: str) -> Any:
+    # Compatibilidade com `from src.config import settings`
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -1,20 +1,91 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import List, Literal
+from typing import Dict, List, Literal, Optional
 
 Role = Literal["system", "user", "assistant"]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ChatMessage:
     role: Role
     content: str
 
 
+@dataclass(frozen=True)
+class LLMCallInfo:
+    """Metadados da chamada ao LLM que produziu a resposta (cache, roteamento)."""
+    cache_status: Optional[str] = None  # "hit", "semantic", "miss" ou "bypass"
+    cache_hit_rate: Optional[float] = None  # taxa de acerto acumulada do cache
+    provider: Optional[str] = None  # provedor que respondeu (roteador)
+    provider_model: Optional[str] = None
+    hedged: bool = False  # houve requisição duplicada para outro provedor
+    failovers: int = 0  # provedores que falharam antes da resposta
+
+
 @dataclass(frozen=True)
 class AgentResponse:
     text: str
     used_model: str
     latency_ms: int
-    safety_notes: List[str] = field(default_factory=list)
\ No newline at end of file
+    safety_notes: List[str] = field(default_factory=list)
+    ttft_ms: Optional[int] = None  # tempo até o primeiro pedaço (só em streaming)
+    chunk_latencies_ms: List[int] = field(default_factory=list)  # fase map de documentos longos
+    call_info: Optional[LLMCallInfo] = None
+    breakdown_ms: Dict[str, float] = field(default_factory=dict)  # tempo por etapa (spans)
+
+
+@dataclass(frozen=True)
+class DocumentChunk:
+    doc_id: str
+    title: str
+    first_page: int
+    last_page: int
+    text: str
+
+
+@dataclass(frozen=True)
+class RetrievedChunk:
+    chunk: DocumentChunk
+    score: float
+
+
+@dataclass(frozen=True)
+class PageHit:
+    doc_id: str
+    title: str
+    page: int
+    score: float
+    snippet: str = ""
+
+
+@dataclass(frozen=True)
+class BatchRequest:
+    custom_id: str  # devolvido no resultado; único dentro do job
+    model: str
+    messages: List[ChatMessage]
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    custom_id: str
+    text: Optional[str] = None
+    error: Optional[str] = None
+
+
+BatchState = Literal["pending", "running", "completed", "failed", "expired", "cancelled"]
+
+
+@dataclass(frozen=True)
+class BatchJob:
+    job_id: str
+    state: BatchState
+    total: int = 0
+    completed: int = 0
+    failed: int = 0
+
+    @property
+    def done(self) -> bool:
+        # Jobs vencidos ou falhos também terminam: os resultados parciais ainda podem ser lidos
+        return self.state not in ("pending", "running")
+
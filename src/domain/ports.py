@@ -1,12 +1,155 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import List
+from typing import TYPE_CHECKING, AsyncIterator, Iterator, List, Optional, Sequence, Tuple
 
-from .models import ChatMessage
+from .models import (
+    BatchJob,
+    BatchRequest,
+    BatchResult,
+    ChatMessage,
+    DocumentChunk,
+    LLMCallInfo,
+    PageHit,
+    RetrievedChunk,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
 
 
 class LLMPort(ABC):
     @abstractmethod
     def chat(self, *, model: str, messages: List[ChatMessage]) -> str:
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    def stream_chat(self, *, model: str, messages: List[ChatMessage]) -> Iterator[str]:
+        """
+        Gera a resposta em pedaços (deltas de texto).
+        Implementação padrão: resposta inteira num único pedaço — adaptadores
+        com suporte a streaming sobrescrevem.
+        """
+        yield self.chat(model=model, messages=messages)
+
+    def last_call_info(self) -> Optional[LLMCallInfo]:
+        """
+        Metadados da última chamada feita pela thread atual (ex.: acerto de cache).
+        Adaptadores simples não têm nada a informar; decoradores sobrescrevem.
+        """
+        return None
+
+
+class AsyncLLMPort(ABC):
+    """Versão assíncrona do LLMPort — várias conversas concorrentes num único event loop."""
+
+    @abstractmethod
+    async def chat(self, *, model: str, messages: List[ChatMessage]) -> str:
+        raise NotImplementedError
+
+    async def stream_chat(self, *, model: str, messages: List[ChatMessage]) -> AsyncIterator[str]:
+        yield await self.chat(model=model, messages=messages)
+
+    def last_call_info(self) -> Optional[LLMCallInfo]:
+        """
+        Metadados da última chamada feita pela tarefa atual (contextvar, não
+        thread-local: várias conversas dividem a mesma thread do event loop).
+        """
+        return None
+
+
+class BatchLLMPort(ABC):
+    """
+    Modo lote do provedor: muitas requisições num job assíncrono, com latência
+    de minutos a horas em troca de custo menor e sem disputar o rate limit
+    das chamadas interativas.
+    """
+
+    max_requests: int = 10_000  # por job
+    max_bytes: int = 100 * 1024 * 1024  # tamanho aproximado das mensagens por job
+
+    @abstractmethod
+    def submit(self, requests: List[BatchRequest]) -> str:
+        """Cria o job (todas as requisições com o mesmo modelo) e retorna o id."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def poll(self, job_id: str) -> BatchJob:
+        raise NotImplementedError
+
+    @abstractmethod
+    def results(self, job_id: str) -> List[BatchResult]:
+        """Resultados de um job terminado; requisições sem resposta podem faltar."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def cancel(self, job_id: str) -> None:
+        raise NotImplementedError
+
+
+class EmbedderPort(ABC):
+    @property
+    @abstractmethod
+    def dim(self) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Matriz float32 (len(texts), dim) com vetores normalizados (norma L2 = 1)."""
+        raise NotImplementedError
+
+
+class VectorIndexPort(ABC):
+    @abstractmethod
+    def add(self, chunks: List[DocumentChunk], vectors: np.ndarray) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def search(self, vector: np.ndarray, k: int) -> List[RetrievedChunk]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def has_document(self, doc_id: str) -> bool:
+        raise NotImplementedError
+
+
+class LexicalIndexPort(ABC):
+    """Busca por termos com resultado por página (complementa o índice vetorial)."""
+
+    @abstractmethod
+    def add_document(self, *, doc_id: str, title: str, pages: Sequence[Tuple[int, str]]) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def search(
+        self,
+        query: str,
+        k: int,
+        *,
+        doc_id: Optional[str] = None,
+        max_per_document: Optional[int] = None,
+    ) -> List[PageHit]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def page_text(self, doc_id: str, page: int) -> Optional[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def has_document(self, doc_id: str) -> bool:
+        raise NotImplementedError
+
+
+class ConversationStorePort(ABC):
+    """Sessões de conversa descarregadas da memória (payload de Conversation.dumps)."""
+
+    @abstractmethod
+    def save(self, session_id: str, payload: bytes) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def load(self, session_id: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        raise NotImplementedError
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import os
+from typing import Iterator, List
+
+from src.domain.models import ChatMessage
+from src.domain.ports import LLMPort
+
+
+def _to_anthropic(messages: List[ChatMessage]) -> tuple[str, list[dict]]:
+    """
+    A API da Anthropic recebe o system prompt à parte e exige que as mensagens
+    alternem user/assistant começando por user.
+    """
+    system_parts = [m.content for m in messages if m.role == "system"]
+
+    payload: list[dict] = []
+    for m in messages:
+        if m.role == "system":
+            continue
+        if payload and payload[-1]["role"] == m.role:
+            payload[-1]["content"] += "\n\n" + m.content
+        else:
+            payload.append({"role": m.role, "content": m.content})
+
+    if payload and payload[0]["role"] != "user":
+        payload.insert(0, {"role": "user", "content": "(início da conversa)"})
+
+    return "\n\n".join(system_parts), payload
+
+
+class AnthropicLLMAdapter(LLMPort):
+    def __init__(self, api_key: str | None = None, *, max_tokens: int = 4096) -> None:
+        import anthropic
+
+        api_key = api_key or os.environ.get("ANTHROPIC_API_KEY")
+        if not api_key:
+            raise RuntimeError(
+                "ANTHROPIC_API_KEY não configurada. "
+                "Defina a variável de ambiente ou passe api_key no construtor."
+            )
+        self.client = anthropic.Anthropic(api_key=api_key)
+        self.max_tokens = max_tokens
+
+    def chat(self, *, model: str, messages: List[ChatMessage]) -> str:
+        system, payload = _to_anthropic(messages)
+
+        response = self.client.messages.create(
+            model=model,
+            max_tokens=self.max_tokens,
+            system=system,
+            messages=payload,
+        )
+
+        return "".join(block.text for block in response.content if block.type == "text")
+
+    def stream_chat(self, *, model: str, messages: List[ChatMessage]) -> Iterator[str]:
+        system, payload = _to_anthropic(messages)
+
+        with self.client.messages.stream(
+            model=model,
+            max_tokens=self.max_tokens,
+            system=system,
+            messages=payload,
+        ) as stream:
+            for text in stream.text_stream:
+                if text:
+                    yield text
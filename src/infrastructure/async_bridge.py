@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Pontes entre LLMPort (síncrono) e AsyncLLMPort.
+
+- SyncToAsyncLLM: usa um adaptador síncrono dentro de código assíncrono,
+  executando as chamadas bloqueantes em threads (asyncio.to_thread).
+- AsyncToSyncLLM: expõe um adaptador assíncrono como LLMPort comum, para que
+  os chamadores existentes (Streamlit, casos de uso síncronos) continuem
+  funcionando. As corrotinas rodam num event loop dedicado em background,
+  compartilhado por todas as chamadas.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import threading
+from typing import AsyncIterator, Iterator, List, Optional
+
+from src.domain.models import ChatMessage, LLMCallInfo
+from src.domain.ports import AsyncLLMPort, LLMPort
+
+_DONE = object()
+
+
+class SyncToAsyncLLM(AsyncLLMPort):
+    def __init__(self, llm: LLMPort) -> None:
+        self.llm = llm
+        # O adaptador síncrono guarda os metadados por thread (a do to_thread);
+        # aqui eles são copiados para a tarefa que fez a chamada
+        self._info: contextvars.ContextVar[Optional[LLMCallInfo]] = contextvars.ContextVar(
+            f"llm_call_info_{id(self)}", default=None
+        )
+
+    async def chat(self, *, model: str, messages: List[ChatMessage]) -> str:
+        def _chat() -> tuple[str, Optional[LLMCallInfo]]:
+            text = self.llm.chat(model=model, messages=messages)
+            return text, self.llm.last_call_info()
+
+        text, info = await asyncio.to_thread(_chat)
+        self._info.set(info)
+        return text
+
+    async def stream_chat(self, *, model: str, messages: List[ChatMessage]) -> AsyncIterator[str]:
+        chunks = self.llm.stream_chat(model=model, messages=messages)
+
+        def _next() -> tuple[object, Optional[LLMCallInfo]]:
+            return next(chunks, _DONE), self.llm.last_call_info()
+
+        while True:
+            chunk, info = await asyncio.to_thread(_next)
+            self._info.set(info)
+            if chunk is _DONE:
+                return
+            yield chunk
+
+    def last_call_info(self) -> Optional[LLMCallInfo]:
+        return self._info.get()
+
+
+class _BackgroundLoop:
+    """Event loop rodando numa thread daemon, criado sob demanda."""
+
+    _lock = threading.Lock()
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @classmethod
+    def get(cls) -> asyncio.AbstractEventLoop:
+        with cls._lock:
+            if cls._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name="llm-async-bridge", daemon=True,
+                )
+                thread.start()
+                cls._loop = loop
+            return cls._loop
+
+
+class AsyncToSyncLLM(LLMPort):
+    def __init__(self, llm: AsyncLLMPort, *, timeout_s: Optional[float] = None) -> None:
+        self.llm = llm
+        self.timeout_s = timeout_s
+
+    def chat(self, *, model: str, messages: List[ChatMessage]) -> str:
+        future = asyncio.run_coroutine_threadsafe(
+            self.llm.chat(model=model, messages=messages),
+            _BackgroundLoop.get(),
+        )
+        return future.result(timeout=self.timeout_s)
+
+    def stream_chat(self, *, model: str, messages: List[ChatMessage]) -> Iterator[str]:
+        loop = _BackgroundLoop.get()
+        agen = self.llm.stream_chat(model=model, messages=messages)
+        try:
+            while True:
+                future = asyncio.run_coroutine_threadsafe(agen.__anext__(), loop)
+                try:
+                    yield future.result(timeout=self.timeout_s)
+                except StopAsyncIteration:
+                    return
+        finally:
+            asyncio.run_coroutine_threadsafe(agen.aclose(), loop).result()
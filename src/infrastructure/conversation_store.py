@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Sessões de conversa em SQLite.
+
+Uma linha por sessão com o payload binário de Conversation.dumps (mensagens
+antigas já comprimidas). A interface grava a sessão a cada turno e a restaura
+quando a página é reaberta com o mesmo identificador; sessões sem acesso há
+mais de `ttl_s` são removidas.
+"""
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from src.domain.ports import ConversationStorePort
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    session_id  TEXT PRIMARY KEY,
+    payload     BLOB NOT NULL,
+    updated_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_conversations_updated_at ON conversations (updated_at);
+"""
+
+_PURGE_EVERY = 100  # gravações entre limpezas de sessões vencidas
+
+
+class SqliteConversationStore(ConversationStorePort):
+    def __init__(self, path: str | Path, *, ttl_s: float = 7 * 24 * 3600) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_s = ttl_s
+
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def save(self, session_id: str, payload: bytes) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO conversations (session_id, payload, updated_at) VALUES (?, ?, ?)",
+                (session_id, payload, now),
+            )
+            self._writes += 1
+            if self._writes % _PURGE_EVERY == 1:
+                self._conn.execute("DELETE FROM conversations WHERE updated_at < ?", (now - self.ttl_s,))
+            self._conn.commit()
+
+    def load(self, session_id: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, updated_at FROM conversations WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        payload, updated_at = row
+        return payload if time.time() - updated_at < self.ttl_s else None
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM conversations WHERE session_id = ?", (session_id,))
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM conversations").fetchone()[0]
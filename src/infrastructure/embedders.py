@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Embedders para o índice de documentos (RAG).
+
+- HashingEmbedder: local e offline. Feature hashing de palavras e bigramas
+  com peso TF sublinear; estável entre processos (crc32, não hash()).
+- OpenAIEmbedder: embeddings da OpenAI, em lotes.
+"""
+from __future__ import annotations
+
+import os
+import re
+import unicodedata
+import zlib
+from typing import List
+
+import numpy as np
+
+from src.domain.ports import EmbedderPort
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def _fold(text: str) -> str:
+    # Minúsculas e sem acentos: "Cláusula" e "clausula" caem no mesmo bucket
+    normalized = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in normalized if not unicodedata.combining(c))
+
+
+class HashingEmbedder(EmbedderPort):
+    def __init__(self, dim: int = 1024, *, bigrams: bool = True) -> None:
+        self._dim = dim
+        self.bigrams = bigrams
+
+    @property
+    def dim(self) -> int:
+        return self._dim
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self._dim), dtype=np.float32)
+
+        for row, text in enumerate(texts):
+            tokens = _WORD.findall(_fold(text))
+            features = tokens + (
+                [f"{a} {b}" for a, b in zip(tokens, tokens[1:])] if self.bigrams else []
+            )
+            if not features:
+                continue
+
+            hashes = np.fromiter(
+                (zlib.crc32(f.encode("utf-8")) for f in features),
+                dtype=np.uint32,
+                count=len(features),
+            )
+            buckets = (hashes % self._dim).astype(np.int64)
+            # Bit alto do hash define o sinal (reduz o viés das colisões)
+            signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+
+            counts = np.zeros(self._dim, dtype=np.float32)
+            np.add.at(counts, buckets, signs)
+            out[row] = np.sign(counts) * np.log1p(np.abs(counts))
+
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return out / norms
+
+
+class OpenAIEmbedder(EmbedderPort):
+    _DIMS = {
+        "text-embedding-3-small": 1536,
+        "text-embedding-3-large": 3072,
+    }
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        *,
+        model: str = "text-embedding-3-small",
+        batch_size: int = 256,
+    ) -> None:
+        from openai import OpenAI
+
+        api_key = api_key or os.environ.get("OPENAI_API_KEY")
+        if not api_key:
+            raise RuntimeError(
+                "OPENAI_API_KEY não configurada. "
+                "Defina a variável de ambiente ou passe api_key no construtor."
+            )
+        self.client = OpenAI(api_key=api_key)
+        self.model = model
+        self.batch_size = batch_size
+
+    @property
+    def dim(self) -> int:
+        return self._DIMS.get(self.model, 1536)
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors: List[List[float]] = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            response = self.client.embeddings.create(model=self.model, input=batch)
+            vectors.extend(item.embedding for item in sorted(response.data, key=lambda d: d.index))
+
+        out = np.asarray(vectors, dtype=np.float32).reshape(len(texts), self.dim)
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return out / norms
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+Cache persistente de extrações de PDF (SQLite).
+
+Chave de conteúdo: SHA-256 dos bytes do arquivo + versão do extrator (que
+inclui a impressão digital da configuração de extração). A granularidade é
+por página — pedir 30 páginas depois de já ter extraído 15 processa apenas as
+15 novas; páginas degradadas (Vision indisponível) não são gravadas.
+Documentos menos acessados recentemente são removidos quando o tamanho total
+passa do limite configurado; o total fica numa linha de `meta`, atualizada na
+mesma transação, em vez de somado a cada gravação.
+"""
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+from src.infrastructure.pdf_extractor import PageExtract
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    doc_key     TEXT PRIMARY KEY,
+    total_pages INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    doc_key    TEXT NOT NULL,
+    page       INTEGER NOT NULL,
+    method     TEXT NOT NULL,
+    text       TEXT NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    PRIMARY KEY (doc_key, page)
+);
+CREATE INDEX IF NOT EXISTS idx_documents_last_access ON documents (last_access);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value)
+    SELECT 'size_bytes', COALESCE(SUM(size_bytes), 0) FROM pages;
+"""
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    size_bytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class PdfExtractionCache:
+    def __init__(self, path: str | Path, *, max_bytes: int = 512 * 1024 * 1024) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+        # Streamlit compartilha a instância entre sessões (threads diferentes)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def document_key(file_bytes: bytes, extractor_version: str) -> str:
+        return f"{hashlib.sha256(file_bytes).hexdigest()}:{extractor_version}"
+
+    def get_total_pages(self, doc_key: str) -> int | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT total_pages FROM documents WHERE doc_key = ?", (doc_key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_pages(self, doc_key: str, page_numbers: Iterable[int]) -> dict[int, PageExtract]:
+        wanted = list(page_numbers)
+        if not wanted:
+            return {}
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT page, method, text FROM pages "
+                f"WHERE doc_key = ? AND page IN ({','.join('?' * len(wanted))})",
+                (doc_key, *wanted),
+            ).fetchall()
+
+            found = {
+                page: PageExtract(number=page, method=method, text=text)
+                for page, method, text in rows
+            }
+            self._hits += len(found)
+            self._misses += len(wanted) - len(found)
+
+            if found:
+                self._conn.execute(
+                    "UPDATE documents SET last_access = ? WHERE doc_key = ?",
+                    (time.time(), doc_key),
+                )
+                self._conn.commit()
+
+        return found
+
+    def put_pages(self, doc_key: str, total_pages: int, pages: Iterable[PageExtract]) -> None:
+        rows = [
+            (doc_key, p.number, p.method, p.text, len(p.text.encode("utf-8")))
+            for p in pages
+            if not p.degraded
+        ]
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO documents (doc_key, total_pages, last_access) VALUES (?, ?, ?) "
+                "ON CONFLICT(doc_key) DO UPDATE SET last_access = excluded.last_access",
+                (doc_key, total_pages, time.time()),
+            )
+            if rows:
+                # Páginas regravadas: o tamanho antigo sai do total
+                replaced = self._conn.execute(
+                    "SELECT COALESCE(SUM(size_bytes), 0) FROM pages "
+                    f"WHERE doc_key = ? AND page IN ({','.join('?' * len(rows))})",
+                    (doc_key, *(r[1] for r in rows)),
+                ).fetchone()[0]
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO pages (doc_key, page, method, text, size_bytes) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._add_size_locked(sum(r[4] for r in rows) - replaced)
+            self._evict_locked(keep=doc_key)
+            self._conn.commit()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size_bytes=self._size_locked(),
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM pages")
+            self._conn.execute("DELETE FROM documents")
+            self._conn.execute("UPDATE meta SET value = 0 WHERE key = 'size_bytes'")
+            self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # Evicção LRU por tamanho
+    # ------------------------------------------------------------------
+    def _size_locked(self) -> int:
+        return self._conn.execute("SELECT value FROM meta WHERE key = 'size_bytes'").fetchone()[0]
+
+    def _add_size_locked(self, delta: int) -> None:
+        if delta:
+            self._conn.execute(
+                "UPDATE meta SET value = value + ? WHERE key = 'size_bytes'", (delta,)
+            )
+
+    def _evict_locked(self, *, keep: str) -> None:
+        size = self._size_locked()
+        if size <= self.max_bytes:
+            return
+
+        candidates = self._conn.execute(
+            "SELECT d.doc_key, COALESCE(SUM(p.size_bytes), 0) FROM documents d "
+            "LEFT JOIN pages p ON p.doc_key = d.doc_key "
+            "WHERE d.doc_key != ? GROUP BY d.doc_key ORDER BY d.last_access ASC",
+            (keep,),
+        ).fetchall()
+
+        for doc_key, doc_size in candidates:
+            if size <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM pages WHERE doc_key = ?", (doc_key,))
+            self._conn.execute("DELETE FROM documents WHERE doc_key = ?", (doc_key,))
+            self._add_size_locked(-doc_size)
+            size -= doc_size
+            self._evictions += 1
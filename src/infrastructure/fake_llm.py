@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+LLMPort falso e determinístico, para benchmarks e execução sem chave de API.
+
+A resposta depende só das mensagens (mesma entrada → mesmo texto) e a latência
+segue uma distribuição configurável (lognormal em torno da mediana), sorteada
+por um gerador com semente fixa — duas execuções medem a mesma carga.
+
+FakeBatchLLMAdapter simula o modo lote do provedor com as mesmas respostas:
+o job fica pendente/em execução por `completion_s` e depois devolve tudo.
+"""
+from __future__ import annotations
+
+import hashlib
+import itertools
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+from src.domain.models import BatchJob, BatchRequest, BatchResult, ChatMessage
+from src.domain.ports import BatchLLMPort, LLMPort
+
+_WORDS = (
+    "contrato cláusula prazo pagamento fornecedor vigência multa reajuste objeto "
+    "garantia rescisão parte obrigação entrega serviço valor índice documento"
+).split()
+
+
+@dataclass(frozen=True)
+class LatencyProfile:
+    median_ms: float = 0.0
+    sigma: float = 0.0  # forma da lognormal; 0 = latência constante
+    max_ms: Optional[float] = None  # corta a cauda (timeouts simulados ficam de fora)
+
+    def sample(self, rnd: random.Random) -> float:
+        if self.median_ms <= 0:
+            return 0.0
+        ms = self.median_ms if self.sigma <= 0 else rnd.lognormvariate(math.log(self.median_ms), self.sigma)
+        return ms if self.max_ms is None else min(ms, self.max_ms)
+
+
+class FakeLLMError(RuntimeError):
+    pass
+
+
+class FakeLLMAdapter(LLMPort):
+    def __init__(
+        self,
+        *,
+        latency: LatencyProfile = LatencyProfile(),
+        chunk_delay_ms: float = 0.0,  # intervalo entre pedaços no streaming
+        response_chars: int = 600,
+        chunks: int = 8,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        self.latency = latency
+        self.chunk_delay_ms = chunk_delay_ms
+        self.response_chars = response_chars
+        self.chunks = max(1, chunks)
+        self.error_rate = error_rate
+        self._rnd = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def chat(self, *, model: str, messages: List[ChatMessage]) -> str:
+        self._wait_first_token()
+        text = self._response(model, messages)
+        time.sleep(self.chunk_delay_ms * (self.chunks - 1) / 1000)
+        return text
+
+    def stream_chat(self, *, model: str, messages: List[ChatMessage]) -> Iterator[str]:
+        self._wait_first_token()
+        text = self._response(model, messages)
+        step = math.ceil(len(text) / self.chunks)
+        for i in range(0, len(text), step):
+            if i:
+                time.sleep(self.chunk_delay_ms / 1000)
+            yield text[i:i + step]
+
+    def _wait_first_token(self) -> None:
+        with self._lock:
+            self.calls += 1
+            delay_ms = self.latency.sample(self._rnd)
+            fail = self.error_rate > 0 and self._rnd.random() < self.error_rate
+        time.sleep(delay_ms / 1000)
+        if fail:
+            raise FakeLLMError("falha simulada do provedor")
+
+    def _response(self, model: str, messages: List[ChatMessage]) -> str:
+        digest = hashlib.sha256(model.encode())
+        for m in messages:
+            digest.update(m.role.encode())
+            digest.update(m.content.encode("utf-8"))
+        rnd = random.Random(digest.digest())
+
+        words: List[str] = []
+        size = 0
+        while size < self.response_chars:
+            word = rnd.choice(_WORDS)
+            words.append(word)
+            size += len(word) + 1
+        return "Resposta simulada: " + " ".join(words)
+
+
+@dataclass
+class _FakeJob:
+    requests: List[BatchRequest]
+    created_at: float
+    cancelled: bool = False
+
+
+class FakeBatchLLMAdapter(BatchLLMPort):
+    def __init__(
+        self,
+        *,
+        completion_s: float = 0.0,  # tempo até o job terminar
+        response_chars: int = 600,
+        error_rate: float = 0.0,  # fração das requisições que volta com erro
+        max_requests: int = 10_000,
+        max_bytes: int = 100 * 1024 * 1024,
+    ) -> None:
+        self.completion_s = completion_s
+        self.error_rate = error_rate
+        self.max_requests = max_requests
+        self.max_bytes = max_bytes
+        self._llm = FakeLLMAdapter(response_chars=response_chars)
+        self._jobs: Dict[str, _FakeJob] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.submitted = 0  # requisições enviadas em todos os jobs
+
+    def submit(self, requests: List[BatchRequest]) -> str:
+        if not requests:
+            raise ValueError("Job sem requisições.")
+        if len({r.model for r in requests}) > 1:
+            raise ValueError("Um job aceita um único modelo.")
+        if len(requests) > self.max_requests:
+            raise ValueError(f"Job acima do limite de {self.max_requests} requisições.")
+        with self._lock:
+            job_id = f"fakebatch-{next(self._ids)}"
+            self._jobs[job_id] = _FakeJob(list(requests), time.monotonic())
+            self.submitted += len(requests)
+        return job_id
+
+    def poll(self, job_id: str) -> BatchJob:
+        job = self._job(job_id)
+        total = len(job.requests)
+        if job.cancelled:
+            return BatchJob(job_id, "cancelled", total)
+        elapsed = time.monotonic() - job.created_at
+        if elapsed < self.completion_s * 0.1:
+            return BatchJob(job_id, "pending", total)
+        if elapsed < self.completion_s:
+            return BatchJob(job_id, "running", total, completed=int(total * elapsed / self.completion_s))
+        failed = sum(1 for r in job.requests if self._fails(r))
+        return BatchJob(job_id, "completed", total, completed=total - failed, failed=failed)
+
+    def results(self, job_id: str) -> List[BatchResult]:
+        job = self._job(job_id)
+        if not self.poll(job_id).done:
+            raise RuntimeError(f"Job {job_id} ainda não terminou.")
+        if job.cancelled:
+            return []
+        return [
+            BatchResult(r.custom_id, error="falha simulada do provedor")
+            if self._fails(r)
+            else BatchResult(r.custom_id, text=self._llm._response(r.model, r.messages))
+            for r in job.requests
+        ]
+
+    def cancel(self, job_id: str) -> None:
+        self._job(job_id).cancelled = True
+
+    def _job(self, job_id: str) -> _FakeJob:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(f"Job desconhecido: {job_id}")
+        return job
+
+    def _fails(self, request: BatchRequest) -> bool:
+        # Determinístico por custom_id: a mesma requisição falha em todas as leituras
+        if self.error_rate <= 0:
+            return False
+        digest = hashlib.sha256(request.custom_id.encode()).digest()
+        return int.from_bytes(digest[:4], "big") / 2**32 < self.error_rate
+
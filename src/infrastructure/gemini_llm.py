@@ -1,46 +1,148 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import datetime
+import hashlib
+import io
+import json
 import os
-from typing import List
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Iterator, List
 
-import google.generativeai as genai
+from src.domain.models import BatchJob, BatchRequest, BatchResult, ChatMessage
+from src.domain.ports import AsyncLLMPort, BatchLLMPort, LLMPort
 
-from src.domain.models import ChatMessage
-from src.domain.ports import LLMPort
+if TYPE_CHECKING:
+    # O SDK leva centenas de ms para importar: só quando um adaptador é criado
+    import google.generativeai as genai
 
 
-class GeminiLLMAdapter(LLMPort):
-    def __init__(self, api_key: str | None = None, timeout_s: int = 60) -> None:
+# Mínimo de tokens de entrada do context caching explícito da API do Gemini;
+# abaixo disso CachedContent.create é recusado
+_CONTEXT_CACHE_MIN_TOKENS = {"gemini-2.5-pro": 4_096}
+_CONTEXT_CACHE_MIN_TOKENS_DEFAULT = 1_024
+_CHARS_PER_TOKEN = 4  # mesma estimativa de src.application.tokens
+
+
+@dataclass
+class _CachedModel:
+    client: genai.GenerativeModel
+    expires_at: float = float("inf")
+
+
+class _GeminiBase:
+    def __init__(
+        self,
+        api_key: str | None = None,
+        timeout_s: int = 60,
+        *,
+        client_cache_size: int = 32,
+        context_cache: bool = False,
+        context_cache_ttl_s: int = 3600,
+        context_cache_min_tokens: int | None = None,
+    ) -> None:
         api_key = api_key or os.environ.get("GEMINI_API_KEY")
         if not api_key:
             raise RuntimeError(
                 "GEMINI_API_KEY não configurada. "
                 "Defina a variável de ambiente ou passe api_key no construtor."
             )
+        import google.generativeai as genai
+
         genai.configure(api_key=api_key)
         self.timeout_s = timeout_s
 
-    def chat(self, *, model: str, messages: List[ChatMessage]) -> str:
-        # Separa system prompt das demais mensagens
-        system_parts = [m.content for m in messages if m.role == "system"]
-        conversation = [m for m in messages if m.role != "system"]
+        # Cache de GenerativeModel por (modelo, hash do system prompt). Só o system
+        # prompt estático (AGENT_IDENTITY, _PDF_SYSTEM...) entra na chave, então o
+        # número de entradas é pequeno e estável; 0 desativa o cache.
+        self.client_cache_size = client_cache_size
+        self._clients: OrderedDict[tuple[str, str], _CachedModel] = OrderedDict()
+        self._clients_lock = threading.Lock()
+
+        # Context caching do Gemini para system prompts longos: o prompt estático
+        # é processado uma vez no servidor e reaproveitado pelas chamadas seguintes.
+        # Só vale a partir do mínimo de tokens da API (None = mínimo do modelo).
+        self.context_cache = context_cache
+        self.context_cache_ttl_s = context_cache_ttl_s
+        self.context_cache_min_tokens = context_cache_min_tokens
+
+    def _prepare(self, model: str, messages: List[ChatMessage]) -> tuple[genai.GenerativeModel, list[dict]]:
+        system_instruction, gemini_messages = _to_gemini(messages)
+        client = self._get_client(model, system_instruction)
+        return client, gemini_messages
+
+    def _get_client(self, model: str, system_instruction: str | None) -> genai.GenerativeModel:
+        if self.client_cache_size <= 0:
+            return self._build_client(model, system_instruction).client
+
+        digest = hashlib.sha256((system_instruction or "").encode("utf-8")).hexdigest()
+        key = (model, digest)
 
-        system_instruction = "\n\n".join(system_parts) if system_parts else None
+        with self._clients_lock:
+            entry = self._clients.get(key)
+            if entry is not None and entry.expires_at > time.time():
+                self._clients.move_to_end(key)
+                return entry.client
 
-        client = genai.GenerativeModel(
-            model_name=model,
-            system_instruction=system_instruction,
+        entry = self._build_client(model, system_instruction)
+
+        with self._clients_lock:
+            self._clients[key] = entry
+            self._clients.move_to_end(key)
+            while len(self._clients) > self.client_cache_size:
+                self._clients.popitem(last=False)
+
+        return entry.client
+
+    def _build_client(self, model: str, system_instruction: str | None) -> _CachedModel:
+        import google.generativeai as genai
+
+        if (
+            self.context_cache
+            and system_instruction
+            and len(system_instruction) >= self._context_cache_min_tokens(model) * _CHARS_PER_TOKEN
+        ):
+            try:
+                from google.generativeai import caching
+
+                cached = caching.CachedContent.create(
+                    model=model,
+                    system_instruction=system_instruction,
+                    ttl=datetime.timedelta(seconds=self.context_cache_ttl_s),
+                )
+                # Renova um pouco antes de expirar no servidor
+                return _CachedModel(
+                    client=genai.GenerativeModel.from_cached_content(cached_content=cached),
+                    expires_at=time.time() + self.context_cache_ttl_s * 0.9,
+                )
+            except Exception:
+                # Modelo sem suporte a context caching ou prompt abaixo do mínimo:
+                # segue com o cliente comum (que também fica no cache local).
+                pass
+
+        return _CachedModel(
+            client=genai.GenerativeModel(
+                model_name=model,
+                system_instruction=system_instruction,
+            )
         )
 
-        # Converte para formato do Gemini
-        gemini_messages = [
-            {
-                "role": "model" if m.role == "assistant" else "user",
-                "parts": [m.content],
-            }
-            for m in conversation
-        ]
+    def _context_cache_min_tokens(self, model: str) -> int:
+        if self.context_cache_min_tokens is not None:
+            return self.context_cache_min_tokens
+        name = model.removeprefix("models/")
+        return next(
+            (tokens for prefix, tokens in _CONTEXT_CACHE_MIN_TOKENS.items() if name.startswith(prefix)),
+            _CONTEXT_CACHE_MIN_TOKENS_DEFAULT,
+        )
+
+
+class GeminiLLMAdapter(_GeminiBase, LLMPort):
+    def chat(self, *, model: str, messages: List[ChatMessage]) -> str:
+        client, gemini_messages = self._prepare(model, messages)
 
         response = client.generate_content(
             gemini_messages,
@@ -48,4 +150,179 @@ class GeminiLLMAdapter(LLMPort):
         )
 
         return response.text
-    
\ No newline at end of file
+
+    def stream_chat(self, *, model: str, messages: List[ChatMessage]) -> Iterator[str]:
+        client, gemini_messages = self._prepare(model, messages)
+
+        response = client.generate_content(
+            gemini_messages,
+            stream=True,
+            request_options={"timeout": self.timeout_s},
+        )
+
+        for chunk in response:
+            # Pedaços sem partes (ex.: só metadados de segurança) não têm .text
+            if chunk.parts:
+                yield chunk.text
+
+
+class AsyncGeminiLLMAdapter(_GeminiBase, AsyncLLMPort):
+    async def chat(self, *, model: str, messages: List[ChatMessage]) -> str:
+        client, gemini_messages = self._prepare(model, messages)
+
+        response = await client.generate_content_async(
+            gemini_messages,
+            request_options={"timeout": self.timeout_s},
+        )
+
+        return response.text
+
+    async def stream_chat(self, *, model: str, messages: List[ChatMessage]) -> AsyncIterator[str]:
+        client, gemini_messages = self._prepare(model, messages)
+
+        response = await client.generate_content_async(
+            gemini_messages,
+            stream=True,
+            request_options={"timeout": self.timeout_s},
+        )
+
+        async for chunk in response:
+            if chunk.parts:
+                yield chunk.text
+
+
+# Estados do batch mode do Gemini → estados do BatchLLMPort
+_BATCH_STATES = {
+    "JOB_STATE_PENDING": "pending",
+    "JOB_STATE_QUEUED": "pending",
+    "JOB_STATE_RUNNING": "running",
+    "JOB_STATE_CANCELLING": "running",
+    "JOB_STATE_SUCCEEDED": "completed",
+    "JOB_STATE_PARTIALLY_SUCCEEDED": "completed",
+    "JOB_STATE_FAILED": "failed",
+    "JOB_STATE_EXPIRED": "expired",
+    "JOB_STATE_CANCELLED": "cancelled",
+}
+
+
+class GeminiBatchLLMAdapter(BatchLLMPort):
+    """
+    Batch mode do Gemini (arquivo JSONL com uma requisição por linha, metade do
+    preço). Só existe no SDK novo, google-genai; o restante do projeto segue no
+    google-generativeai.
+    """
+
+    max_requests = 20_000
+    max_bytes = 500 * 1024 * 1024
+
+    def __init__(self, api_key: str | None = None) -> None:
+        api_key = api_key or os.environ.get("GEMINI_API_KEY")
+        if not api_key:
+            raise RuntimeError(
+                "GEMINI_API_KEY não configurada. "
+                "Defina a variável de ambiente ou passe api_key no construtor."
+            )
+        try:
+            from google import genai as google_genai
+        except ImportError as exc:
+            raise RuntimeError(
+                "O modo lote do Gemini usa o SDK google-genai. "
+                "Instale com `pip install google-genai` ou use BATCH_PROVIDER=openai."
+            ) from exc
+        self.client = google_genai.Client(api_key=api_key)
+
+    def submit(self, requests: List[BatchRequest]) -> str:
+        from google.genai import types
+
+        lines = [
+            json.dumps({"key": r.custom_id, "request": _batch_request(r.messages)}, ensure_ascii=False)
+            for r in requests
+        ]
+        upload = self.client.files.upload(
+            file=io.BytesIO(("\n".join(lines) + "\n").encode("utf-8")),
+            config=types.UploadFileConfig(display_name="gf-agent-batch", mime_type="jsonl"),
+        )
+        # O modelo é do job, não de cada requisição
+        job = self.client.batches.create(
+            model=requests[0].model,
+            src=upload.name,
+            config={"display_name": "gf-agent-batch"},
+        )
+        return job.name
+
+    def poll(self, job_id: str) -> BatchJob:
+        job = self.client.batches.get(name=job_id)
+        state = job.state.name if job.state is not None else "JOB_STATE_PENDING"
+        return BatchJob(job_id, _BATCH_STATES.get(state, "running"))
+
+    def results(self, job_id: str) -> List[BatchResult]:
+        job = self.client.batches.get(name=job_id)
+        if job.dest is None or not job.dest.file_name:
+            return []
+        content = self.client.files.download(file=job.dest.file_name)
+        return [
+            _batch_result(json.loads(line))
+            for line in content.decode("utf-8").splitlines()
+            if line.strip()
+        ]
+
+    def cancel(self, job_id: str) -> None:
+        self.client.batches.cancel(name=job_id)
+
+
+def _to_gemini(messages: List[ChatMessage]) -> tuple[str | None, list[dict]]:
+    # Só a primeira mensagem de sistema (o prompt estático do caso de uso) vira
+    # system_instruction. As seguintes são dinâmicas (ex.: resumo do
+    # HistoryManager) e vão como texto no turno do usuário seguinte — se
+    # entrassem na system_instruction, cada resumo novo criaria um cliente (e,
+    # com context caching, um CachedContent cobrado) diferente.
+    system_instruction = next((m.content for m in messages if m.role == "system"), None)
+
+    gemini_messages: list[dict] = []
+    pending: list[str] = []
+    seen_system = False
+    for m in messages:
+        if m.role == "system":
+            if seen_system:
+                pending.append(m.content)
+            seen_system = True
+        elif m.role == "assistant":
+            if pending:
+                gemini_messages.append({"role": "user", "parts": pending})
+                pending = []
+            gemini_messages.append({"role": "model", "parts": [m.content]})
+        else:
+            gemini_messages.append({"role": "user", "parts": [*pending, m.content]})
+            pending = []
+    if pending:
+        gemini_messages.append({"role": "user", "parts": pending})
+
+    return system_instruction, gemini_messages
+
+
+def _batch_request(messages: List[ChatMessage]) -> Dict[str, Any]:
+    # Mesmo mapeamento do _prepare (_to_gemini), no formato JSON da API REST
+    system_instruction, gemini_messages = _to_gemini(messages)
+    request: Dict[str, Any] = {
+        "contents": [
+            {"role": m["role"], "parts": [{"text": part} for part in m["parts"]]}
+            for m in gemini_messages
+        ]
+    }
+    if system_instruction is not None:
+        request["system_instruction"] = {"parts": [{"text": system_instruction}]}
+    return request
+
+
+def _batch_result(row: Dict[str, Any]) -> BatchResult:
+    key = row.get("key", "")
+    if row.get("error"):
+        error = row["error"]
+        return BatchResult(key, error=error.get("message") if isinstance(error, dict) else str(error))
+    candidates = (row.get("response") or {}).get("candidates") or []
+    if not candidates:
+        # Ex.: prompt bloqueado pelos filtros de segurança
+        return BatchResult(key, error="Resposta sem conteúdo (bloqueada ou vazia).")
+    parts = (candidates[0].get("content") or {}).get("parts") or []
+    return BatchResult(key, text="".join(part.get("text", "") for part in parts))
+
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+Pré-processamento das páginas rasterizadas antes do OCR e do Vision.
+
+- Detecta páginas em branco (que não vão nem para o OCR nem para o Vision).
+- Recorta margens vazias.
+- Reduz a imagem para um lado maior máximo configurável.
+- Reencoda para o Vision no menor entre PNG e JPEG/WebP (menos bytes, menos latência e tokens).
+"""
+from __future__ import annotations
+
+import io
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+_MEDIA_TYPES = {
+    "png": "image/png",
+    "jpeg": "image/jpeg",
+    "webp": "image/webp",
+}
+
+
+@dataclass(frozen=True)
+class PreprocessConfig:
+    max_long_edge: int = 1600  # Vision; 0 desativa o redimensionamento
+    ocr_max_long_edge: int = 0  # OCR perde precisão se a imagem encolher demais
+    vision_format: str = "jpeg"  # "png", "jpeg" ou "webp"
+    quality: int = 80
+    crop_margins: bool = True
+    skip_blank_pages: bool = True
+    ink_threshold: int = 200  # pixels mais escuros que isso contam como "tinta"
+    blank_ink_ratio: float = 0.002  # abaixo dessa fração de tinta a página é considerada vazia
+    margin_padding: int = 12
+
+
+@dataclass
+class PreprocessStats:
+    pages: int = 0
+    blank_pages_skipped: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_in - self.bytes_out
+
+    def merge(self, other: PreprocessStats) -> None:
+        self.pages += other.pages
+        self.blank_pages_skipped += other.blank_pages_skipped
+        self.bytes_in += other.bytes_in
+        self.bytes_out += other.bytes_out
+
+
+class PagePreprocessor:
+    def __init__(self, config: Optional[PreprocessConfig] = None) -> None:
+        self.config = config or PreprocessConfig()
+        t = self.config.ink_threshold
+        self._ink_lut = [255 if i < t else 0 for i in range(256)]
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+    def is_blank(self, gray: Image.Image) -> bool:
+        if not self.config.skip_blank_pages:
+            return False
+        hist = gray.histogram()
+        ink = sum(hist[: self.config.ink_threshold])
+        return ink / float(gray.width * gray.height) < self.config.blank_ink_ratio
+
+    def prepare_for_ocr(self, image_bytes: bytes) -> Optional[Image.Image]:
+        """Imagem em tons de cinza pronta para o Tesseract, ou None se a página estiver em branco."""
+        from PIL import Image
+
+        gray = Image.open(io.BytesIO(image_bytes)).convert("L")
+        if self.is_blank(gray):
+            return None
+
+        gray = self._crop(gray, gray)
+        return self._downscale(gray, self.config.ocr_max_long_edge)
+
+    def prepare_for_vision(self, image_bytes: bytes) -> Optional[tuple[bytes, str]]:
+        """(bytes reencodados, media type) ou None se a página estiver em branco."""
+        from PIL import Image
+
+        img = Image.open(io.BytesIO(image_bytes))
+        img.load()
+        original_format = img.format
+        original_size = img.size
+        gray = img.convert("L")
+        if self.is_blank(gray):
+            return None
+
+        # Mantém cor para o Vision (diagramas costumam usar cor com significado),
+        # mas páginas sem cor viram "L": um terço dos bytes no PNG
+        img = self._crop(img, gray)
+        img = self._downscale(img, self.config.max_long_edge)
+        if self._is_grayscale(img):
+            img = img.convert("L")
+
+        fmt = self.config.vision_format.lower()
+        if fmt not in _MEDIA_TYPES:
+            raise ValueError(f"Formato de imagem não suportado para o Vision: {fmt}")
+
+        candidates = []
+
+        png = io.BytesIO()
+        img.save(png, format="PNG", optimize=True)
+        candidates.append((png.getvalue(), _MEDIA_TYPES["png"]))
+
+        if fmt != "png":
+            if fmt == "webp" or img.mode not in ("RGB", "L"):
+                img = img.convert("RGB")
+            lossy = io.BytesIO()
+            img.save(lossy, format=fmt.upper(), quality=self.config.quality)
+            candidates.append((lossy.getvalue(), _MEDIA_TYPES[fmt]))
+
+        # Páginas de texto limpo comprimem melhor em PNG do que em JPEG, e o
+        # reencode pode até inflar o arquivo original: fica com o menor. O original
+        # só concorre se já respeitar o limite de tamanho configurado.
+        original_type = _MEDIA_TYPES.get((original_format or "").lower())
+        max_edge = self.config.max_long_edge
+        if original_type is not None and (max_edge <= 0 or max(original_size) <= max_edge):
+            candidates.append((image_bytes, original_type))
+
+        return min(candidates, key=lambda c: len(c[0]))
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+    def _crop(self, img: Image.Image, gray: Image.Image) -> Image.Image:
+        if not self.config.crop_margins:
+            return img
+
+        bbox = gray.point(self._ink_lut).getbbox()
+        if bbox is None:
+            return img
+
+        pad = self.config.margin_padding
+        left, top, right, bottom = bbox
+        return img.crop((
+            max(0, left - pad),
+            max(0, top - pad),
+            min(img.width, right + pad),
+            min(img.height, bottom + pad),
+        ))
+
+    @staticmethod
+    def _is_grayscale(img: Image.Image) -> bool:
+        if img.mode != "RGB":
+            return False
+
+        from PIL import ImageChops
+
+        r, g, b = img.split()
+        return (
+            ImageChops.difference(r, g).getbbox() is None
+            and ImageChops.difference(g, b).getbbox() is None
+        )
+
+    @staticmethod
+    def _downscale(img: Image.Image, max_long_edge: int) -> Image.Image:
+        if max_long_edge <= 0 or max(img.size) <= max_long_edge:
+            return img
+
+        from PIL import Image
+
+        img = img.copy()
+        img.thumbnail((max_long_edge, max_long_edge), Image.LANCZOS)
+        return img
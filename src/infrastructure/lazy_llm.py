@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+LLMPort construído sob demanda.
+
+Os SDKs dos provedores levam centenas de ms para importar (google.generativeai,
+openai); com o adaptador embrulhado aqui, a importação e a criação do cliente
+acontecem na primeira chamada, não na montagem das dependências. Um provedor
+que nunca recebe tráfego (ex.: reserva do roteador) nunca é importado.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Callable, Iterator, List, Optional
+
+from src.domain.models import ChatMessage, LLMCallInfo
+from src.domain.ports import LLMPort
+
+
+class LazyLLMAdapter(LLMPort):
+    def __init__(self, factory: Callable[[], LLMPort]) -> None:
+        self._factory = factory
+        self._llm: Optional[LLMPort] = None
+        self._lock = threading.Lock()
+
+    @property
+    def built(self) -> bool:
+        return self._llm is not None
+
+    def get(self) -> LLMPort:
+        llm = self._llm
+        if llm is None:
+            with self._lock:
+                if self._llm is None:
+                    # Erros de configuração (ex.: chave ausente) aparecem aqui, a cada
+                    # tentativa, até a construção dar certo
+                    self._llm = self._factory()
+                llm = self._llm
+        return llm
+
+    def chat(self, *, model: str, messages: List[ChatMessage]) -> str:
+        return self.get().chat(model=model, messages=messages)
+
+    def stream_chat(self, *, model: str, messages: List[ChatMessage]) -> Iterator[str]:
+        return self.get().stream_chat(model=model, messages=messages)
+
+    def last_call_info(self) -> Optional[LLMCallInfo]:
+        return self._llm.last_call_info() if self._llm is not None else None
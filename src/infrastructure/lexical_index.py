@@ -0,0 +1,469 @@
+# -*- coding: utf-8 -*-
+"""
+Índice invertido (BM25) em disco sobre o texto extraído dos PDFs.
+
+A unidade de busca é a página: cada "--- Página N ---" do extrator vira um
+documento do BM25, então a busca devolve (documento, página) e não só o
+arquivo. Tokenização voltada ao português: acentos dobrados, stopwords fora,
+plural reduzido ("cláusulas" → "clausula", "contratações" → "contratacao") e
+números normalizados para os dígitos (CNPJ, CPF e valores batem com ou sem
+pontuação: "12.345.678/0001-90" = "12345678000190").
+
+Layout do diretório:
+    meta.json                 versão do formato
+    docs.jsonl                um documento por linha (id, título, faixa de páginas)
+    units.bin                 registro fixo por página (doc, página, tamanho, texto)
+    texts.bin                 texto de cada página, comprimido (zlib), só anexado
+    seg-A-B.postings.u32      postings das páginas [A, B): pares (página, tf) por termo
+    seg-A-B.terms.json        termo → [posição, df] nas postings do segmento
+
+Cada documento adicionado grava um segmento novo (índice incremental, sem
+reescrever o que já existe); segmentos pequenos vizinhos são fundidos em
+camadas, como num LSM. Postings e registros de página são lidos via memmap.
+O docs.jsonl é gravado por último e funciona como commit: o que passou dele
+(escrita interrompida) é descartado ao abrir o índice.
+"""
+from __future__ import annotations
+
+import json
+import math
+import re
+import threading
+import unicodedata
+import zlib
+from collections import Counter
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.domain.models import PageHit
+from src.domain.ports import LexicalIndexPort
+
+_FORMAT_VERSION = 1
+
+# Parâmetros usuais do BM25
+_K1 = 1.2
+_B = 0.75
+
+# Segmentos de uma mesma camada (ordem de grandeza em páginas) fundidos de uma vez
+_MERGE_FACTOR = 8
+
+_SNIPPET_CHARS = 120
+
+_UNIT_DTYPE = np.dtype([
+    ("doc", "<u4"),
+    ("page", "<u4"),
+    ("length", "<u4"),  # termos indexados na página (normalização do BM25)
+    ("size", "<u4"),  # bytes do texto comprimido
+    ("offset", "<u8"),  # posição do texto em texts.bin
+])
+
+# Números com separadores internos ficam num token só; palavras são só letras
+_TOKEN = re.compile(r"\d+(?:[./,-]\d+)*|[^\W\d_]+")
+
+_STOPWORDS = frozenset("""
+    a ao aos as ate com como da das de dela dele deles do dos e ela elas ele eles em
+    entre era essa esse esta estao este eu foi for ha isso isto ja la lhe mais mas me
+    mesmo meu minha muito na nao nas nem no nos nossa nosso num numa o os ou para pela
+    pelas pelo pelos por qual quando que quem se sem ser seu seus sua suas so sao tambem
+    te tem ter um uma umas uns voce
+""".split())
+
+# Redução de plural (subconjunto do passo 1 do RSLP), na ordem em que são testadas
+_PLURAL_RULES: Tuple[Tuple[str, str], ...] = (
+    ("oes", "ao"), ("aes", "ao"), ("ais", "al"), ("eis", "el"), ("ois", "ol"),
+    ("ns", "m"), ("res", "r"), ("les", "l"), ("zes", "z"), ("ses", "s"), ("s", ""),
+)
+
+
+def fold(text: str) -> str:
+    """Minúsculas e sem acentos ("Cláusula" → "clausula")."""
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii").lower()
+
+
+def _stem(word: str) -> str:
+    if len(word) < 4 or word.endswith("ss"):
+        return word
+    for suffix, replacement in _PLURAL_RULES:
+        if word.endswith(suffix):
+            return word[: -len(suffix)] + replacement
+    return word
+
+
+def _term(token: str) -> Optional[str]:
+    """Termo indexado para um token já dobrado (None = descartado)."""
+    if token[0].isdigit():
+        return re.sub(r"\D", "", token)
+    if len(token) < 2 or token in _STOPWORDS:
+        return None
+    return _stem(token)
+
+
+def tokenize(text: str) -> List[str]:
+    terms = []
+    for token in _TOKEN.findall(fold(text)):
+        term = _term(token)
+        if term:
+            terms.append(term)
+    return terms
+
+
+def _snippet(text: str, terms: set[str]) -> str:
+    """Trecho em volta da primeira ocorrência de um termo da consulta."""
+    for m in _TOKEN.finditer(text):
+        folded = fold(m.group())
+        if folded and _term(folded) in terms:
+            start = max(0, m.start() - _SNIPPET_CHARS // 2)
+            end = min(len(text), m.end() + _SNIPPET_CHARS // 2)
+            snippet = " ".join(text[start:end].split())
+            return ("…" if start else "") + snippet + ("…" if end < len(text) else "")
+    return " ".join(text[:_SNIPPET_CHARS].split())
+
+
+@dataclass(frozen=True)
+class _DocEntry:
+    doc_id: str
+    title: str
+    first_unit: int
+    n_units: int
+
+
+class _Segment:
+    """Postings imutáveis das páginas [first, end)."""
+
+    def __init__(self, base: Path, first: int, end: int) -> None:
+        self.base = base
+        self.first = first
+        self.end = end
+        self.terms: Dict[str, List[int]] = json.loads(
+            self.terms_path.read_text(encoding="utf-8")
+        )
+        self.postings = np.memmap(self.postings_path, dtype=np.uint32, mode="r").reshape(-1, 2)
+
+    @staticmethod
+    def name(first: int, end: int) -> str:
+        return f"seg-{first:010d}-{end:010d}"
+
+    @property
+    def terms_path(self) -> Path:
+        return self.base.with_name(self.base.name + ".terms.json")
+
+    @property
+    def postings_path(self) -> Path:
+        return self.base.with_name(self.base.name + ".postings.u32")
+
+    @property
+    def tier(self) -> int:
+        return int(math.log(max(1, self.end - self.first), _MERGE_FACTOR))
+
+    def df(self, term: str) -> int:
+        entry = self.terms.get(term)
+        return 0 if entry is None else entry[1]
+
+    def lookup(self, term: str) -> Optional[np.ndarray]:
+        entry = self.terms.get(term)
+        if entry is None:
+            return None
+        offset, df = entry
+        return self.postings[offset:offset + df]
+
+    def iter_postings(self) -> Iterator[Tuple[str, np.ndarray]]:
+        for term, (offset, df) in self.terms.items():
+            yield term, self.postings[offset:offset + df]
+
+
+def _write_segment(directory: Path, first: int, end: int, postings: Dict[str, np.ndarray]) -> Path:
+    """Grava postings (ordenadas por página) e, por último, o dicionário de termos."""
+    base = directory / _Segment.name(first, end)
+    terms: Dict[str, List[int]] = {}
+    offset = 0
+    tmp_postings = base.with_name(base.name + ".postings.u32.tmp")
+    with tmp_postings.open("wb") as fh:
+        for term in sorted(postings):
+            pairs = postings[term]
+            fh.write(np.ascontiguousarray(pairs, dtype=np.uint32).tobytes())
+            terms[term] = [offset, len(pairs)]
+            offset += len(pairs)
+    tmp_postings.replace(base.with_name(base.name + ".postings.u32"))
+
+    tmp_terms = base.with_name(base.name + ".terms.json.tmp")
+    tmp_terms.write_text(json.dumps(terms, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    tmp_terms.replace(base.with_name(base.name + ".terms.json"))
+    return base
+
+
+class InvertedIndex(LexicalIndexPort):
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._docs_path = self.path / "docs.jsonl"
+        self._units_path = self.path / "units.bin"
+        self._texts_path = self.path / "texts.bin"
+        self._meta_path = self.path / "meta.json"
+
+        if self._meta_path.exists():
+            version = json.loads(self._meta_path.read_text(encoding="utf-8"))["version"]
+            if version != _FORMAT_VERSION:
+                raise ValueError(
+                    f"Índice léxico em {self.path} está no formato {version}; "
+                    f"esta versão lê o formato {_FORMAT_VERSION}. Apague a pasta para reindexar."
+                )
+        else:
+            self._meta_path.write_text(json.dumps({"version": _FORMAT_VERSION}), encoding="utf-8")
+
+        self._lock = threading.Lock()
+        self._docs: List[_DocEntry] = []
+        self._doc_index: Dict[str, int] = {}
+        if self._docs_path.exists():
+            with self._docs_path.open(encoding="utf-8") as fh:
+                for line in fh:
+                    self._append_doc(_DocEntry(**json.loads(line)))
+
+        self._n_units = sum(d.n_units for d in self._docs)
+        self._units: Optional[np.memmap] = None
+        self._recover()
+        units = self._get_units()
+        self._total_length = 0 if units is None else int(units["length"].sum(dtype=np.uint64))
+        self._segments = self._load_segments()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    @property
+    def pages(self) -> int:
+        return self._n_units
+
+    def has_document(self, doc_id: str) -> bool:
+        return doc_id in self._doc_index
+
+    def add_document(self, *, doc_id: str, title: str, pages: Sequence[Tuple[int, str]]) -> int:
+        """Indexa as páginas (número, texto) do documento, uma vez por doc_id."""
+        # Tokenização fora do lock: vários workers do lote indexam em paralelo
+        counted = [(number, text, Counter(tokenize(text))) for number, text in pages]
+        if not counted:
+            return 0
+
+        with self._lock:
+            if doc_id in self._doc_index:
+                return 0
+            doc = _DocEntry(doc_id=doc_id, title=title, first_unit=self._n_units, n_units=len(counted))
+            doc_number = len(self._docs)
+
+            records = np.zeros(len(counted), dtype=_UNIT_DTYPE)
+            postings: Dict[str, List[Tuple[int, int]]] = {}
+            with self._texts_path.open("ab") as fh:
+                offset = fh.tell()
+                for i, (number, text, counts) in enumerate(counted):
+                    blob = zlib.compress(text.encode("utf-8"), 6)
+                    fh.write(blob)
+                    records[i] = (doc_number, number, sum(counts.values()), len(blob), offset)
+                    offset += len(blob)
+                    for term, tf in counts.items():
+                        postings.setdefault(term, []).append((doc.first_unit + i, tf))
+            with self._units_path.open("ab") as fh:
+                fh.write(records.tobytes())
+
+            end = doc.first_unit + doc.n_units
+            if postings:
+                base = _write_segment(
+                    self.path, doc.first_unit, end,
+                    {term: np.asarray(pairs, dtype=np.uint32) for term, pairs in postings.items()},
+                )
+                self._segments.append(_Segment(base, doc.first_unit, end))
+
+            with self._docs_path.open("a", encoding="utf-8") as fh:
+                fh.write(json.dumps(asdict(doc), ensure_ascii=False) + "\n")
+
+            self._append_doc(doc)
+            self._n_units = end
+            self._total_length += int(records["length"].sum())
+            self._units = None  # reabre o memmap com o novo tamanho na próxima leitura
+            self._maybe_merge()
+        return doc.n_units
+
+    def search(
+        self,
+        query: str,
+        k: int,
+        *,
+        doc_id: Optional[str] = None,
+        max_per_document: Optional[int] = None,
+    ) -> List[PageHit]:
+        terms = list(dict.fromkeys(tokenize(query)))
+        with self._lock:
+            segments = list(self._segments)
+            n_units = self._n_units
+            avg_length = self._total_length / n_units if n_units else 0.0
+        units = self._get_units()
+        if not terms or units is None or k <= 0:
+            return []
+
+        lo, hi = 0, n_units
+        if doc_id is not None:
+            if doc_id not in self._doc_index:
+                return []
+            doc = self._docs[self._doc_index[doc_id]]
+            lo, hi = doc.first_unit, doc.first_unit + doc.n_units
+
+        scores = np.zeros(hi - lo, dtype=np.float32)
+        lengths = units["length"][lo:hi].astype(np.float32)
+        norm = _K1 * (1 - _B + _B * lengths / max(avg_length, 1e-9))
+        for term in terms:
+            df = sum(seg.df(term) for seg in segments)
+            if df == 0:
+                continue
+            idf = math.log(1 + (n_units - df + 0.5) / (df + 0.5))
+            for seg in segments:
+                if seg.end <= lo or seg.first >= hi:
+                    continue
+                pairs = seg.lookup(term)
+                if pairs is None:
+                    continue
+                ids = pairs[:, 0].astype(np.int64)
+                keep = (ids >= lo) & (ids < hi)
+                ids = ids[keep] - lo
+                tf = pairs[keep, 1].astype(np.float32)
+                scores[ids] += idf * tf * (_K1 + 1) / (tf + norm[ids])
+
+        candidates = np.flatnonzero(scores)
+        if max_per_document is None and len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        hits: List[PageHit] = []
+        per_doc: Counter[int] = Counter()
+        wanted = set(terms)
+        for i in candidates:
+            record = units[lo + int(i)]
+            doc_number = int(record["doc"])
+            if max_per_document is not None:
+                if per_doc[doc_number] >= max_per_document:
+                    continue
+                per_doc[doc_number] += 1
+            doc = self._docs[doc_number]
+            hits.append(PageHit(
+                doc_id=doc.doc_id,
+                title=doc.title,
+                page=int(record["page"]),
+                score=float(scores[i]),
+                snippet=_snippet(self._read_text(record), wanted),
+            ))
+            if len(hits) >= k:
+                break
+        return hits
+
+    def page_text(self, doc_id: str, page: int) -> Optional[str]:
+        units = self._get_units()
+        if units is None or doc_id not in self._doc_index:
+            return None
+        doc = self._docs[self._doc_index[doc_id]]
+        records = units[doc.first_unit:doc.first_unit + doc.n_units]
+        match = np.flatnonzero(records["page"] == page)
+        return self._read_text(records[int(match[0])]) if len(match) else None
+
+    def compact(self) -> None:
+        """Funde todos os segmentos num só (ex.: depois de uma carga grande pelo lote)."""
+        with self._lock:
+            if len(self._segments) > 1:
+                self._merge(list(self._segments))
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+    def _append_doc(self, doc: _DocEntry) -> None:
+        self._doc_index[doc.doc_id] = len(self._docs)
+        self._docs.append(doc)
+
+    def _get_units(self) -> Optional[np.memmap]:
+        with self._lock:
+            if self._n_units == 0:
+                return None
+            if self._units is None or self._units.shape[0] != self._n_units:
+                self._units = np.memmap(
+                    self._units_path, dtype=_UNIT_DTYPE, mode="r", shape=(self._n_units,)
+                )
+            return self._units
+
+    def _read_text(self, record: np.void) -> str:
+        with self._texts_path.open("rb") as fh:
+            fh.seek(int(record["offset"]))
+            return zlib.decompress(fh.read(int(record["size"]))).decode("utf-8")
+
+    def _recover(self) -> None:
+        """Escrita interrompida: descarta páginas e texto além do último documento gravado."""
+        n_units = self._units_path.stat().st_size // _UNIT_DTYPE.itemsize if self._units_path.exists() else 0
+        if n_units < self._n_units:
+            raise ValueError(f"Índice léxico em {self.path} está corrompido (units.bin incompleto).")
+        if n_units > self._n_units:
+            with self._units_path.open("r+b") as fh:
+                fh.truncate(self._n_units * _UNIT_DTYPE.itemsize)
+
+        units = self._get_units()
+        text_end = 0 if units is None else int(units[-1]["offset"]) + int(units[-1]["size"])
+        if self._texts_path.exists() and self._texts_path.stat().st_size > text_end:
+            with self._texts_path.open("r+b") as fh:
+                fh.truncate(text_end)
+
+    def _load_segments(self) -> List[_Segment]:
+        """
+        Segmentos válidos em ordem. Sobras de uma fusão interrompida (segmentos
+        contidos num maior) e de um documento não confirmado são apagadas.
+        """
+        found = []
+        for terms_path in self.path.glob("seg-*.terms.json"):
+            _, first, end = terms_path.name.split(".")[0].split("-")
+            found.append((int(first), int(end), terms_path.with_name(terms_path.name.split(".")[0])))
+        found.sort(key=lambda item: (item[0], -item[1]))
+
+        segments: List[_Segment] = []
+        covered = 0
+        for first, end, base in found:
+            if first >= covered and end <= self._n_units:
+                segments.append(_Segment(base, first, end))
+                covered = end
+            else:
+                _remove_segment_files(base)
+
+        live = {seg.base.name for seg in segments}
+        for orphan in self.path.glob("seg-*"):
+            if orphan.name.split(".")[0] not in live:
+                orphan.unlink(missing_ok=True)
+        return segments
+
+    def _maybe_merge(self) -> None:
+        # Procura uma sequência contígua de segmentos da mesma camada
+        run: List[_Segment] = []
+        for seg in self._segments:
+            if run and seg.tier != run[-1].tier:
+                run = []
+            run.append(seg)
+            if len(run) >= _MERGE_FACTOR:
+                self._merge(run)
+                self._maybe_merge()  # a fusão pode completar uma camada acima
+                return
+
+    def _merge(self, group: List[_Segment]) -> None:
+        first, end = group[0].first, group[-1].end
+        parts: Dict[str, List[np.ndarray]] = {}
+        for seg in group:  # segmentos em ordem de página: a concatenação já sai ordenada
+            for term, pairs in seg.iter_postings():
+                parts.setdefault(term, []).append(pairs)
+        base = _write_segment(
+            self.path, first, end, {term: np.concatenate(arrays) for term, arrays in parts.items()}
+        )
+
+        merged = _Segment(base, first, end)
+        start = self._segments.index(group[0])
+        self._segments[start:start + len(group)] = [merged]
+        for seg in group:
+            _remove_segment_files(seg.base)
+
+
+def _remove_segment_files(base: Path) -> None:
+    for suffix in (".terms.json", ".postings.u32"):
+        try:
+            base.with_name(base.name + suffix).unlink(missing_ok=True)
+        except OSError:
+            pass  # ainda mapeado (Windows); sai na próxima abertura, por estar contido no fundido
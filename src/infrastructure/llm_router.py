@@ -0,0 +1,324 @@
+# -*- coding: utf-8 -*-
+"""
+Roteador entre provedores de LLM (Gemini, OpenAI, Anthropic).
+
+- Escolhe o provedor pelas estatísticas recentes (latência p50 e taxa de erro
+  numa janela deslizante); provedores sem histórico são testados primeiro.
+- Failover: erro ou timeout num provedor passa a vez ao próximo. Só timeout,
+  5xx, 429 e falha de conexão põem o provedor em espera (cooldown); erros do
+  pedido (4xx, conteúdo) não dizem nada sobre a saúde do provedor.
+- Hedging (opcional): se o provedor escolhido passar do p95 da própria latência,
+  uma requisição duplicada vai para o próximo; vale a primeira que responder e
+  a outra é descartada (stream fechado / resultado ignorado).
+
+Em streaming, "responder" é entregar o primeiro pedaço — failover e hedging
+só acontecem antes disso. Os relógios de timeout e hedge começam quando a
+chamada começa a rodar no pool, não quando é submetida: espera na fila não é
+latência do provedor.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Iterator, List, Optional, TypeVar
+
+from src.domain.models import ChatMessage, LLMCallInfo
+from src.domain.ports import LLMPort
+from src.telemetry import bind, span
+
+T = TypeVar("T")
+
+_WINDOW = 50  # chamadas consideradas nas estatísticas de cada provedor
+_MIN_SAMPLES_FOR_P95 = 5
+_START_POLL_S = 0.05  # enquanto alguma tentativa espera na fila do pool
+
+
+@dataclass(frozen=True)
+class ProviderRoute:
+    name: str
+    llm: LLMPort
+    model: Optional[str] = None  # None = usa o modelo pedido pelo chamador
+
+
+@dataclass(frozen=True)
+class ProviderStats:
+    name: str
+    calls: int
+    error_rate: float
+    p50_ms: Optional[int]
+    p95_ms: Optional[int]
+
+
+class _RollingStats:
+    def __init__(self, window: int) -> None:
+        self.latencies: deque[float] = deque(maxlen=window)
+        self.outcomes: deque[bool] = deque(maxlen=window)
+        self.cooldown_until = 0.0
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    @property
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+
+class _NoResponse(Exception):
+    """Stream que terminou sem nenhum pedaço — conta como falha do provedor."""
+
+
+class _Attempt:
+    __slots__ = ("route", "started")
+
+    def __init__(self, route: ProviderRoute) -> None:
+        self.route = route
+        self.started: Optional[float] = None  # preenchido quando a thread do pool começa
+
+
+def _is_transient(exc: Exception) -> bool:
+    # openai/anthropic: status_code; google.api_core: code (status HTTP)
+    status = getattr(exc, "status_code", None)
+    if not isinstance(status, int):
+        status = getattr(exc, "code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+
+    # Erros de conexão/timeout dos SDKs não têm status HTTP
+    name = type(exc).__name__
+    return "Connection" in name or "Timeout" in name or isinstance(exc, (ConnectionError, TimeoutError))
+
+
+def _prime(chunks: Iterator[str]) -> tuple[str, Iterator[str]]:
+    # Lê o primeiro pedaço fora da thread do chamador (é o que define o vencedor)
+    for chunk in chunks:
+        return chunk, chunks
+    raise _NoResponse("stream vazio")
+
+
+def _close(primed: tuple[str, Iterator[str]]) -> None:
+    close = getattr(primed[1], "close", None)
+    if close is not None:
+        close()
+
+
+class RoutingLLMAdapter(LLMPort):
+    def __init__(
+        self,
+        routes: List[ProviderRoute],
+        *,
+        timeout_s: float = 60.0,
+        hedge: bool = True,
+        hedge_default_s: float = 8.0,
+        hedge_min_s: float = 1.0,
+        error_cooldown_s: float = 30.0,
+        window: int = _WINDOW,
+        max_concurrency: int = 8,
+    ) -> None:
+        """`max_concurrency`: chamadas simultâneas esperadas (ex.: API_MAX_CONCURRENCY)."""
+        if not routes:
+            raise RuntimeError("Nenhum provedor de LLM configurado.")
+
+        self.routes = list(routes)
+        self.timeout_s = timeout_s
+        self.hedge = hedge and len(self.routes) > 1
+        self.hedge_default_s = hedge_default_s
+        self.hedge_min_s = hedge_min_s
+        self.error_cooldown_s = error_cooldown_s
+
+        self._stats = {r.name: _RollingStats(window) for r in self.routes}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # Cada chamada ocupa até duas threads (original + hedge); chamadas abandonadas
+        # por timeout seguem ocupando a sua até o SDK desistir
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, max_concurrency) * (2 if self.hedge else 1) + len(self.routes),
+            thread_name_prefix="llm-router",
+        )
+
+    # ------------------------------------------------------------------
+    # LLMPort
+    # ------------------------------------------------------------------
+    def chat(self, *, model: str, messages: List[ChatMessage]) -> str:
+        return self._race(
+            lambda r: r.llm.chat(model=r.model or model, messages=messages),
+            requested_model=model,
+        )
+
+    def stream_chat(self, *, model: str, messages: List[ChatMessage]) -> Iterator[str]:
+        first, rest = self._race(
+            lambda r: _prime(r.llm.stream_chat(model=r.model or model, messages=messages)),
+            requested_model=model,
+            discard=_close,
+        )
+        yield first
+        yield from rest
+
+    def last_call_info(self) -> Optional[LLMCallInfo]:
+        return getattr(self._local, "info", None)
+
+    # ------------------------------------------------------------------
+    # Métricas
+    # ------------------------------------------------------------------
+    def stats(self) -> List[ProviderStats]:
+        with self._lock:
+            out = []
+            for route in self.routes:
+                s = self._stats[route.name]
+                p50, p95 = s.percentile(0.5), s.percentile(0.95)
+                out.append(ProviderStats(
+                    name=route.name,
+                    calls=len(s.outcomes),
+                    error_rate=s.error_rate,
+                    p50_ms=None if p50 is None else int(p50 * 1000),
+                    p95_ms=None if p95 is None else int(p95 * 1000),
+                ))
+            return out
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+    def _ranked(self) -> List[ProviderRoute]:
+        now = time.monotonic()
+        with self._lock:
+            def _score(item: tuple[int, ProviderRoute]) -> tuple:
+                position, route = item
+                s = self._stats[route.name]
+                p50 = s.percentile(0.5)
+                cooling = s.cooldown_until > now
+                # Sem histórico: score 0 para ganhar amostras; depois latência penalizada por erros
+                score = 0.0 if p50 is None else p50 * (1.0 + 4.0 * s.error_rate)
+                return cooling, score, position
+
+            return [r for _, r in sorted(enumerate(self.routes), key=_score)]
+
+    def _hedge_after_s(self, route: ProviderRoute) -> float:
+        with self._lock:
+            s = self._stats[route.name]
+            p95 = s.percentile(0.95) if len(s.latencies) >= _MIN_SAMPLES_FOR_P95 else None
+        return self.hedge_default_s if p95 is None else max(self.hedge_min_s, p95)
+
+    def _record(
+        self, route: ProviderRoute, *, ok: bool, latency_s: float, cooldown: bool = False
+    ) -> None:
+        with self._lock:
+            s = self._stats[route.name]
+            s.outcomes.append(ok)
+            if ok:
+                s.latencies.append(latency_s)
+            elif cooldown:
+                s.cooldown_until = time.monotonic() + self.error_cooldown_s
+
+    def _race(
+        self,
+        call: Callable[[ProviderRoute], T],
+        *,
+        requested_model: str,
+        discard: Optional[Callable[[T], None]] = None,
+    ) -> T:
+        queue = self._ranked()
+        pending: dict[Future, _Attempt] = {}
+        errors: List[str] = []
+        hedged = False
+
+        def _attempt(attempt: _Attempt) -> T:
+            attempt.started = time.monotonic()
+            # Em streaming, mede até o primeiro pedaço (é o que decide a corrida)
+            with span(f"llm.provider.{attempt.route.name}", hedge=hedged):
+                return call(attempt.route)
+
+        def _launch() -> _Attempt:
+            attempt = _Attempt(queue.pop(0))
+            # bind: o span do provedor entra no trace de quem chamou, não no da thread do pool
+            pending[self._pool.submit(bind(_attempt), attempt)] = attempt
+            return attempt
+
+        def _abandon(future: Future, *, record: bool) -> None:
+            # O perdedor não é interrompido no meio da chamada HTTP: o resultado é descartado,
+            # mas a latência real entra nas estatísticas (senão o provedor lento nunca perde a vez)
+            attempt = pending.pop(future)
+            if future.cancel():
+                return
+
+            def _done(f: Future) -> None:
+                exc = f.exception()
+                if record and attempt.started is not None:
+                    self._record(
+                        attempt.route,
+                        ok=exc is None,
+                        latency_s=time.monotonic() - attempt.started,
+                        cooldown=exc is not None and _is_transient(exc),
+                    )
+                if exc is None and discard is not None:
+                    discard(f.result())
+
+            future.add_done_callback(_done)
+
+        primary = _launch()
+        hedge_after_s = self._hedge_after_s(primary.route)
+
+        while pending:
+            now = time.monotonic()
+            deadlines = [a.started + self.timeout_s for a in pending.values() if a.started is not None]
+            if any(a.started is None for a in pending.values()):
+                # Ainda na fila do pool: volta logo para ligar os relógios quando começar
+                deadlines.append(now + _START_POLL_S)
+            if self.hedge and not hedged and queue and primary.started is not None:
+                deadlines.append(primary.started + hedge_after_s)
+            done, _ = wait(pending, timeout=max(0.0, min(deadlines) - now), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                attempt = pending.pop(future)
+                latency = time.monotonic() - (attempt.started or time.monotonic())
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    self._record(attempt.route, ok=False, latency_s=latency, cooldown=_is_transient(exc))
+                    errors.append(f"{attempt.route.name}: {type(exc).__name__}: {exc}")
+                    continue
+
+                self._record(attempt.route, ok=True, latency_s=latency)
+                for other in list(pending):
+                    _abandon(other, record=True)
+                self._set_info(attempt.route, requested_model, hedged=hedged, failovers=len(errors))
+                return result
+
+            now = time.monotonic()
+            for future, attempt in list(pending.items()):
+                if attempt.started is not None and now - attempt.started >= self.timeout_s:
+                    _abandon(future, record=False)
+                    self._record(attempt.route, ok=False, latency_s=now - attempt.started, cooldown=True)
+                    errors.append(f"{attempt.route.name}: timeout após {self.timeout_s:.0f}s")
+
+            if (
+                self.hedge and not hedged and queue and pending
+                and primary.started is not None and now >= primary.started + hedge_after_s
+            ):
+                hedged = True
+                _launch()
+            elif not pending and queue:
+                # Failover: a nova tentativa vira a principal, com o próprio relógio de hedge
+                primary = _launch()
+                hedge_after_s = self._hedge_after_s(primary.route)
+
+        raise RuntimeError("Todos os provedores de LLM falharam. " + " | ".join(errors))
+
+    def _set_info(
+        self,
+        route: ProviderRoute,
+        requested_model: str,
+        *,
+        hedged: bool,
+        failovers: int,
+    ) -> None:
+        self._local.info = LLMCallInfo(
+            provider=route.name,
+            provider_model=route.model or requested_model,
+            hedged=hedged,
+            failovers=failovers,
+        )
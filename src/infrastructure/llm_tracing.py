@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+Decorador de LLMPort que mede cada chamada como um span ("llm.chat" /
+"llm.stream"), com o modelo e o que o adaptador interno informou (status do
+cache, provedor que respondeu). Fica por fora de cache e roteador: o tempo
+medido é o que o caso de uso de fato esperou.
+"""
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.domain.models import ChatMessage, LLMCallInfo
+from src.domain.ports import LLMPort
+from src.telemetry import span
+
+
+def _call_attrs(info: Optional[LLMCallInfo]) -> Dict[str, Any]:
+    if info is None:
+        return {}
+    return {
+        "cache_status": info.cache_status,
+        "provider": info.provider,
+        "hedged": info.hedged,
+        "failovers": info.failovers,
+    }
+
+
+class TracingLLMAdapter(LLMPort):
+    def __init__(self, llm: LLMPort) -> None:
+        self.llm = llm
+
+    def chat(self, *, model: str, messages: List[ChatMessage]) -> str:
+        with span("llm.chat", model=model) as attrs:
+            text = self.llm.chat(model=model, messages=messages)
+            attrs.update(_call_attrs(self.llm.last_call_info()))
+        return text
+
+    def stream_chat(self, *, model: str, messages: List[ChatMessage]) -> Iterator[str]:
+        with span("llm.stream", model=model) as attrs:
+            start = time.perf_counter_ns()
+            for chunk in self.llm.stream_chat(model=model, messages=messages):
+                if "ttft_ms" not in attrs:
+                    attrs["ttft_ms"] = (time.perf_counter_ns() - start) // 1_000_000
+                yield chunk
+            attrs.update(_call_attrs(self.llm.last_call_info()))
+
+    def last_call_info(self) -> Optional[LLMCallInfo]:
+        return self.llm.last_call_info()
@@ -1,17 +1,30 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import json
 import os
-from typing import List
+from typing import Any, AsyncIterator, Dict, Iterator, List
 
-from openai import OpenAI
+from src.domain.models import BatchJob, BatchRequest, BatchResult, ChatMessage
+from src.domain.ports import AsyncLLMPort, BatchLLMPort, LLMPort
 
-from src.domain.models import ChatMessage
-from src.domain.ports import LLMPort
+# Status do Batch API → estados do BatchLLMPort
+_BATCH_STATES = {
+    "validating": "pending",
+    "in_progress": "running",
+    "finalizing": "running",
+    "cancelling": "running",
+    "completed": "completed",
+    "failed": "failed",
+    "expired": "expired",
+    "cancelled": "cancelled",
+}
 
 
 class OpenAILLMAdapter(LLMPort):
     def __init__(self, api_key: str | None = None) -> None:
+        from openai import OpenAI
+
         api_key = api_key or os.environ.get("OPENAI_API_KEY")
         if not api_key:
             raise RuntimeError(
@@ -28,4 +41,137 @@ class OpenAILLMAdapter(LLMPort):
             messages=payload,
         )
 
-        return response.choices[0].message.content
\ No newline at end of file
+        return response.choices[0].message.content
+
+    def stream_chat(self, *, model: str, messages: List[ChatMessage]) -> Iterator[str]:
+        payload = [{"role": m.role, "content": m.content} for m in messages]
+
+        stream = self.client.chat.completions.create(
+            model=model,
+            messages=payload,
+            stream=True,
+        )
+
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+class AsyncOpenAILLMAdapter(AsyncLLMPort):
+    def __init__(self, api_key: str | None = None) -> None:
+        from openai import AsyncOpenAI
+
+        api_key = api_key or os.environ.get("OPENAI_API_KEY")
+        if not api_key:
+            raise RuntimeError(
+                "OPENAI_API_KEY não configurada. "
+                "Defina a variável de ambiente ou passe api_key no construtor."
+            )
+        # Um único cliente: o pool de conexões HTTP é compartilhado entre as corrotinas
+        self.client = AsyncOpenAI(api_key=api_key)
+
+    async def chat(self, *, model: str, messages: List[ChatMessage]) -> str:
+        payload = [{"role": m.role, "content": m.content} for m in messages]
+
+        response = await self.client.chat.completions.create(
+            model=model,
+            messages=payload,
+        )
+
+        return response.choices[0].message.content
+
+    async def stream_chat(self, *, model: str, messages: List[ChatMessage]) -> AsyncIterator[str]:
+        payload = [{"role": m.role, "content": m.content} for m in messages]
+
+        stream = await self.client.chat.completions.create(
+            model=model,
+            messages=payload,
+            stream=True,
+        )
+
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+class OpenAIBatchLLMAdapter(BatchLLMPort):
+    """Batch API da OpenAI: arquivo JSONL de entrada, resultados em até 24 h, metade do preço."""
+
+    # Limites do Batch API por arquivo (50 mil requisições, 200 MB), com folga no tamanho
+    max_requests = 50_000
+    max_bytes = 180 * 1024 * 1024
+
+    def __init__(self, api_key: str | None = None, *, completion_window: str = "24h") -> None:
+        from openai import OpenAI
+
+        api_key = api_key or os.environ.get("OPENAI_API_KEY")
+        if not api_key:
+            raise RuntimeError(
+                "OPENAI_API_KEY não configurada. "
+                "Defina a variável de ambiente ou passe api_key no construtor."
+            )
+        self.client = OpenAI(api_key=api_key)
+        self.completion_window = completion_window
+
+    def submit(self, requests: List[BatchRequest]) -> str:
+        lines = [
+            json.dumps(
+                {
+                    "custom_id": r.custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": r.model,
+                        "messages": [{"role": m.role, "content": m.content} for m in r.messages],
+                    },
+                },
+                ensure_ascii=False,
+            )
+            for r in requests
+        ]
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+        upload = self.client.files.create(file=("batch.jsonl", data), purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=upload.id,
+            endpoint="/v1/chat/completions",
+            completion_window=self.completion_window,
+        )
+        return batch.id
+
+    def poll(self, job_id: str) -> BatchJob:
+        batch = self.client.batches.retrieve(job_id)
+        counts = batch.request_counts
+        return BatchJob(
+            job_id,
+            _BATCH_STATES.get(batch.status, "running"),
+            total=counts.total if counts else 0,
+            completed=counts.completed if counts else 0,
+            failed=counts.failed if counts else 0,
+        )
+
+    def results(self, job_id: str) -> List[BatchResult]:
+        batch = self.client.batches.retrieve(job_id)
+        results: List[BatchResult] = []
+        # Respostas com sucesso e com erro vêm em arquivos separados
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in self.client.files.content(file_id).text.splitlines():
+                if line.strip():
+                    results.append(_batch_result(json.loads(line)))
+        return results
+
+    def cancel(self, job_id: str) -> None:
+        self.client.batches.cancel(job_id)
+
+
+def _batch_result(row: Dict[str, Any]) -> BatchResult:
+    custom_id = row["custom_id"]
+    response = row.get("response") or {}
+    body = response.get("body") or {}
+    if row.get("error") or response.get("status_code") != 200:
+        error = row.get("error") or body.get("error") or {}
+        message = error.get("message") if isinstance(error, dict) else str(error)
+        return BatchResult(custom_id, error=message or f"HTTP {response.get('status_code')}")
+    return BatchResult(custom_id, text=body["choices"][0]["message"]["content"] or "")
+
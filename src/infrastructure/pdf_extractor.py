@@ -1,196 +1,500 @@
 from __future__ import annotations
 
-import base64
+import hashlib
 import io
 import os
-import glob
-import subprocess
-import tempfile
-from dataclasses import dataclass
+import shutil
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Optional, TypeVar
 
-from pypdf import PdfReader
+from src.infrastructure.image_preprocessing import (
+    PagePreprocessor,
+    PreprocessConfig,
+    PreprocessStats,
+)
+from src.infrastructure.rasterizer import PageRasterizer, default_rasterizer
+from src.infrastructure.vision_analyzer import ClaudeVisionAnalyzer
+from src.telemetry import span
+
+if TYPE_CHECKING:
+    from pypdf import PdfReader
+
+    from src.infrastructure.extraction_cache import PdfExtractionCache
+
+# Faz parte da chave do cache — incremente ao mudar a lógica de extração
+EXTRACTOR_VERSION = "3"
+
+
+@dataclass(frozen=True)
+class PageExtract:
+    number: int
+    method: str  # "text", "ocr", "vision" ou "empty"
+    text: str
+    # Pedia Vision, mas ficou com o OCR porque o Vision não estava disponível: não
+    # vai para o cache, para ser refeita quando a chave da Anthropic existir
+    degraded: bool = False
 
 
 @dataclass(frozen=True)
 class PdfExtractResult:
     text: str
     pages: int
-    method: str  # "text", "ocr" ou "vision"
+    method: str  # "text", "ocr", "vision" ou "hybrid" (métodos diferentes por página)
+    page_results: tuple[PageExtract, ...] = ()
+    image_stats: Optional[PreprocessStats] = None
+
+    @property
+    def page_methods(self) -> dict[int, str]:
+        return {p.number: p.method for p in self.page_results}
+
+
+# (etapa, páginas concluídas, páginas da etapa) — etapas: "text", "ocr", "vision"
+ProgressCallback = Callable[[str, int, int], None]
+
+
+def _noop_progress(stage: str, done: int, total: int) -> None:
+    pass
+
+
+def _open_pdf(file_bytes: bytes) -> PdfReader:
+    # Import adiado: quem só monta as dependências (UI, API) não paga pelo pypdf
+    from pypdf import PdfReader
+
+    return PdfReader(io.BytesIO(file_bytes), strict=False)
+
+
+T = TypeVar("T")
+
+
+def _timed(items: Iterable[T], name: str) -> Iterator[T]:
+    # Mede só a produção de cada item (ex.: rasterização), não o trabalho do consumidor
+    it = iter(items)
+    while True:
+        with span(name):
+            item = next(it, None)
+        if item is None:
+            return
+        yield item
+
 
+# Abaixo disso a camada de texto da página é considerada vazia → OCR
+_TEXT_MIN_CHARS = 20
 
-# Threshold mínimo de caracteres para considerar que o OCR funcionou bem
+# Threshold mínimo de caracteres para considerar que o OCR da página funcionou bem
 _OCR_MIN_CHARS = 100
 
+# Instalação padrão no Windows (ver README)
+_WINDOWS_TESSERACT_CMD = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
 
-class PdfTextExtractor:
-    def extract(self, file_bytes: bytes, *, max_pages: Optional[int] = None) -> PdfExtractResult:
-        # 1) Tenta extrair texto normal (PDF com texto selecionável)
-        reader = PdfReader(io.BytesIO(file_bytes), strict=False)
-        total_pages = len(reader.pages)
-        pages_to_read = total_pages if max_pages is None else min(total_pages, max_pages)
+_PAGE_HEADERS = {
+    "text": "--- Página {n} ---",
+    "ocr": "--- Página {n} (OCR) ---",
+    "vision": "--- Página {n} (Vision) ---",
+}
 
-        parts: list[str] = []
-        for i in range(pages_to_read):
-            page_text = (reader.pages[i].extract_text() or "").strip()
-            if page_text:
-                parts.append(f"\n--- Página {i+1} ---\n{page_text}")
 
-        text = "\n".join(parts).strip()
+def find_tesseract(tesseract_cmd: Optional[str] = None) -> str:
+    """Caminho configurado (TESSERACT_CMD) se existir; senão o `tesseract` do PATH."""
+    candidates = [tesseract_cmd] if tesseract_cmd else []
+    if os.name == "nt":
+        candidates.append(_WINDOWS_TESSERACT_CMD)
 
-        if text:
-            return PdfExtractResult(text=text, pages=total_pages, method="text")
+    for candidate in candidates:
+        if Path(candidate).exists():
+            return candidate
+        found = shutil.which(candidate)
+        if found:
+            return found
 
-        # 2) PDF sem texto → tenta OCR
-        return self._extract_with_ocr(file_bytes, pages_to_read, total_pages)
+    # Sem instalação encontrada: o pytesseract explica o erro quando o OCR for necessário
+    return shutil.which("tesseract") or "tesseract"
 
-    # ------------------------------------------------------------------
-    # OCR via Tesseract + Poppler
-    # ------------------------------------------------------------------
-    def _extract_with_ocr(
+
+def _ocr_image(img_gray) -> str:
+    import pytesseract
+
+    try:
+        return pytesseract.image_to_string(
+            img_gray, lang="por+eng", config="--psm 3"
+        ).strip()
+    except Exception:
+        return pytesseract.image_to_string(
+            img_gray, lang="eng", config="--psm 3"
+        ).strip()
+
+
+def _ocr_png_worker(
+    task: tuple[int, bytes, str, PreprocessConfig],
+) -> tuple[int, str, Optional[bytes]]:
+    """
+    Faz OCR de uma página já rasterizada.
+    Roda em processo separado — precisa ser uma função de módulo (picklable).
+    Páginas em branco voltam com bytes None e não passam pelo Tesseract.
+    """
+    import pytesseract
+
+    page, png_bytes, tesseract_cmd, prep_config = task
+    pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+    img_gray = PagePreprocessor(prep_config).prepare_for_ocr(png_bytes)
+    if img_gray is None:
+        return page, "", None
+    return page, _ocr_image(img_gray), png_bytes
+
+
+def format_page(page: PageExtract) -> str:
+    """Texto da página com o marcador "--- Página N ---" (vazio para páginas sem conteúdo)."""
+    if page.method == "empty":
+        return ""
+    return f"\n{_PAGE_HEADERS[page.method].format(n=page.number)}\n{page.text}"
+
+
+def overall_method(page_methods: Iterable[str]) -> str:
+    methods = {m for m in page_methods if m != "empty"}
+    if len(methods) == 1:
+        return methods.pop()
+    return "hybrid" if methods else "text"
+
+
+def _assemble(
+    pages: list[PageExtract],
+    total_pages: int,
+    image_stats: Optional[PreprocessStats] = None,
+) -> PdfExtractResult:
+    parts = [format_page(p) for p in pages if p.method != "empty"]
+
+    return PdfExtractResult(
+        text="\n".join(parts).strip(),
+        pages=total_pages,
+        method=overall_method(p.method for p in pages),
+        page_results=tuple(pages),
+        image_stats=image_stats,
+    )
+
+
+class PdfTextExtractor:
+    def __init__(
+        self,
+        *,
+        ocr_workers: int = 1,
+        cache: Optional[PdfExtractionCache] = None,
+        vision: Optional[ClaudeVisionAnalyzer] = None,
+        preprocessor: Optional[PagePreprocessor] = None,
+        rasterizer: Optional[PageRasterizer] = None,
+        tesseract_cmd: Optional[str] = None,
+    ) -> None:
+        # Tesseract é CPU-bound: com mais de 1 worker as páginas são reconhecidas
+        # num pool de processos enquanto a rasterização segue em streaming.
+        self.ocr_workers = max(1, ocr_workers)
+        self.cache = cache
+        # Instância única → um só cliente Anthropic e um só rate limiter por extrator
+        self.vision = vision or ClaudeVisionAnalyzer()
+        self.preprocessor = preprocessor or PagePreprocessor()
+        # Resolvido sob demanda: PDFs só com texto não precisam do Poppler instalado
+        self._rasterizer = rasterizer
+        self._tesseract_cmd = tesseract_cmd
+        self._tesseract_resolved: Optional[str] = None
+
+    @property
+    def rasterizer(self) -> PageRasterizer:
+        if self._rasterizer is None:
+            self._rasterizer = default_rasterizer()
+        return self._rasterizer
+
+    @property
+    def cache_version(self) -> str:
+        """
+        Versão do extrator + impressão digital da configuração que muda o texto
+        extraído (pré-processamento, modelo do Vision): outra configuração não
+        reaproveita páginas extraídas com a anterior.
+        """
+        config = repr((self.preprocessor.config, self.vision.model))
+        return f"{EXTRACTOR_VERSION}-{hashlib.sha256(config.encode('utf-8')).hexdigest()[:12]}"
+
+    @property
+    def tesseract_cmd(self) -> str:
+        # Vai para os workers de OCR, que não leem configuração por conta própria
+        if self._tesseract_resolved is None:
+            self._tesseract_resolved = find_tesseract(self._tesseract_cmd)
+        return self._tesseract_resolved
+
+    def extract(
         self,
         file_bytes: bytes,
-        pages_to_read: int,
-        total_pages: int,
+        *,
+        max_pages: Optional[int] = None,
+        progress: Optional[ProgressCallback] = None,
     ) -> PdfExtractResult:
-        import pytesseract
-        from PIL import Image
-
-        pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
-        poppler_path = os.environ.get("POPPLER_PATH") or r"C:\poppler\poppler-25.12.0\Library\bin"
-        pdftoppm = str(Path(poppler_path) / "pdftoppm.exe")
-
-        base_tmp = Path(r"C:\Temp\pdf_ocr_tmp")
-        base_tmp.mkdir(parents=True, exist_ok=True)
-
-        with tempfile.TemporaryDirectory(dir=base_tmp) as tmpdir:
-            tmpdir_path = Path(tmpdir)
-            pdf_path = tmpdir_path / "input.pdf"
-            pdf_path.write_bytes(file_bytes)
-            out_prefix = tmpdir_path / "pg"
-
-            cmd = [
-                pdftoppm,
-                "-f", "1",
-                "-l", str(pages_to_read),
-                "-png",
-                "-r", "200",
-                str(pdf_path),
-                str(out_prefix),
-            ]
-
-            result = subprocess.run(
-                cmd, capture_output=True, text=True,
-                encoding="utf-8", errors="replace",
+        progress = progress or _noop_progress
+        if self.cache is None:
+            with span("pdf.open"):
+                reader = _open_pdf(file_bytes)
+                total_pages = len(reader.pages)
+            pages_to_read = total_pages if max_pages is None else min(total_pages, max_pages)
+
+            pages, stats = self._extract_pages(
+                file_bytes, reader, list(range(1, pages_to_read + 1)), progress
             )
+            return _assemble(pages, total_pages, stats)
 
-            if result.returncode != 0:
-                raise RuntimeError(
-                    "Falha ao converter PDF para imagem via pdftoppm.\n"
-                    f"Comando: {' '.join(cmd)}\n"
-                    f"STDERR:\n{result.stderr}\nSTDOUT:\n{result.stdout}"
-                )
+        return self._extract_cached(file_bytes, max_pages, progress)
 
-            png_files = sorted(
-                glob.glob(str(tmpdir_path / "pg-*.png")),
-                key=lambda p: int(Path(p).stem.split("-")[-1]),
-            )
+    def page_count(self, file_bytes: bytes) -> int:
+        if self.cache is not None:
+            total = self.cache.get_total_pages(self.cache.document_key(file_bytes, self.cache_version))
+            if total is not None:
+                return total
+        with span("pdf.open"):
+            return len(_open_pdf(file_bytes).pages)
 
-            if not png_files:
-                raise RuntimeError(
-                    "pdftoppm executou sem erros mas não gerou nenhuma imagem PNG.\n"
-                    f"Arquivos presentes: {list(tmpdir_path.iterdir())}"
-                )
+    def iter_pages(
+        self,
+        file_bytes: bytes,
+        *,
+        max_pages: Optional[int] = None,
+        window: Optional[int] = None,
+    ) -> Iterator[PageExtract]:
+        """
+        Extração sob demanda, em ordem: as páginas são processadas em janelas
+        (texto → OCR → Vision dentro de cada janela) e entregues uma a uma.
+        Quando o consumidor para de iterar, nenhuma página seguinte é lida —
+        nem rasterizada. A janela só precisa ser grande o bastante para ocupar
+        os workers de OCR.
+        """
+        window = window or max(4, 2 * self.ocr_workers)
+        doc_key = self.cache.document_key(file_bytes, self.cache_version) if self.cache else None
+
+        reader: Optional[PdfReader] = None
+        total_pages = self.cache.get_total_pages(doc_key) if self.cache is not None else None
+        if total_pages is None:
+            with span("pdf.open"):
+                reader = _open_pdf(file_bytes)
+                total_pages = len(reader.pages)
+        pages_to_read = total_pages if max_pages is None else min(total_pages, max_pages)
 
-            ocr_parts: list[str] = []
-            png_bytes_list: list[tuple[int, bytes]] = []
+        for start in range(1, pages_to_read + 1, window):
+            numbers = list(range(start, min(start + window, pages_to_read + 1)))
+
+            found: dict[int, PageExtract] = {}
+            if self.cache is not None:
+                with span("pdf.cache_lookup"):
+                    found = self.cache.get_pages(doc_key, numbers)
+            missing = [n for n in numbers if n not in found]
+
+            if missing:
+                if reader is None:
+                    with span("pdf.open"):
+                        reader = _open_pdf(file_bytes)
+                fresh, _ = self._extract_pages(file_bytes, reader, missing, _noop_progress)
+                if self.cache is not None:
+                    with span("pdf.cache_store"):
+                        self.cache.put_pages(doc_key, total_pages, fresh)
+                found.update({p.number: p for p in fresh})
+
+            for n in numbers:
+                yield found[n]
+
+    def _extract_cached(
+        self,
+        file_bytes: bytes,
+        max_pages: Optional[int],
+        progress: ProgressCallback,
+    ) -> PdfExtractResult:
+        assert self.cache is not None
+        doc_key = self.cache.document_key(file_bytes, self.cache_version)
+
+        # Documento já visto: nem precisa abrir o PDF se todas as páginas estão no cache
+        reader: Optional[PdfReader] = None
+        with span("pdf.cache_lookup"):
+            total_pages = self.cache.get_total_pages(doc_key)
+        if total_pages is None:
+            with span("pdf.open"):
+                reader = _open_pdf(file_bytes)
+                total_pages = len(reader.pages)
 
-            for idx, png in enumerate(png_files, start=1):
-                img = Image.open(png)
-                img_gray = img.convert("L")
+        pages_to_read = total_pages if max_pages is None else min(total_pages, max_pages)
+        page_numbers = list(range(1, pages_to_read + 1))
 
-                try:
-                    page_txt = pytesseract.image_to_string(
-                        img_gray, lang="por+eng", config="--psm 3"
-                    ).strip()
-                except Exception:
-                    page_txt = pytesseract.image_to_string(
-                        img_gray, lang="eng", config="--psm 3"
-                    ).strip()
+        with span("pdf.cache_lookup") as attrs:
+            cached = self.cache.get_pages(doc_key, page_numbers)
+            attrs["hits"] = len(cached)
+        missing = [n for n in page_numbers if n not in cached]
 
-                if page_txt:
-                    ocr_parts.append(f"\n--- Página {idx} (OCR) ---\n{page_txt}")
+        stats: Optional[PreprocessStats] = None
+        if missing:
+            if reader is None:
+                with span("pdf.open"):
+                    reader = _open_pdf(file_bytes)
+            fresh, stats = self._extract_pages(file_bytes, reader, missing, progress)
+            with span("pdf.cache_store"):
+                self.cache.put_pages(doc_key, total_pages, fresh)
+            cached.update({p.number: p for p in fresh})
 
-                # Guarda bytes PNG para eventual uso no Vision
-                png_bytes_list.append((idx, Path(png).read_bytes()))
+        return _assemble([cached[n] for n in page_numbers], total_pages, stats)
 
-            ocr_text = "\n".join(ocr_parts).strip()
+    # ------------------------------------------------------------------
+    # Planejamento por página: texto → OCR → Vision
+    # ------------------------------------------------------------------
+    def _extract_pages(
+        self,
+        file_bytes: bytes,
+        reader: PdfReader,
+        page_numbers: list[int],
+        progress: ProgressCallback,
+    ) -> tuple[list[PageExtract], PreprocessStats]:
+        stats = PreprocessStats()
+
+        # 1) Camada de texto (PDF com texto selecionável) — barata, roda em todas
+        results: dict[int, PageExtract] = {}
+        with span("pdf.text", pages=len(page_numbers)):
+            for i, n in enumerate(page_numbers, start=1):
+                page_text = (reader.pages[n - 1].extract_text() or "").strip()
+                method = "text" if page_text else "empty"
+                results[n] = PageExtract(number=n, method=method, text=page_text)
+                progress("text", i, len(page_numbers))
+
+        # 2) Só as páginas sem texto suficiente são rasterizadas e vão para OCR
+        ocr_pages = [n for n in page_numbers if len(results[n].text) < _TEXT_MIN_CHARS]
+        if not ocr_pages:
+            return [results[n] for n in page_numbers], stats
+
+        with span("pdf.ocr", pages=len(ocr_pages), workers=self.ocr_workers):
+            ocr_out = self._extract_with_ocr(file_bytes, ocr_pages, progress)
+        stats.pages += len(ocr_pages)
+
+        vision_candidates: list[tuple[int, bytes]] = []
+        for n in ocr_pages:
+            page_txt, png_bytes = ocr_out[n]
+            if png_bytes is None:
+                # Página em branco: nem OCR nem Vision
+                stats.blank_pages_skipped += 1
+                continue
+            if len(page_txt) > len(results[n].text):
+                results[n] = PageExtract(number=n, method="ocr", text=page_txt)
+            # 3) OCR retornou pouco texto → provavelmente diagrama → Claude Vision
+            if len(page_txt) < _OCR_MIN_CHARS:
+                vision_candidates.append((n, png_bytes))
+
+        if vision_candidates:
+            # Sem chave da Anthropic, só falha se o Vision for a única saída possível;
+            # em PDFs mistos as demais páginas continuam valendo.
+            vision_pages = {n for n, _ in vision_candidates}
+            has_other_content = any(
+                results[n].method != "empty"
+                for n in page_numbers
+                if n not in vision_pages
+            )
+            if self.vision.available or not has_other_content:
+                vision_out = self._extract_with_vision(vision_candidates, stats, progress)
+                for n, vision_txt in vision_out.items():
+                    if vision_txt:
+                        results[n] = PageExtract(number=n, method="vision", text=vision_txt)
+            else:
+                for n in vision_pages:
+                    results[n] = replace(results[n], degraded=True)
 
-        # 3) OCR retornou pouco texto → provavelmente diagrama → Claude Vision
-        if len(ocr_text) < _OCR_MIN_CHARS:
-            return self._extract_with_vision(png_bytes_list, total_pages)
+        return [results[n] for n in page_numbers], stats
 
-        return PdfExtractResult(text=ocr_text, pages=total_pages, method="ocr")
+    def _extract_with_vision(
+        self,
+        png_bytes_list: list[tuple[int, bytes]],
+        stats: PreprocessStats,
+        progress: ProgressCallback,
+    ) -> dict[int, str]:
+        # Reduz/reencoda antes do upload — o payload base64 domina latência e custo
+        images: list[tuple[int, bytes, str]] = []
+        for n, png_bytes in png_bytes_list:
+            with span("pdf.preprocess"):
+                prepared = self.preprocessor.prepare_for_vision(png_bytes)
+            if prepared is None:
+                stats.blank_pages_skipped += 1
+                continue
+            payload, media_type = prepared
+            stats.bytes_in += len(png_bytes)
+            stats.bytes_out += len(payload)
+            # O formato vencedor varia por página (PNG, JPEG/WebP ou o original)
+            images.append((n, payload, media_type))
+
+        progress("vision", 0, len(images))
+        with span("pdf.vision", pages=len(images)):
+            return self.vision.analyze_pages(
+                images,
+                on_page=lambda done: progress("vision", done, len(images)),
+            )
 
     # ------------------------------------------------------------------
-    # Claude Vision — para diagramas e imagens complexas
+    # OCR via Tesseract + Poppler
     # ------------------------------------------------------------------
-    def _extract_with_vision(
+    def _extract_with_ocr(
         self,
-        png_bytes_list: list[tuple[int, bytes]],
-        total_pages: int,
-    ) -> PdfExtractResult:
-        import anthropic
+        file_bytes: bytes,
+        pages: list[int],
+        progress: ProgressCallback,
+    ) -> dict[int, tuple[str, Optional[bytes]]]:
+        """
+        Retorna {página: (texto OCR, bytes PNG)} apenas para as páginas pedidas.
+        Páginas em branco voltam com bytes None.
+        """
+        page_images = _timed(self.rasterizer.iter_pages(file_bytes, pages), "pdf.rasterize")
+        progress("ocr", 0, len(pages))
+        if self.ocr_workers > 1 and len(pages) > 1:
+            return self._ocr_parallel(page_images, len(pages), progress)
+        return self._ocr_sequential(page_images, len(pages), progress)
+
+    def _ocr_sequential(
+        self,
+        page_images,
+        n_pages: int,
+        progress: ProgressCallback,
+    ) -> dict[int, tuple[str, Optional[bytes]]]:
+        import pytesseract
 
-        api_key = os.environ.get("ANTHROPIC_API_KEY")
-        if not api_key:
-            raise RuntimeError(
-                "OCR retornou resultado insuficiente e ANTHROPIC_API_KEY não está definida. "
-                "Configure a variável de ambiente para habilitar análise de diagramas via Claude Vision."
-            )
+        pytesseract.pytesseract.tesseract_cmd = self.tesseract_cmd
 
-        client = anthropic.Anthropic(api_key=api_key)
-
-        vision_parts: list[str] = []
-
-        for idx, png_bytes in png_bytes_list:
-            b64 = base64.standard_b64encode(png_bytes).decode("utf-8")
-
-            message = client.messages.create(
-                model="claude-opus-4-6",
-                max_tokens=4096,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "image",
-                                "source": {
-                                    "type": "base64",
-                                    "media_type": "image/png",
-                                    "data": b64,
-                                },
-                            },
-                            {
-                                "type": "text",
-                                "text": (
-                                    "Analise esta imagem extraída de um PDF. "
-                                    "Ela pode ser um documento, diagrama, fluxograma ou tabela. "
-                                    "Por favor:\n"
-                                    "1. Descreva o conteúdo geral da imagem\n"
-                                    "2. Extraia TODO o texto visível, mantendo a estrutura lógica\n"
-                                    "3. Se for um fluxograma/diagrama, explique o fluxo ou a lógica representada\n"
-                                    "Responda em português."
-                                ),
-                            },
-                        ],
-                    }
-                ],
-            )
+        out: dict[int, tuple[str, Optional[bytes]]] = {}
+        for idx, png_bytes in page_images:
+            img_gray = self.preprocessor.prepare_for_ocr(png_bytes)
+            if img_gray is None:
+                out[idx] = ("", None)
+            else:
+                # Guarda bytes PNG para eventual uso no Vision
+                out[idx] = (_ocr_image(img_gray), png_bytes)
+            progress("ocr", len(out), n_pages)
+
+        return out
+
+    def _ocr_parallel(
+        self,
+        page_images,
+        n_pages: int,
+        progress: ProgressCallback,
+    ) -> dict[int, tuple[str, Optional[bytes]]]:
+        # A rasterização (gerador) roda neste processo enquanto o pool faz o OCR das
+        # páginas anteriores. A janela limita quantas imagens ficam em trânsito.
+        workers = min(self.ocr_workers, n_pages)
+        window = 2 * workers
+        prep_config = self.preprocessor.config
+        tesseract_cmd = self.tesseract_cmd
+
+        out: dict[int, tuple[str, Optional[bytes]]] = {}
+        in_flight: deque[Future] = deque()
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for idx, png_bytes in page_images:
+                if len(in_flight) >= window:
+                    page, page_txt, kept = in_flight.popleft().result()
+                    out[page] = (page_txt, kept)
+                    progress("ocr", len(out), n_pages)
+                in_flight.append(
+                    pool.submit(_ocr_png_worker, (idx, png_bytes, tesseract_cmd, prep_config))
+                )
 
-            response_text = message.content[0].text.strip()
-            vision_parts.append(f"\n--- Página {idx} (Vision) ---\n{response_text}")
+            while in_flight:
+                page, page_txt, kept = in_flight.popleft().result()
+                out[page] = (page_txt, kept)
+                progress("ocr", len(out), n_pages)
 
-        vision_text = "\n".join(vision_parts).strip()
-        return PdfExtractResult(text=vision_text, pages=total_pages, method="vision")
\ No newline at end of file
+        return out
@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""
+Rasterização de páginas de PDF para imagem (PNG).
+
+Todas as implementações entregam as páginas como um gerador — uma página por
+vez, em memória — para que documentos grandes não acumulem todas as imagens.
+
+- PdftoppmStreamRasterizer: envia o PDF pelo stdin do pdftoppm e lê os PNGs
+  direto do stdout, sem diretório temporário.
+- PdfiumRasterizer: renderiza no próprio processo via pypdfium2 (opcional).
+- TempDirRasterizer: caminho antigo (arquivos em diretório temporário), usado
+  como fallback quando o pdftoppm instalado não suporta stdin/stdout.
+"""
+from __future__ import annotations
+
+import glob
+import io
+import os
+import shutil
+import struct
+import subprocess
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import IO, Iterator, Optional
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_DEFAULT_DPI = 200
+
+# Instalação padrão no Windows (ver README)
+_WINDOWS_POPPLER_PATH = r"C:\poppler\poppler-25.12.0\Library\bin"
+
+
+def find_pdftoppm(poppler_path: Optional[str] = None) -> str:
+    poppler_path = poppler_path or os.environ.get("POPPLER_PATH")
+    candidates = [poppler_path] if poppler_path else []
+    if os.name == "nt":
+        candidates.append(_WINDOWS_POPPLER_PATH)
+
+    for folder in candidates:
+        for name in ("pdftoppm.exe", "pdftoppm"):
+            path = Path(folder) / name
+            if path.exists():
+                return str(path)
+
+    found = shutil.which("pdftoppm")
+    if found:
+        return found
+
+    raise RuntimeError(
+        "pdftoppm não encontrado. Instale o Poppler e defina POPPLER_PATH "
+        "ou adicione o pdftoppm ao PATH."
+    )
+
+
+def page_ranges(pages: list[int]) -> list[tuple[int, int]]:
+    """Agrupa páginas em faixas contíguas: [1, 2, 3, 7, 9, 10] → [(1, 3), (7, 7), (9, 10)]."""
+    ranges: list[tuple[int, int]] = []
+    for page in sorted(pages):
+        if ranges and page == ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0], page)
+        else:
+            ranges.append((page, page))
+    return ranges
+
+
+def _read_exact(stream: IO[bytes], size: int) -> bytes:
+    data = stream.read(size)
+    if len(data) != size:
+        raise RuntimeError("Fluxo PNG do pdftoppm terminou no meio de uma imagem.")
+    return data
+
+
+def iter_png_stream(stream: IO[bytes]) -> Iterator[bytes]:
+    """Separa PNGs concatenados num fluxo, lendo chunk a chunk até cada IEND."""
+    while True:
+        signature = stream.read(len(_PNG_SIGNATURE))
+        if not signature:
+            return
+        if signature != _PNG_SIGNATURE:
+            raise RuntimeError("Saída do pdftoppm não é um fluxo PNG válido.")
+
+        parts = [signature]
+        while True:
+            header = _read_exact(stream, 8)
+            length, chunk_type = struct.unpack(">I4s", header)
+            parts.append(header)
+            parts.append(_read_exact(stream, length + 4))  # dados + CRC
+            if chunk_type == b"IEND":
+                break
+
+        yield b"".join(parts)
+
+
+class PageRasterizer(ABC):
+    @abstractmethod
+    def iter_pages(self, file_bytes: bytes, pages: list[int]) -> Iterator[tuple[int, bytes]]:
+        """Gera (número da página, bytes PNG) na ordem das páginas pedidas."""
+        raise NotImplementedError
+
+
+class PdftoppmStreamRasterizer(PageRasterizer):
+    def __init__(
+        self,
+        pdftoppm: Optional[str] = None,
+        *,
+        dpi: int = _DEFAULT_DPI,
+        fallback: Optional[PageRasterizer] = None,
+    ) -> None:
+        self.pdftoppm = pdftoppm or find_pdftoppm()
+        self.dpi = dpi
+        self.fallback = fallback
+
+    def iter_pages(self, file_bytes: bytes, pages: list[int]) -> Iterator[tuple[int, bytes]]:
+        for first, last in page_ranges(pages):
+            expected = last - first + 1
+            rendered = 0
+            try:
+                for png_bytes in self._render_range(file_bytes, first, last):
+                    yield first + rendered, png_bytes
+                    rendered += 1
+                if rendered != expected:
+                    raise RuntimeError(
+                        f"pdftoppm gerou {rendered} de {expected} páginas da faixa {first}-{last}."
+                    )
+            except RuntimeError:
+                # pdftoppm antigo sem suporte a stdin/stdout: usa o caminho em disco
+                if self.fallback is None or rendered:
+                    raise
+                yield from self.fallback.iter_pages(file_bytes, list(range(first, last + 1)))
+
+    def _render_range(self, file_bytes: bytes, first: int, last: int) -> Iterator[bytes]:
+        # Sem prefixo de saída o pdftoppm escreve as imagens no stdout; "-" lê o PDF do stdin
+        cmd = [
+            self.pdftoppm,
+            "-f", str(first),
+            "-l", str(last),
+            "-png",
+            "-r", str(self.dpi),
+            "-",
+        ]
+
+        with tempfile.TemporaryFile() as stderr_file:
+            proc = subprocess.Popen(
+                cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=stderr_file,
+            )
+
+            # Escreve o stdin em paralelo para não travar quando o stdout enche o pipe
+            def _feed() -> None:
+                try:
+                    proc.stdin.write(file_bytes)
+                except (BrokenPipeError, OSError):
+                    pass
+                finally:
+                    proc.stdin.close()
+
+            feeder = threading.Thread(target=_feed, daemon=True)
+            feeder.start()
+
+            try:
+                yield from iter_png_stream(proc.stdout)
+            finally:
+                proc.stdout.close()
+                returncode = proc.wait()
+                feeder.join()
+
+            if returncode != 0:
+                stderr_file.seek(0)
+                stderr = stderr_file.read().decode("utf-8", errors="replace")
+                raise RuntimeError(
+                    "Falha ao converter PDF para imagem via pdftoppm.\n"
+                    f"Comando: {' '.join(cmd)}\n"
+                    f"STDERR:\n{stderr}"
+                )
+
+
+class PdfiumRasterizer(PageRasterizer):
+    def __init__(self, *, dpi: int = _DEFAULT_DPI) -> None:
+        self.dpi = dpi
+
+    def iter_pages(self, file_bytes: bytes, pages: list[int]) -> Iterator[tuple[int, bytes]]:
+        try:
+            import pypdfium2 as pdfium
+        except ImportError as exc:
+            raise RuntimeError(
+                "pypdfium2 não está instalado. Instale com `pip install pypdfium2` "
+                "ou use o rasterizador baseado em pdftoppm."
+            ) from exc
+
+        doc = pdfium.PdfDocument(file_bytes)
+        try:
+            for n in sorted(pages):
+                page = doc[n - 1]
+                image = page.render(scale=self.dpi / 72).to_pil()
+                buf = io.BytesIO()
+                image.save(buf, format="PNG")
+                page.close()
+                yield n, buf.getvalue()
+        finally:
+            doc.close()
+
+
+class TempDirRasterizer(PageRasterizer):
+    def __init__(
+        self,
+        pdftoppm: Optional[str] = None,
+        *,
+        dpi: int = _DEFAULT_DPI,
+        base_tmp: Optional[str] = None,
+    ) -> None:
+        self.pdftoppm = pdftoppm or find_pdftoppm()
+        self.dpi = dpi
+        self.base_tmp = base_tmp
+
+    def iter_pages(self, file_bytes: bytes, pages: list[int]) -> Iterator[tuple[int, bytes]]:
+        with tempfile.TemporaryDirectory(dir=self.base_tmp) as tmpdir:
+            tmpdir_path = Path(tmpdir)
+            pdf_path = tmpdir_path / "input.pdf"
+            pdf_path.write_bytes(file_bytes)
+
+            # Uma chamada do pdftoppm por faixa contígua de páginas
+            for first, last in page_ranges(pages):
+                out_prefix = tmpdir_path / f"r{first}"
+
+                cmd = [
+                    self.pdftoppm,
+                    "-f", str(first),
+                    "-l", str(last),
+                    "-png",
+                    "-r", str(self.dpi),
+                    str(pdf_path),
+                    str(out_prefix),
+                ]
+
+                result = subprocess.run(
+                    cmd, capture_output=True, text=True,
+                    encoding="utf-8", errors="replace",
+                )
+
+                if result.returncode != 0:
+                    raise RuntimeError(
+                        "Falha ao converter PDF para imagem via pdftoppm.\n"
+                        f"Comando: {' '.join(cmd)}\n"
+                        f"STDERR:\n{result.stderr}\nSTDOUT:\n{result.stdout}"
+                    )
+
+                png_files = sorted(
+                    glob.glob(str(tmpdir_path / f"r{first}-*.png")),
+                    key=lambda p: int(Path(p).stem.split("-")[-1]),
+                )
+
+                if not png_files:
+                    raise RuntimeError(
+                        "pdftoppm executou sem erros mas não gerou nenhuma imagem PNG.\n"
+                        f"Arquivos presentes: {list(tmpdir_path.iterdir())}"
+                    )
+
+                for png in png_files:
+                    path = Path(png)
+                    png_bytes = path.read_bytes()
+                    path.unlink()  # libera o disco à medida que as páginas são consumidas
+                    yield int(path.stem.split("-")[-1]), png_bytes
+
+
+def default_rasterizer(
+    *,
+    kind: str = "pdftoppm",
+    poppler_path: Optional[str] = None,
+    dpi: int = _DEFAULT_DPI,
+) -> PageRasterizer:
+    """kind: "pdftoppm" (stdout, com fallback em disco), "pdfium" ou "tempdir"."""
+    if kind == "pdfium":
+        return PdfiumRasterizer(dpi=dpi)
+
+    pdftoppm = find_pdftoppm(poppler_path)
+    if kind == "tempdir":
+        return TempDirRasterizer(pdftoppm, dpi=dpi)
+    if kind == "pdftoppm":
+        return PdftoppmStreamRasterizer(
+            pdftoppm,
+            dpi=dpi,
+            fallback=TempDirRasterizer(pdftoppm, dpi=dpi),
+        )
+
+    raise ValueError(f"Rasterizador desconhecido: {kind}")
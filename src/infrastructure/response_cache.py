@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+"""
+Cache de respostas na frente de qualquer LLMPort.
+
+- Chave exata: SHA-256 de (modelo, mensagens) normalizados (Unicode NFC,
+  espaços colapsados) — a mesma pergunta com espaçamento diferente acerta.
+- Camada em memória: LRU com TTL.
+- Camada opcional em SQLite: sobrevive a reinícios e é compartilhada entre processos.
+- Modo opcional de quase-duplicatas: com um embedder, perguntas parecidas
+  (mesmo modelo e mesmo contexto anterior) reaproveitam a resposta se a
+  similaridade de cosseno passar do limiar. Só vale para perguntas curtas:
+  mensagens que carregam documento (PDF, trechos do RAG) ficam só na chave exata.
+- Regras de bypass: pedidos cuja resposta muda com o tempo não são cacheados.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterator, List, Optional
+
+from src.domain.models import ChatMessage, LLMCallInfo
+from src.domain.ports import EmbedderPort, LLMPort
+from src.telemetry import span
+
+if TYPE_CHECKING:
+    import numpy as np
+
+BypassRule = Callable[[str, List[ChatMessage]], bool]
+
+_SPACES = re.compile(r"\s+")
+
+# Perguntas sobre "agora" não têm resposta estável
+_TIME_SENSITIVE = re.compile(
+    r"\b(hoje|agora|atualmente|neste momento|ontem|amanh[ãa]|que horas|data atual|"
+    r"[úu]ltimas not[íi]cias|cota[çc][ãa]o)\b",
+    re.IGNORECASE,
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key        TEXT PRIMARY KEY,
+    model      TEXT NOT NULL,
+    text       TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_created_at ON responses (created_at);
+"""
+
+
+def _normalize(text: str) -> str:
+    return _SPACES.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def _hash(payload: object) -> str:
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def cache_key(model: str, messages: List[ChatMessage]) -> str:
+    return _hash([model, [[m.role, _normalize(m.content)] for m in messages]])
+
+
+def default_bypass(model: str, messages: List[ChatMessage]) -> bool:
+    """Não cacheia quando a última mensagem do usuário depende do momento atual."""
+    last_user = next((m for m in reversed(messages) if m.role == "user"), None)
+    return last_user is not None and bool(_TIME_SENSITIVE.search(last_user.content))
+
+
+@dataclass(frozen=True)
+class ResponseCacheStats:
+    hits: int
+    semantic_hits: int
+    misses: int
+    bypassed: int
+    entries: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.semantic_hits + self.misses
+        return (self.hits + self.semantic_hits) / total if total else 0.0
+
+
+class SqliteResponseStore:
+    """Segunda camada do cache (persistente). Entradas vencidas são ignoradas e removidas."""
+
+    def __init__(self, path: str | Path, *, ttl_s: float) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_s = ttl_s
+
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        text, created_at = row
+        return text if time.time() - created_at < self.ttl_s else None
+
+    def put(self, key: str, model: str, text: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, text, created_at) VALUES (?, ?, ?, ?)",
+                (key, model, text, time.time()),
+            )
+            self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl_s,)
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+
+@dataclass
+class _Entry:
+    text: str
+    expires_at: float
+
+
+class CachingLLMAdapter(LLMPort):
+    def __init__(
+        self,
+        llm: LLMPort,
+        *,
+        max_entries: int = 1_000,
+        ttl_s: float = 24 * 3600,
+        store: Optional[SqliteResponseStore] = None,
+        embedder: Optional[EmbedderPort] = None,
+        similarity_threshold: float = 0.95,
+        semantic_max_chars: int = 2_000,
+        bypass: Optional[BypassRule] = default_bypass,
+    ) -> None:
+        self.llm = llm
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.store = store
+        self.embedder = embedder
+        self.similarity_threshold = similarity_threshold
+        # Mensagem com documento só acerta pela chave exata: o embedding do texto
+        # inteiro mede a semelhança entre documentos (dois contratos parecidos), não
+        # entre perguntas
+        self.semantic_max_chars = semantic_max_chars
+        self.bypass = bypass
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        # Quase-duplicatas: escopo (modelo + mensagens anteriores) -> [(chave exata, vetor)]
+        self._semantic: OrderedDict[str, List[tuple[str, np.ndarray]]] = OrderedDict()
+        self._local = threading.local()
+
+        self._hits = 0
+        self._semantic_hits = 0
+        self._misses = 0
+        self._bypassed = 0
+
+    # ------------------------------------------------------------------
+    # LLMPort
+    # ------------------------------------------------------------------
+    def chat(self, *, model: str, messages: List[ChatMessage]) -> str:
+        if self._should_bypass(model, messages):
+            return self.llm.chat(model=model, messages=messages)
+
+        with span("llm.cache_lookup"):
+            key = cache_key(model, messages)
+            cached = self._lookup(key, model, messages)
+        if cached is not None:
+            return cached
+
+        text = self.llm.chat(model=model, messages=messages)
+        self._store(key, model, messages, text)
+        return text
+
+    def stream_chat(self, *, model: str, messages: List[ChatMessage]) -> Iterator[str]:
+        if self._should_bypass(model, messages):
+            yield from self.llm.stream_chat(model=model, messages=messages)
+            return
+
+        with span("llm.cache_lookup"):
+            key = cache_key(model, messages)
+            cached = self._lookup(key, model, messages)
+        if cached is not None:
+            yield cached
+            return
+
+        # Só grava se o stream for consumido até o fim (resposta completa)
+        parts: List[str] = []
+        for chunk in self.llm.stream_chat(model=model, messages=messages):
+            parts.append(chunk)
+            yield chunk
+        self._store(key, model, messages, "".join(parts))
+
+    def last_call_info(self) -> Optional[LLMCallInfo]:
+        info: Optional[LLMCallInfo] = getattr(self._local, "info", None)
+        if info is None or info.cache_status not in ("miss", "bypass"):
+            return info
+        # A chamada foi ao LLM de fato: mantém o que o adaptador interno informou (ex.: provedor)
+        inner = self.llm.last_call_info()
+        if inner is None:
+            return info
+        return replace(inner, cache_status=info.cache_status, cache_hit_rate=info.cache_hit_rate)
+
+    # ------------------------------------------------------------------
+    # Métricas / manutenção
+    # ------------------------------------------------------------------
+    def stats(self) -> ResponseCacheStats:
+        with self._lock:
+            return ResponseCacheStats(
+                hits=self._hits,
+                semantic_hits=self._semantic_hits,
+                misses=self._misses,
+                bypassed=self._bypassed,
+                entries=len(self._entries),
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._semantic.clear()
+        if self.store is not None:
+            self.store.clear()
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+    def _should_bypass(self, model: str, messages: List[ChatMessage]) -> bool:
+        if self.bypass is None or not self.bypass(model, messages):
+            return False
+        with self._lock:
+            self._bypassed += 1
+        self._record("bypass")
+        return True
+
+    def _lookup(self, key: str, model: str, messages: List[ChatMessage]) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > now:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                text = entry.text
+            else:
+                text = None
+
+        if text is None and self.store is not None:
+            text = self.store.get(key)
+            if text is not None:
+                with self._lock:
+                    self._put_memory(key, text)
+                    self._hits += 1
+
+        if text is not None:
+            self._record("hit")
+            return text
+
+        text = self._lookup_semantic(model, messages)
+        if text is not None:
+            with self._lock:
+                self._semantic_hits += 1
+            self._record("semantic")
+            return text
+
+        with self._lock:
+            self._misses += 1
+        self._record("miss")
+        return None
+
+    def _semantic_query(self, messages: List[ChatMessage]) -> Optional[str]:
+        if self.embedder is None or not messages or messages[-1].role != "user":
+            return None
+        content = messages[-1].content
+        # Documento vem em blocos separados por linha em branco (objetivo + texto do
+        # PDF, pergunta + trechos do RAG); pergunta digitada é um bloco só e curto
+        if len(content) > self.semantic_max_chars or "\n\n" in content.strip():
+            return None
+        return content
+
+    def _lookup_semantic(self, model: str, messages: List[ChatMessage]) -> Optional[str]:
+        question = self._semantic_query(messages)
+        if question is None:
+            return None
+
+        scope = self._semantic_scope(model, messages)
+        with self._lock:
+            candidates = list(self._semantic.get(scope, ()))
+        if not candidates:
+            return None
+
+        import numpy as np
+
+        query = self.embedder.embed([question])[0]
+        scores = np.stack([vec for _, vec in candidates]) @ query
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity_threshold:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(candidates[best][0])
+            if entry is None or entry.expires_at <= time.time():
+                return None
+            return entry.text
+
+    def _store(self, key: str, model: str, messages: List[ChatMessage], text: str) -> None:
+        if not text:
+            return
+
+        vector = None
+        question = self._semantic_query(messages)
+        if question is not None:
+            vector = self.embedder.embed([question])[0]
+
+        with self._lock:
+            self._put_memory(key, text)
+            if vector is not None:
+                scope = self._semantic_scope(model, messages)
+                bucket = self._semantic.setdefault(scope, [])
+                self._semantic.move_to_end(scope)
+                bucket.append((key, vector))
+                del bucket[: max(0, len(bucket) - self.max_entries)]
+                while len(self._semantic) > self.max_entries:
+                    self._semantic.popitem(last=False)
+
+        if self.store is not None:
+            self.store.put(key, model, text)
+
+    def _put_memory(self, key: str, text: str) -> None:
+        # Chamado com o lock adquirido
+        self._entries[key] = _Entry(text=text, expires_at=time.time() + self.ttl_s)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def _semantic_scope(model: str, messages: List[ChatMessage]) -> str:
+        return cache_key(model, messages[:-1])
+
+    def _record(self, status: str) -> None:
+        self._local.info = LLMCallInfo(cache_status=status, cache_hit_rate=self.stats().hit_rate)
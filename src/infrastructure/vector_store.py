@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+Índice vetorial local em disco, baseado em NumPy.
+
+Layout do diretório:
+    meta.json      dimensão dos vetores
+    vectors.f32    matriz float32 (n, dim) em formato bruto, só anexada
+    chunks.jsonl   metadados dos trechos, uma linha por vetor (mesma ordem)
+
+A matriz é lida via memmap, então o índice não precisa caber na RAM; a busca
+é um produto matriz-vetor por blocos (vetores já normalizados → cosseno).
+"""
+from __future__ import annotations
+
+import json
+import threading
+from dataclasses import asdict
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+from src.domain.models import DocumentChunk, RetrievedChunk
+from src.domain.ports import VectorIndexPort
+
+_BLOCK_ROWS = 65_536  # linhas por bloco na busca (limita a memória temporária)
+
+
+class NumpyVectorStore(VectorIndexPort):
+    def __init__(self, path: str | Path, dim: int) -> None:
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._vectors_path = self.path / "vectors.f32"
+        self._chunks_path = self.path / "chunks.jsonl"
+        self._meta_path = self.path / "meta.json"
+
+        if self._meta_path.exists():
+            stored_dim = json.loads(self._meta_path.read_text(encoding="utf-8"))["dim"]
+            if stored_dim != dim:
+                raise ValueError(
+                    f"Índice em {self.path} foi criado com dimensão {stored_dim}, "
+                    f"mas o embedder atual gera vetores de dimensão {dim}."
+                )
+        else:
+            self._meta_path.write_text(json.dumps({"dim": dim}), encoding="utf-8")
+
+        self.dim = dim
+        self._lock = threading.Lock()
+        self._chunks: List[DocumentChunk] = []
+        self._doc_ids: set[str] = set()
+        self._matrix: Optional[np.memmap] = None
+
+        if self._chunks_path.exists():
+            with self._chunks_path.open(encoding="utf-8") as fh:
+                for line in fh:
+                    chunk = DocumentChunk(**json.loads(line))
+                    self._chunks.append(chunk)
+                    self._doc_ids.add(chunk.doc_id)
+
+        # Escrita interrompida no meio: descarta o excedente para manter as duas partes alinhadas
+        n_vectors = self._vectors_path.stat().st_size // (4 * dim) if self._vectors_path.exists() else 0
+        if n_vectors != len(self._chunks):
+            n = min(n_vectors, len(self._chunks))
+            self._truncate(n)
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    def has_document(self, doc_id: str) -> bool:
+        return doc_id in self._doc_ids
+
+    def add(self, chunks: List[DocumentChunk], vectors: np.ndarray) -> None:
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.shape != (len(chunks), self.dim):
+            raise ValueError(
+                f"Esperado vetores ({len(chunks)}, {self.dim}), recebido {vectors.shape}."
+            )
+
+        with self._lock:
+            with self._vectors_path.open("ab") as fh:
+                fh.write(vectors.tobytes())
+            with self._chunks_path.open("a", encoding="utf-8") as fh:
+                for chunk in chunks:
+                    fh.write(json.dumps(asdict(chunk), ensure_ascii=False) + "\n")
+
+            self._chunks.extend(chunks)
+            self._doc_ids.update(c.doc_id for c in chunks)
+            self._matrix = None  # reabre o memmap com o novo tamanho na próxima busca
+
+    def search(self, vector: np.ndarray, k: int) -> List[RetrievedChunk]:
+        return self.search_many(np.asarray(vector, dtype=np.float32).reshape(1, -1), k)[0]
+
+    def search_many(self, queries: np.ndarray, k: int) -> List[List[RetrievedChunk]]:
+        """Top-k para várias consultas de uma vez (um produto matriz-matriz por bloco)."""
+        queries = np.asarray(queries, dtype=np.float32)
+        matrix = self._get_matrix()
+        n = 0 if matrix is None else matrix.shape[0]
+        if n == 0 or k <= 0:
+            return [[] for _ in range(len(queries))]
+
+        k = min(k, n)
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_ids = np.zeros((len(queries), 0), dtype=np.int64)
+
+        for start in range(0, n, _BLOCK_ROWS):
+            block = matrix[start:start + _BLOCK_ROWS]
+            scores = queries @ block.T  # (q, bloco)
+
+            # Junta o top-k acumulado com o do bloco e mantém só os k melhores
+            kb = min(k, scores.shape[1])
+            idx = np.argpartition(-scores, kb - 1, axis=1)[:, :kb]
+            cand_scores = np.concatenate([best_scores, np.take_along_axis(scores, idx, axis=1)], axis=1)
+            cand_ids = np.concatenate([best_ids, idx + start], axis=1)
+
+            keep = np.argpartition(-cand_scores, min(k, cand_scores.shape[1]) - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(cand_scores, keep, axis=1)
+            best_ids = np.take_along_axis(cand_ids, keep, axis=1)
+
+        order = np.argsort(-best_scores, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_ids = np.take_along_axis(best_ids, order, axis=1)
+
+        return [
+            [
+                RetrievedChunk(chunk=self._chunks[int(i)], score=float(s))
+                for i, s in zip(ids_row, scores_row)
+            ]
+            for ids_row, scores_row in zip(best_ids, best_scores)
+        ]
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+    def _get_matrix(self) -> Optional[np.memmap]:
+        with self._lock:
+            n = len(self._chunks)
+            if n == 0:
+                return None
+            if self._matrix is None or self._matrix.shape[0] != n:
+                self._matrix = np.memmap(
+                    self._vectors_path, dtype=np.float32, mode="r", shape=(n, self.dim)
+                )
+            return self._matrix
+
+    def _truncate(self, n: int) -> None:
+        if self._vectors_path.exists():
+            with self._vectors_path.open("r+b") as fh:
+                fh.truncate(n * 4 * self.dim)
+        self._chunks = self._chunks[:n]
+        with self._chunks_path.open("w", encoding="utf-8") as fh:
+            for chunk in self._chunks:
+                fh.write(json.dumps(asdict(chunk), ensure_ascii=False) + "\n")
+        self._doc_ids = {c.doc_id for c in self._chunks}
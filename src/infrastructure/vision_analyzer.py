@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+Análise de páginas via Claude Vision com concorrência limitada.
+
+- Um único cliente Anthropic reaproveitado entre chamadas.
+- Token bucket para respeitar o limite de requisições por minuto.
+- Retry com backoff exponencial em 429/5xx e falhas de conexão.
+- Resultados devolvidos por número de página (a ordem é remontada pelo chamador).
+"""
+from __future__ import annotations
+
+import base64
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Optional
+
+_VISION_PROMPT = (
+    "Analise esta imagem extraída de um PDF. "
+    "Ela pode ser um documento, diagrama, fluxograma ou tabela. "
+    "Por favor:\n"
+    "1. Descreva o conteúdo geral da imagem\n"
+    "2. Extraia TODO o texto visível, mantendo a estrutura lógica\n"
+    "3. Se for um fluxograma/diagrama, explique o fluxo ou a lógica representada\n"
+    "Responda em português."
+)
+
+
+class TokenBucket:
+    """Limitador de taxa thread-safe: `rate` fichas por segundo, rajada até `capacity`."""
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait_s = (1 - self._tokens) / self.rate
+
+            time.sleep(wait_s)
+
+
+def _is_retryable(exc: Exception) -> bool:
+    status = getattr(exc, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+
+    # Erros de conexão/timeout do SDK não têm status HTTP
+    name = type(exc).__name__
+    return "Connection" in name or "Timeout" in name
+
+
+def _retry_after_s(exc: Exception) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class ClaudeVisionAnalyzer:
+    def __init__(
+        self,
+        api_key: str | None = None,
+        *,
+        model: str = "claude-opus-4-6",
+        max_concurrency: int = 4,
+        requests_per_minute: int = 50,
+        max_retries: int = 4,
+        backoff_base_s: float = 1.0,
+        client: Any = None,
+    ) -> None:
+        self.api_key = api_key or os.environ.get("ANTHROPIC_API_KEY")
+        self.model = model
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_base_s = backoff_base_s
+        self._bucket = TokenBucket(
+            rate=requests_per_minute / 60.0,
+            capacity=max(1, min(self.max_concurrency, requests_per_minute)),
+        )
+        # `client` permite injetar um fake (ou cliente apontando para servidor stub) em testes
+        self._client = client
+        self._client_lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return self._client is not None or bool(self.api_key)
+
+    def analyze_pages(
+        self,
+        images: list[tuple[int, bytes, str]],
+        *,
+        on_page: Optional[Callable[[int], None]] = None,
+    ) -> dict[int, str]:
+        """
+        `images`: (página, bytes, media type) — cada imagem leva o próprio formato.
+        `on_page(n)` é chamado a cada página concluída (n = páginas prontas até agora).
+        """
+        if not images:
+            return {}
+
+        workers = min(self.max_concurrency, len(images))
+        if workers == 1:
+            out: dict[int, str] = {}
+            for idx, img, media_type in images:
+                out[idx] = self._analyze(img, media_type)
+                if on_page is not None:
+                    on_page(len(out))
+            return out
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="vision") as pool:
+            futures = {
+                pool.submit(self._analyze, img, media_type): idx
+                for idx, img, media_type in images
+            }
+            out = {}
+            for fut in as_completed(futures):
+                out[futures[fut]] = fut.result()
+                if on_page is not None:
+                    on_page(len(out))
+            return out
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+    def _get_client(self) -> Any:
+        with self._client_lock:
+            if self._client is None:
+                if not self.api_key:
+                    raise RuntimeError(
+                        "OCR retornou resultado insuficiente e ANTHROPIC_API_KEY não está definida. "
+                        "Configure a variável de ambiente para habilitar análise de diagramas via Claude Vision."
+                    )
+                import anthropic
+
+                # Retries ficam a cargo do analyzer (com backoff e rate limit próprios)
+                self._client = anthropic.Anthropic(api_key=self.api_key, max_retries=0)
+            return self._client
+
+    def _analyze(self, image_bytes: bytes, media_type: str) -> str:
+        client = self._get_client()
+        b64 = base64.standard_b64encode(image_bytes).decode("utf-8")
+
+        attempt = 0
+        while True:
+            self._bucket.acquire()
+            try:
+                message = client.messages.create(
+                    model=self.model,
+                    max_tokens=4096,
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": [
+                                {
+                                    "type": "image",
+                                    "source": {
+                                        "type": "base64",
+                                        "media_type": media_type,
+                                        "data": b64,
+                                    },
+                                },
+                                {"type": "text", "text": _VISION_PROMPT},
+                            ],
+                        }
+                    ],
+                )
+                return message.content[0].text.strip()
+            except Exception as exc:
+                if attempt >= self.max_retries or not _is_retryable(exc):
+                    raise
+                delay = _retry_after_s(exc)
+                if delay is None:
+                    delay = self.backoff_base_s * (2 ** attempt) * (0.5 + random.random())
+                attempt += 1
+                time.sleep(delay)
@@ -0,0 +1,406 @@
+# -*- coding: utf-8 -*-
+"""
+API HTTP (FastAPI/ASGI) com os casos de uso do agente, para outros sistemas
+internos — os futuros agentes satélites por área.
+
+Endpoints:
+    POST /v1/chat            resposta completa (JSON)
+    POST /v1/chat/stream     resposta em pedaços (Server-Sent Events)
+    POST /v1/pdf/explain     upload de PDF (multipart) → explicação
+    GET  /health             estado e ocupação dos limitadores
+    GET  /metrics            histogramas por etapa (formato Prometheus)
+
+Os adaptadores dos provedores (e os pools de conexão HTTP dos SDKs) são
+criados uma vez, no startup, e compartilhados por todas as requisições.
+Cada rota passa por um limitador de concorrência com fila limitada: com a
+fila cheia, ou depois de esperar demais por uma vaga, a resposta é 429 com
+Retry-After — o serviço recusa cedo em vez de acumular requisições até todas
+estourarem o tempo.
+
+Uso:
+    uvicorn src.presentation.api:app --host 0.0.0.0 --port 8000
+    python -m src.presentation.api                       # API_HOST / API_PORT
+    LLM_PROVIDERS=fake python -m src.presentation.api    # sem chave (teste de carga)
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Dict, Iterator, List, Literal, Optional
+
+import anyio
+from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+
+from src.application.document_use_cases import ExplainPdfUC
+from src.application.history_manager import HistoryManager
+from src.application.use_cases import ChatAgentUC
+from src.bootstrap import (
+    build_explain_pdf_uc,
+    build_extraction_cache,
+    build_llm,
+    build_pdf_extractor,
+    build_rasterizer,
+    build_vision_analyzer,
+    configure_telemetry,
+)
+from src.config import get_settings
+from src.domain.models import AgentResponse, ChatMessage
+from src.domain.ports import LLMPort
+from src.infrastructure.pdf_extractor import PdfTextExtractor, format_page, overall_method
+from src.telemetry import Trace, registry
+
+DEFAULT_GOAL = "Explique o conteúdo em linguagem simples e destaque os pontos importantes."
+
+_RETRY_AFTER_S = 1
+_PDF_PATH = "/v1/pdf/"
+
+
+# ---------------------------------------------------------------------------
+# Contrapressão
+# ---------------------------------------------------------------------------
+class Saturated(Exception):
+    def __init__(self, limiter: str) -> None:
+        super().__init__(f"Serviço ocupado ({limiter}); tente novamente em instantes.")
+        self.limiter = limiter
+
+
+class ConcurrencyLimiter:
+    """
+    Semáforo com fila de espera limitada. Só é usado de dentro do event loop
+    (sem locks): as contagens mudam apenas entre pontos de `await`.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, *, max_queue: int, queue_timeout_s: float) -> None:
+        self.name = name
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout_s = queue_timeout_s
+        self._sem = asyncio.Semaphore(self.max_concurrent)
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    async def acquire(self) -> None:
+        if self._sem.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise Saturated(self.name)
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._sem.acquire(), self.queue_timeout_s)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise Saturated(self.name) from None
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._sem.release()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+        }
+
+
+class BodySizeLimitMiddleware:
+    """
+    Recusa corpos grandes demais com 413: pelo Content-Length, antes de ler
+    qualquer byte, e contando o que chega quando o cliente não informa o tamanho.
+    """
+
+    def __init__(self, app: Any, *, max_bytes: int, max_pdf_bytes: int) -> None:
+        self.app = app
+        self.max_bytes = max_bytes
+        self.max_pdf_bytes = max_pdf_bytes
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.max_pdf_bytes if scope["path"].startswith(_PDF_PATH) else self.max_bytes
+        headers = dict(scope.get("headers") or [])
+        length = headers.get(b"content-length")
+        if length is not None and length.isdigit() and int(length) > limit:
+            response = JSONResponse({"detail": _too_large(limit)}, status_code=413)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def _receive() -> Dict[str, Any]:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # HTTPException atravessa o parser do corpo do FastAPI como está
+                    raise HTTPException(status_code=413, detail=_too_large(limit))
+            return message
+
+        await self.app(scope, _receive, send)
+
+
+def _too_large(limit: int) -> str:
+    return f"Corpo da requisição acima do limite de {limit / (1024 * 1024):.1f} MB."
+
+
+# ---------------------------------------------------------------------------
+# Serviços compartilhados (criados no startup)
+# ---------------------------------------------------------------------------
+@dataclass
+class ApiServices:
+    llm: LLMPort
+    extractor: PdfTextExtractor
+    explain_uc: ExplainPdfUC
+    chat_limiter: ConcurrencyLimiter
+    pdf_limiter: ConcurrencyLimiter
+
+    def chat_uc(self) -> ChatAgentUC:
+        # A API não guarda conversa: o cliente manda o histórico, resumido aqui se passar do orçamento
+        history_manager = HistoryManager(
+            self.llm, token_budget=get_settings().history_token_budget, background=False
+        )
+        return ChatAgentUC(llm=self.llm, history_manager=history_manager)
+
+
+class MessageIn(BaseModel):
+    role: Literal["user", "assistant"]
+    content: str
+
+
+class ChatRequest(BaseModel):
+    message: str = Field(min_length=1)
+    history: List[MessageIn] = Field(default_factory=list)
+    model: Optional[str] = None
+
+    def chat_history(self) -> List[ChatMessage]:
+        return [ChatMessage(role=m.role, content=m.content) for m in self.history]
+
+
+def _response_json(resp: AgentResponse) -> Dict[str, Any]:
+    return asdict(resp)
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _explain_pdf(
+    services: ApiServices,
+    file_bytes: bytes,
+    *,
+    goal: str,
+    model: str,
+    max_pages: Optional[int],
+) -> Dict[str, Any]:
+    """Roda numa thread: extração sob demanda, como no lote, até o orçamento de texto do LLM."""
+    trace = Trace("extract_pdf")
+    page_methods: Dict[str, str] = {}
+
+    def _pages() -> Iterator[str]:
+        for page in services.extractor.iter_pages(file_bytes, max_pages=max_pages):
+            page_methods[str(page.number)] = page.method
+            yield format_page(page)
+
+    pages = _pages()
+    try:
+        with trace.activate():
+            total_pages = services.extractor.page_count(file_bytes)
+            first = next((p for p in pages if p), None)
+        if first is None:
+            raise HTTPException(status_code=422, detail="Não foi possível extrair texto desse PDF.")
+        resp = services.explain_uc.run(
+            model=model, history=[], user_goal=goal, pages=itertools.chain([first], pages)
+        )
+    finally:
+        pages.close()
+    trace.finish()
+
+    result = _response_json(resp)
+    result["breakdown_ms"] = {**trace.breakdown_ms(), **resp.breakdown_ms}
+    result["pages"] = total_pages
+    result["pages_processed"] = len(page_methods)
+    result["method"] = overall_method(page_methods.values())
+    result["page_methods"] = page_methods
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Aplicação
+# ---------------------------------------------------------------------------
+def create_app(
+    *,
+    llm: Optional[LLMPort] = None,
+    extractor: Optional[PdfTextExtractor] = None,
+) -> FastAPI:
+    """`llm`/`extractor`: substituem os montados pelo Settings (ex.: LLM falso nos testes de carga)."""
+    settings = get_settings()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        configure_telemetry()
+        shared_llm = llm if llm is not None else build_llm()
+        app.state.services = ApiServices(
+            llm=shared_llm,
+            extractor=extractor if extractor is not None else build_pdf_extractor(
+                cache=build_extraction_cache(),
+                vision=build_vision_analyzer(),
+                rasterizer=build_rasterizer(),
+            ),
+            explain_uc=build_explain_pdf_uc(shared_llm),
+            chat_limiter=ConcurrencyLimiter(
+                "chat",
+                settings.api_max_concurrency,
+                max_queue=settings.api_max_queue,
+                queue_timeout_s=settings.api_queue_timeout_s,
+            ),
+            pdf_limiter=ConcurrencyLimiter(
+                "pdf",
+                settings.api_pdf_max_concurrency,
+                max_queue=settings.api_max_queue,
+                queue_timeout_s=settings.api_queue_timeout_s,
+            ),
+        )
+        # As chamadas ao LLM bloqueiam uma thread do pool do anyio: ao menos uma por vaga
+        threads = anyio.to_thread.current_default_thread_limiter()
+        threads.total_tokens = max(
+            threads.total_tokens,
+            settings.api_max_concurrency + settings.api_pdf_max_concurrency + 4,
+        )
+        yield
+        registry.maybe_flush()
+
+    app = FastAPI(title="GF Agent API", lifespan=lifespan)
+    app.add_middleware(
+        BodySizeLimitMiddleware,
+        max_bytes=settings.api_max_body_kb * 1024,
+        max_pdf_bytes=settings.api_max_pdf_mb * 1024 * 1024,
+    )
+
+    @app.exception_handler(Saturated)
+    async def _saturated(request: Request, exc: Saturated) -> JSONResponse:
+        return JSONResponse(
+            {"detail": str(exc)},
+            status_code=429,
+            headers={"Retry-After": str(_RETRY_AFTER_S)},
+        )
+
+    @app.get("/health")
+    async def health(request: Request) -> Dict[str, Any]:
+        services: ApiServices = request.app.state.services
+        return {
+            "status": "ok",
+            "chat": services.chat_limiter.stats(),
+            "pdf": services.pdf_limiter.stats(),
+        }
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def metrics() -> str:
+        return registry.render_prometheus()
+
+    @app.post("/v1/chat")
+    async def chat(body: ChatRequest, request: Request) -> Dict[str, Any]:
+        services: ApiServices = request.app.state.services
+        async with services.chat_limiter.slot():
+            resp = await run_in_threadpool(
+                services.chat_uc().run,
+                model=body.model or settings.gemini_model,
+                history=body.chat_history(),
+                user_text=body.message,
+            )
+        return _response_json(resp)
+
+    @app.post("/v1/chat/stream")
+    async def chat_stream(body: ChatRequest, request: Request) -> StreamingResponse:
+        services: ApiServices = request.app.state.services
+        limiter = services.chat_limiter
+        # A vaga fica presa até o último pedaço (ou a desconexão do cliente)
+        await limiter.acquire()
+        try:
+            stream = await run_in_threadpool(
+                services.chat_uc().stream,
+                model=body.model or settings.gemini_model,
+                history=body.chat_history(),
+                user_text=body.message,
+            )
+        except BaseException:
+            limiter.release()
+            raise
+
+        async def _events() -> AsyncIterator[str]:
+            try:
+                async for chunk in iterate_in_threadpool(iter(stream)):
+                    yield _sse("delta", {"text": chunk})
+                yield _sse("done", _response_json(stream.response))
+            except Exception as exc:  # o status 200 já foi enviado: o erro vai como evento
+                yield _sse("error", {"detail": f"{type(exc).__name__}: {exc}"})
+            finally:
+                limiter.release()
+
+        return StreamingResponse(
+            _events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    @app.post("/v1/pdf/explain")
+    async def explain_pdf(
+        request: Request,
+        file: UploadFile = File(...),
+        goal: str = Form(DEFAULT_GOAL),
+        model: Optional[str] = Form(None),
+        max_pages: Optional[int] = Form(None, ge=1),
+    ) -> Dict[str, Any]:
+        services: ApiServices = request.app.state.services
+        file_bytes = await file.read()
+        if not file_bytes.startswith(b"%PDF"):
+            raise HTTPException(status_code=415, detail="O arquivo enviado não é um PDF.")
+
+        async with services.pdf_limiter.slot():
+            result = await run_in_threadpool(
+                _explain_pdf,
+                services,
+                file_bytes,
+                goal=goal,
+                model=model or settings.gemini_model,
+                max_pages=max_pages,
+            )
+        result["name"] = file.filename
+        return result
+
+    return app
+
+
+app = create_app()
+
+
+def main() -> None:
+    import uvicorn
+
+    settings = get_settings()
+    uvicorn.run(app, host=settings.api_host, port=settings.api_port)
+
+
+if __name__ == "__main__":
+    main()
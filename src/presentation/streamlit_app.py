@@ -1,8 +1,13 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import hashlib
 import sys
+import uuid
+from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 ROOT = Path(__file__).resolve().parents[2]
 if str(ROOT) not in sys.path:
@@ -10,12 +15,38 @@ if str(ROOT) not in sys.path:
 
 import streamlit as st
 
-from src.application.document_use_cases import ExplainPdfUC
+from src.application.history_manager import HistoryManager
+from src.application.job_manager import JobContext, JobManager
+from src.application.rag_use_cases import AskDocumentsUC, DocumentIndexer
+from src.application.search_use_cases import ExplainPageHitsUC, LexicalIndexer
 from src.application.use_cases import ChatAgentUC
-from src.config import settings
-from src.domain.models import ChatMessage
-from src.infrastructure.gemini_llm import GeminiLLMAdapter
-from src.infrastructure.pdf_extractor import PdfTextExtractor
+from src.bootstrap import (
+    build_conversation,
+    build_conversation_store,
+    build_explain_pdf_uc,
+    build_extraction_cache,
+    build_lexical_index,
+    build_llm,
+    build_pdf_extractor,
+    build_rag_components,
+    build_rasterizer,
+    build_vision_analyzer,
+    configure_telemetry,
+)
+from src.config import get_settings
+from src.domain.models import AgentResponse, ChatMessage
+from src.domain.ports import ConversationStorePort, EmbedderPort, LexicalIndexPort, LLMPort
+from src.telemetry import Trace
+
+if TYPE_CHECKING:
+    # Só anotações: os adaptadores são importados pelo bootstrap quando montados
+    from src.infrastructure.extraction_cache import PdfExtractionCache
+    from src.infrastructure.pdf_extractor import PdfExtractResult
+    from src.infrastructure.rasterizer import PageRasterizer
+    from src.infrastructure.vector_store import NumpyVectorStore
+    from src.infrastructure.vision_analyzer import ClaudeVisionAnalyzer
+
+settings = get_settings()
 
 # ---------------------------------------------------------------------------
 # Configuração da página
@@ -62,8 +93,29 @@ st.divider()
 # ---------------------------------------------------------------------------
 # Estado da sessão
 # ---------------------------------------------------------------------------
+@st.cache_resource
+def get_conversation_store() -> ConversationStorePort | None:
+    return build_conversation_store()
+
+
+conversation_store = get_conversation_store()
+
+# Identificador na URL: reabrir a página com ele restaura a conversa gravada
+if "session_id" not in st.session_state:
+    st.session_state.session_id = st.query_params.get("sessao") or uuid.uuid4().hex
+    if conversation_store is not None:
+        st.query_params["sessao"] = st.session_state.session_id
+
 if "history" not in st.session_state:
-    st.session_state.history: list[ChatMessage] = []
+    # Memória limitada por sessão: mensagens antigas comprimidas e, acima do limite, descartadas
+    st.session_state.history = build_conversation(
+        store=conversation_store, session_id=st.session_state.session_id
+    )
+
+
+def _save_history() -> None:
+    if conversation_store is not None:
+        conversation_store.save(st.session_state.session_id, st.session_state.history.dumps())
 
 # ---------------------------------------------------------------------------
 # Sidebar
@@ -90,31 +142,142 @@ with st.sidebar:
     )
     run_pdf = st.button("Explicar PDF", use_container_width=True)
 
+    st.markdown("---")
+    st.subheader("Documentos internos")
+    use_rag = st.checkbox(
+        "Responder com base nos documentos indexados",
+        help="Os PDFs explicados são indexados automaticamente.",
+    )
+
     st.markdown("---")
     st.subheader("Status da sessão")
     st.write(f"Mensagens: **{len(st.session_state.history)}**")
+    st.caption(f"Memória da conversa: {st.session_state.history.nbytes / 1024:.0f} KB")
 
     if st.button("Limpar conversa", use_container_width=True):
-        st.session_state.history = []
+        st.session_state.history.clear()
+        if conversation_store is not None:
+            conversation_store.delete(st.session_state.session_id)
+        if "history_manager" in st.session_state:
+            st.session_state.history_manager.reset()
         st.rerun()
 
 # ---------------------------------------------------------------------------
 # Instâncias de serviço
 # ---------------------------------------------------------------------------
 @st.cache_resource
-def get_llm() -> GeminiLLMAdapter:
+def init_telemetry() -> None:
+    configure_telemetry()
+
+
+@st.cache_resource
+def get_llm() -> LLMPort:
     api_key = (
         st.secrets.get("GEMINI_API_KEY")
         if hasattr(st, "secrets")
         else None
     ) or settings.gemini_api_key
-    return GeminiLLMAdapter(api_key=api_key)
+    return build_llm(api_key)
+
+
+@st.cache_resource
+def get_extraction_cache() -> PdfExtractionCache | None:
+    return build_extraction_cache()
+
+
+@st.cache_resource
+def get_vision_analyzer() -> ClaudeVisionAnalyzer:
+    return build_vision_analyzer()
+
+
+@st.cache_resource
+def get_rasterizer() -> PageRasterizer | None:
+    return build_rasterizer()
+
+
+@st.cache_resource
+def get_job_manager() -> JobManager:
+    # Compartilhado entre sessões: jobs sobrevivem a reruns e não travam a página
+    return JobManager(max_workers=settings.job_workers)
+
+
+@st.cache_resource
+def get_rag_components() -> tuple[EmbedderPort, NumpyVectorStore]:
+    return build_rag_components()
 
 
+@st.cache_resource
+def get_lexical_index() -> LexicalIndexPort | None:
+    return build_lexical_index()
+
+
+def _call_caption(resp: AgentResponse) -> str:
+    info = resp.call_info
+    if info is None:
+        return ""
+
+    caption = ""
+    if info.provider is not None:
+        caption += f" · Provedor: {info.provider} ({info.provider_model})"
+        if info.hedged:
+            caption += " · requisição duplicada (hedge)"
+        if info.failovers:
+            caption += f" · {info.failovers} provedor(es) falharam antes"
+    if info.cache_status is None:
+        return caption
+    label = {
+        "hit": "resposta em cache",
+        "semantic": "pergunta semelhante em cache",
+        "miss": "nova consulta",
+        "bypass": "sem cache",
+    }.get(info.cache_status, info.cache_status)
+    return caption + f" · Cache: {label} (taxa de acerto {info.cache_hit_rate:.0%})"
+
+
+def _breakdown_caption(breakdown_ms: dict[str, float]) -> None:
+    if not breakdown_ms:
+        return
+    # Etapas mais lentas primeiro; chamadas paralelas somam o tempo de cada uma
+    parts = sorted(breakdown_ms.items(), key=lambda item: item[1], reverse=True)
+    st.caption("Tempo por etapa: " + " · ".join(f"{name} {ms:.1f} ms" for name, ms in parts))
+
+
+init_telemetry()
 llm = get_llm()
-agent = ChatAgentUC(llm=llm)
-pdf_uc = ExplainPdfUC(llm=llm)
-pdf_extractor = PdfTextExtractor()
+job_manager = get_job_manager()
+
+# Um gerenciador de histórico por sessão (mantém o resumo incremental da conversa)
+if "history_manager" not in st.session_state:
+    st.session_state.history_manager = HistoryManager(
+        llm, token_budget=settings.history_token_budget
+    )
+    # O resumo incremental acompanha as mensagens que saem pelo limite de memória
+    st.session_state.history.on_evict = st.session_state.history_manager.discard_oldest
+
+agent = ChatAgentUC(llm=llm, history_manager=st.session_state.history_manager)
+embedder, document_index = get_rag_components()
+indexer = DocumentIndexer(embedder, document_index)
+rag_uc = AskDocumentsUC(
+    llm,
+    embedder,
+    document_index,
+    history_manager=st.session_state.history_manager,
+    top_k=settings.rag_top_k,
+)
+pdf_uc = build_explain_pdf_uc(llm, history_manager=st.session_state.history_manager)
+lexical_index = get_lexical_index()
+lexical_indexer = LexicalIndexer(lexical_index) if lexical_index is not None else None
+hits_uc = (
+    ExplainPageHitsUC(lexical_index, pdf_uc, top_pages=settings.lexical_top_pages)
+    if lexical_index is not None
+    else None
+)
+extraction_cache = get_extraction_cache()
+pdf_extractor = build_pdf_extractor(
+    cache=extraction_cache,
+    vision=get_vision_analyzer(),
+    rasterizer=get_rasterizer(),
+)
 
 # ---------------------------------------------------------------------------
 # Layout principal
@@ -134,8 +297,27 @@ with col_chat:
 
 with col_panel:
     st.markdown('<div class="gf-panel">', unsafe_allow_html=True)
+    st.subheader("Documentos indexados")
+    st.write(f"Trechos no índice: **{len(document_index)}**")
+
+    explain_hits = False
+    if hits_uc is not None:
+        st.subheader("Busca nos PDFs")
+        search_query = st.text_input(
+            "Termo, cláusula ou CNPJ",
+            help="Busca nas páginas de todos os PDFs já extraídos (acentos e pontuação ignorados).",
+        )
+        if search_query:
+            page_hits = hits_uc.search(search_query)
+            if not page_hits:
+                st.write("Nenhuma página encontrada.")
+            for hit in page_hits:
+                st.markdown(f"**{hit.title}** — p. {hit.page} · {hit.score:.2f}")
+                st.caption(hit.snippet)
+            explain_hits = bool(page_hits) and st.button(
+                "Explicar páginas encontradas", use_container_width=True
+            )
     st.subheader("Próximas evoluções")
-    st.write("- RAG com documentos internos")
     st.write("- Agentes satélites por área")
     st.write("- Políticas e governança")
     st.markdown("</div>", unsafe_allow_html=True)
@@ -143,47 +325,206 @@ with col_panel:
 # ---------------------------------------------------------------------------
 # Fluxo PDF
 # ---------------------------------------------------------------------------
+@dataclass(frozen=True)
+class PdfJobResult:
+    name: str
+    goal: str
+    max_pages: int
+    extracted: PdfExtractResult
+    response: AgentResponse
+    extract_breakdown_ms: dict[str, float]
+
+
+_STAGE_LABELS = {
+    "": "Na fila...",
+    "text": "Lendo a camada de texto",
+    "ocr": "OCR das páginas digitalizadas",
+    "vision": "Analisando diagramas com Claude Vision",
+    "llm": "Gerando a explicação",
+}
+
+
+def _run_pdf_job(
+    ctx: JobContext,
+    *,
+    file_bytes: bytes,
+    name: str,
+    goal: str,
+    model: str,
+    max_pages: int,
+    history: list[ChatMessage],
+) -> PdfJobResult:
+    trace = Trace("extract_pdf")
+    with trace.activate():
+        extracted = pdf_extractor.extract(file_bytes, max_pages=max_pages, progress=ctx.progress)
+    trace.finish()
+    if not extracted.text.strip():
+        raise RuntimeError("Não foi possível extrair texto desse PDF.")
+
+    doc_id = hashlib.sha256(file_bytes).hexdigest()
+    indexer.index_document(doc_id=doc_id, title=name, text=extracted.text)
+    if lexical_indexer is not None:
+        lexical_indexer.index_document(doc_id=doc_id, title=name, text=extracted.text)
+
+    ctx.progress("llm")
+    stream = pdf_uc.stream(model=model, history=history, pdf_text=extracted.text, user_goal=goal)
+    for chunk in stream:
+        ctx.append_text(chunk)
+
+    return PdfJobResult(
+        name=name,
+        goal=goal,
+        max_pages=max_pages,
+        extracted=extracted,
+        response=stream.response,
+        extract_breakdown_ms=trace.breakdown_ms(),
+    )
+
+
+@st.fragment(run_every=settings.job_poll_interval_s)
+def _pdf_job_panel() -> None:
+    job = job_manager.get(st.session_state.pdf_job_id)
+    if job is None:
+        st.session_state.pdf_job_id = None
+        return
+
+    if not job.finished:
+        label = _STAGE_LABELS.get(job.stage, job.stage)
+        if job.total:
+            label += f" — {job.done}/{job.total} páginas"
+        st.progress(job.fraction if job.stage != "llm" else 1.0, text=f"**{job.label}** · {label}")
+        if job.partial_text:
+            st.markdown(job.partial_text)
+        return
+
+    # Concluído: entra no histórico uma única vez e a página volta ao fluxo normal
+    st.session_state.pdf_job_id = None
+    if job.state == "error":
+        st.session_state.pdf_job_error = f"{job.label}: {job.error}"
+    else:
+        result: PdfJobResult = job.result
+        st.session_state.history.append(
+            ChatMessage(role="user", content=f"[PDF] {result.name} — {result.goal}")
+        )
+        st.session_state.history.append(ChatMessage(role="assistant", content=result.response.text))
+        _save_history()
+        st.session_state.pdf_result = result
+    st.rerun(scope="app")
+
+
+def _render_pdf_result(result: PdfJobResult) -> None:
+    extracted, resp = result.extracted, result.response
+    method_label = {
+        "text": "texto selecionável",
+        "ocr": "OCR",
+        "vision": "Claude Vision",
+        "hybrid": "misto (por página)",
+    }.get(extracted.method, extracted.method)
+
+    st.success(
+        f"**{result.name}** | "
+        f"Páginas no arquivo: {extracted.pages} | "
+        f"Processadas: {result.max_pages} | "
+        f"Método: {method_label}"
+    )
+    if extracted.method == "hybrid":
+        st.caption(
+            "Método por página: "
+            + ", ".join(f"{n}: {m}" for n, m in extracted.page_methods.items())
+        )
+
+    st.caption(
+        f"Modelo: {resp.used_model} · Latência: {resp.latency_ms} ms · "
+        f"Primeiro trecho: {resp.ttft_ms} ms"
+        + _call_caption(resp)
+    )
+    for note in resp.safety_notes:
+        st.caption(note)
+    _breakdown_caption({**result.extract_breakdown_ms, **resp.breakdown_ms})
+    if resp.chunk_latencies_ms:
+        st.caption(
+            f"Documento longo lido em {len(resp.chunk_latencies_ms)} partes · "
+            f"latência por parte: máx {max(resp.chunk_latencies_ms)} ms, "
+            f"média {sum(resp.chunk_latencies_ms) // len(resp.chunk_latencies_ms)} ms"
+        )
+    if extracted.image_stats is not None and extracted.image_stats.pages:
+        img_stats = extracted.image_stats
+        st.caption(
+            f"Imagens: {img_stats.pages} páginas rasterizadas · "
+            f"{img_stats.blank_pages_skipped} em branco ignoradas · "
+            f"{img_stats.bytes_saved / 1024:.0f} KB economizados no envio ao Vision"
+        )
+    if extraction_cache is not None:
+        stats = extraction_cache.stats()
+        st.caption(
+            f"Cache de extração: {stats.hits} páginas em cache · "
+            f"{stats.misses} processadas · taxa de acerto {stats.hit_rate:.0%}"
+        )
+
+
 if run_pdf:
     if not uploaded_pdf:
         st.warning("Envie um PDF antes de continuar.")
     else:
-        file_bytes = uploaded_pdf.read()
-
-        with st.spinner("Extraindo texto do PDF..."):
-            extracted = pdf_extractor.extract(file_bytes, max_pages=int(max_pages))
+        file_bytes = uploaded_pdf.getvalue()
+        # Mesmo PDF, objetivo, modelo e limite na mesma sessão e com o mesmo
+        # histórico: reaproveita o job em vez de refazer. O JobManager é
+        # compartilhado entre sessões — sem a sessão e o histórico na chave, um
+        # usuário receberia a resposta montada com a conversa de outro.
+        job_key = "|".join((
+            st.session_state.session_id,
+            hashlib.sha256(st.session_state.history.dumps()).hexdigest(),
+            hashlib.sha256(file_bytes).hexdigest(), pdf_goal, model, str(int(max_pages)),
+        ))
+        st.session_state.pdf_job_id = job_manager.submit(
+            partial(
+                _run_pdf_job,
+                file_bytes=file_bytes,
+                name=uploaded_pdf.name,
+                goal=pdf_goal,
+                model=model,
+                max_pages=int(max_pages),
+                history=list(st.session_state.history),
+            ),
+            label=uploaded_pdf.name,
+            key=job_key,
+        )
+        st.session_state.pdf_result = None
+        st.session_state.pdf_job_error = None
 
-        if not extracted.text.strip():
-            st.error("Não foi possível extrair texto desse PDF.")
-        else:
-            method_label = {
-                "text": "texto selecionável",
-                "ocr": "OCR",
-                "vision": "Claude Vision",
-            }.get(extracted.method, extracted.method)
-
-            with st.spinner("Gerando explicação..."):
-                resp = pdf_uc.run(
-                    model=model,
-                    history=st.session_state.history,
-                    pdf_text=extracted.text,
-                    user_goal=pdf_goal,
-                )
-
-            st.session_state.history.append(
-                ChatMessage(role="user", content=f"[PDF] {uploaded_pdf.name} — {pdf_goal}")
-            )
-            st.session_state.history.append(
-                ChatMessage(role="assistant", content=resp.text)
-            )
+if st.session_state.get("pdf_job_id"):
+    _pdf_job_panel()
+elif st.session_state.get("pdf_job_error"):
+    st.error(st.session_state.pdf_job_error)
+elif st.session_state.get("pdf_result") is not None:
+    _render_pdf_result(st.session_state.pdf_result)
 
-            st.success(
-                f"**{uploaded_pdf.name}** | "
-                f"Páginas no arquivo: {extracted.pages} | "
-                f"Processadas: {int(max_pages)} | "
-                f"Método: {method_label}"
-            )
-            st.write(resp.text)
-            st.caption(f"Modelo: {resp.used_model} · Latência: {resp.latency_ms} ms")
+# ---------------------------------------------------------------------------
+# Fluxo busca: explica só as páginas encontradas
+# ---------------------------------------------------------------------------
+if explain_hits:
+    st.session_state.history.append(
+        ChatMessage(role="user", content=f"[Busca] {search_query}")
+    )
+    with st.chat_message("assistant"):
+        stream = hits_uc.stream(
+            model=model,
+            history=st.session_state.history[:-1],
+            query=search_query,
+            hits=page_hits,
+        )
+        st.write_stream(stream)
+        resp = stream.response
+        st.caption(
+            f"Modelo: {resp.used_model} · Latência: {resp.latency_ms} ms · "
+            f"{len(page_hits)} páginas enviadas"
+            + _call_caption(resp)
+        )
+        for note in resp.safety_notes:
+            st.caption(note)
+        _breakdown_caption(resp.breakdown_ms)
+    st.session_state.history.append(ChatMessage(role="assistant", content=resp.text))
+    _save_history()
 
 # ---------------------------------------------------------------------------
 # Fluxo chat
@@ -192,13 +533,26 @@ if user_text:
     st.session_state.history.append(ChatMessage(role="user", content=user_text))
 
     with st.chat_message("assistant"):
-        with st.spinner("Processando..."):
-            resp = agent.run(
+        if use_rag:
+            stream = rag_uc.stream(
+                model=model,
+                history=st.session_state.history[:-1],
+                question=user_text,
+            )
+        else:
+            stream = agent.stream(
                 model=model,
                 history=st.session_state.history[:-1],
                 user_text=user_text,
             )
-            st.markdown(resp.text)
-            st.caption(f"Modelo: {resp.used_model} · Latência: {resp.latency_ms} ms")
+        st.write_stream(stream)
+        resp = stream.response
+        st.caption(
+            f"Modelo: {resp.used_model} · Latência: {resp.latency_ms} ms · "
+            f"Primeiro trecho: {resp.ttft_ms} ms"
+            + _call_caption(resp)
+        )
+        _breakdown_caption(resp.breakdown_ms)
 
-    st.session_state.history.append(ChatMessage(role="assistant", content=resp.text))
\ No newline at end of file
+    st.session_state.history.append(ChatMessage(role="assistant", content=resp.text))
+    _save_history()
\ No newline at end of file
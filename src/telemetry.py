@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+Instrumentação leve de latência.
+
+- `span(nome)` mede um trecho com `perf_counter_ns` (relógio monotônico).
+- Cada requisição tem um `Trace`, propagado por contextvars: spans abertos em
+  qualquer camada (política, extração de PDF, chamadas ao LLM) entram na
+  quebra por etapa da requisição em andamento (`Trace.breakdown_ms`).
+- Todos os spans alimentam histogramas globais, exportáveis em formato texto
+  do Prometheus (arquivo para o textfile collector ou resposta de /metrics).
+- Ponte opcional para OpenTelemetry: com o SDK instalado e `configure(otel=True)`,
+  cada span também vira um span OTel (aninhado pelo próprio contexto do OTel).
+
+Pools de threads não herdam contextvars: funções submetidas a um executor
+devem passar por `bind` para que seus spans caiam no trace de quem submeteu.
+"""
+from __future__ import annotations
+
+import atexit
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Limites dos buckets dos histogramas, em segundos
+_BUCKETS_S: Tuple[float, ...] = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+
+@dataclass(frozen=True)
+class SpanRecord:
+    name: str
+    start_ns: int  # perf_counter_ns — só faz sentido relativo a outros spans do processo
+    duration_ns: int
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration_ms(self) -> float:
+        return self.duration_ns / 1e6
+
+
+class Trace:
+    """Spans de uma requisição. Aceita spans de várias threads (fase map, roteador)."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns: Optional[int] = None
+        self._spans: List[SpanRecord] = []
+        self._lock = threading.Lock()
+
+    @property
+    def spans(self) -> Tuple[SpanRecord, ...]:
+        with self._lock:
+            return tuple(self._spans)
+
+    def add(self, record: SpanRecord) -> None:
+        with self._lock:
+            self._spans.append(record)
+
+    @contextmanager
+    def activate(self) -> Iterator[Trace]:
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+    def elapsed_ms(self) -> int:
+        end = self.end_ns if self.end_ns is not None else time.perf_counter_ns()
+        return (end - self.start_ns) // 1_000_000
+
+    def finish(self) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.perf_counter_ns()
+        registry.observe(f"request.{self.name}", self.end_ns - self.start_ns)
+        registry.maybe_flush()
+
+    def breakdown_ms(self) -> Dict[str, float]:
+        """
+        Tempo somado por nome de span, em ms. Etapas paralelas (fase map, OCR)
+        somam o tempo de cada chamada e podem passar do tempo de parede.
+        """
+        totals: Dict[str, int] = {}
+        for record in self.spans:
+            totals[record.name] = totals.get(record.name, 0) + record.duration_ns
+        return {name: round(ns / 1e6, 1) for name, ns in totals.items()}
+
+
+_current: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("gf_trace", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Mede o bloco. O dicionário devolvido aceita atributos descobertos no meio
+    do caminho (ex.: status do cache); exceções marcam o atributo "error".
+    """
+    otel_cm = _otel_tracer.start_as_current_span(name) if _otel_tracer is not None else None
+    otel_span = otel_cm.__enter__() if otel_cm is not None else None
+    start = time.perf_counter_ns()
+    try:
+        yield attrs
+    except Exception as exc:
+        attrs["error"] = type(exc).__name__
+        raise
+    finally:
+        duration = time.perf_counter_ns() - start
+        trace = _current.get()
+        if trace is not None:
+            trace.add(SpanRecord(name=name, start_ns=start, duration_ns=duration, attrs=dict(attrs)))
+        registry.observe(name, duration)
+        if otel_span is not None:
+            otel_span.set_attributes({k: v for k, v in attrs.items() if v is not None})
+            otel_cm.__exit__(None, None, None)
+
+
+def bind(fn: Callable[..., T]) -> Callable[..., T]:
+    """Amarra `fn` ao contexto atual (trace e span OTel) para rodar em outra thread."""
+    ctx = contextvars.copy_context()
+
+    def _run(*args: Any, **kwargs: Any) -> T:
+        # Uma cópia por chamada: o mesmo Context não pode estar ativo em duas threads
+        return ctx.copy().run(fn, *args, **kwargs)
+
+    return _run
+
+
+# ---------------------------------------------------------------------------
+# Métricas agregadas (histogramas por nome de span)
+# ---------------------------------------------------------------------------
+class _Histogram:
+    __slots__ = ("buckets", "count", "sum_ns")
+
+    def __init__(self) -> None:
+        self.buckets = [0] * len(_BUCKETS_S)
+        self.count = 0
+        self.sum_ns = 0
+
+    def observe(self, duration_ns: int) -> None:
+        self.count += 1
+        self.sum_ns += duration_ns
+        seconds = duration_ns / 1e9
+        for i, bound in enumerate(_BUCKETS_S):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, _Histogram] = {}
+        self.path: Optional[Path] = None
+        self.flush_interval_s = 10.0
+        self._last_flush = 0.0
+        self._flush_lock = threading.Lock()
+
+    def observe(self, name: str, duration_ns: int) -> None:
+        with self._lock:
+            hist = self._histograms.get(name)
+            if hist is None:
+                hist = self._histograms[name] = _Histogram()
+            hist.observe(duration_ns)
+
+    def render_prometheus(self) -> str:
+        with self._lock:
+            snapshot = {
+                name: (list(h.buckets), h.count, h.sum_ns)
+                for name, h in sorted(self._histograms.items())
+            }
+
+        lines = [
+            "# HELP gf_span_duration_seconds Duração das etapas instrumentadas.",
+            "# TYPE gf_span_duration_seconds histogram",
+        ]
+        for name, (buckets, count, sum_ns) in snapshot.items():
+            label = f'span="{_escape_label(name)}"'
+            cumulative = 0
+            for bound, n in zip(_BUCKETS_S, buckets):
+                cumulative += n
+                lines.append(f'gf_span_duration_seconds_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f'gf_span_duration_seconds_bucket{{{label},le="+Inf"}} {count}')
+            lines.append(f"gf_span_duration_seconds_sum{{{label}}} {sum_ns / 1e9:.6f}")
+            lines.append(f"gf_span_duration_seconds_count{{{label}}} {count}")
+        return "\n".join(lines) + "\n"
+
+    def flush(self) -> None:
+        if self.path is None:
+            return
+        with self._flush_lock:
+            self._last_flush = time.monotonic()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Escrita atômica: o coletor nunca lê um arquivo pela metade
+            tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            tmp.write_text(self.render_prometheus(), encoding="utf-8")
+            os.replace(tmp, self.path)
+
+    def maybe_flush(self) -> None:
+        if self.path is not None and time.monotonic() - self._last_flush >= self.flush_interval_s:
+            try:
+                self.flush()
+            except OSError:
+                pass  # métricas nunca derrubam uma requisição
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+
+registry = MetricsRegistry()
+
+_otel_tracer: Any = None
+
+
+def configure(
+    *,
+    metrics_path: Optional[str] = None,
+    flush_interval_s: float = 10.0,
+    otel: bool = False,
+) -> None:
+    """
+    metrics_path: arquivo em formato texto do Prometheus, regravado a cada
+    `flush_interval_s` (no fim das requisições) e na saída do processo.
+    otel: encaminha os spans ao OpenTelemetry (exige `opentelemetry-api`;
+    o provedor/exportador é configurado pela aplicação ou pelo auto-instrumentador).
+    """
+    global _otel_tracer
+
+    registry.path = Path(metrics_path) if metrics_path else None
+    registry.flush_interval_s = flush_interval_s
+
+    if otel:
+        try:
+            from opentelemetry import trace as otel_trace
+        except ImportError as exc:
+            raise RuntimeError(
+                "Telemetria OpenTelemetry ativada, mas o pacote não está instalado. "
+                "Instale com: pip install opentelemetry-api opentelemetry-sdk"
+            ) from exc
+        _otel_tracer = otel_trace.get_tracer("gf-agent")
+    else:
+        _otel_tracer = None
+
+
+@atexit.register
+def _flush_at_exit() -> None:
+    try:
+        registry.flush()
+    except OSError:
+        pass
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+import threading
+from typing import Iterator, List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.config import get_settings
+from src.domain.models import ChatMessage
+from src.domain.ports import LLMPort
+from src.infrastructure.pdf_extractor import PdfTextExtractor
+from src.presentation.api import create_app
+
+
+class _BlockingLLM(LLMPort):
+    """Segura cada chamada até `release` — ocupa a vaga do limitador pelo tempo que o teste quiser."""
+
+    def __init__(self) -> None:
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def chat(self, *, model: str, messages: List[ChatMessage]) -> str:
+        self.started.set()
+        self.release.wait(5)
+        return "ok"
+
+    def stream_chat(self, *, model: str, messages: List[ChatMessage]) -> Iterator[str]:
+        yield self.chat(model=model, messages=messages)
+
+
+@pytest.fixture
+def llm(monkeypatch, tmp_path):
+    monkeypatch.setenv("API_MAX_CONCURRENCY", "1")
+    monkeypatch.setenv("API_MAX_QUEUE", "0")
+    monkeypatch.setenv("API_MAX_BODY_KB", "1")
+    monkeypatch.setenv("METRICS_PATH", str(tmp_path / "metrics.prom"))
+    get_settings.cache_clear()
+    yield _BlockingLLM()
+    get_settings.cache_clear()
+
+
+@pytest.fixture
+def client(llm):
+    with TestClient(create_app(llm=llm, extractor=PdfTextExtractor())) as client:
+        yield client
+
+
+def test_saturated_chat_returns_429_with_retry_after(client, llm):
+    first = {}
+    worker = threading.Thread(
+        target=lambda: first.update(response=client.post("/v1/chat", json={"message": "oi"}))
+    )
+    worker.start()
+    try:
+        assert llm.started.wait(5)
+        # Vaga ocupada e fila de tamanho zero: recusa na hora
+        rejected = client.post("/v1/chat", json={"message": "oi de novo"})
+        assert rejected.status_code == 429
+        assert rejected.headers["Retry-After"] == "1"
+        assert client.get("/health").json()["chat"]["rejected"] == 1
+    finally:
+        llm.release.set()
+        worker.join(5)
+
+    assert first["response"].status_code == 200
+    assert first["response"].json()["text"] == "ok"
+
+
+def test_large_body_is_rejected_by_content_length(client, llm):
+    response = client.post("/v1/chat", json={"message": "x" * 2_000})
+
+    assert response.status_code == 413
+    assert "limite" in response.json()["detail"]
+    assert not llm.started.is_set()
+
+
+def test_large_chunked_body_is_rejected_while_reading(client, llm):
+    def _body() -> Iterator[bytes]:
+        # Sem Content-Length (transferência em pedaços): o limite vale para o que chega
+        yield b'{"message": "'
+        for _ in range(20):
+            yield b"x" * 100
+        yield b'"}'
+
+    response = client.post("/v1/chat", content=_body(), headers={"Content-Type": "application/json"})
+
+    assert response.status_code == 413
+    assert not llm.started.is_set()
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import threading
+from typing import Iterator, List, Optional
+
+from src.application.history_manager import HistoryManager
+from src.application.use_cases import AsyncChatAgentUC
+from src.domain.models import ChatMessage, LLMCallInfo
+from src.domain.ports import LLMPort
+from src.infrastructure.async_bridge import SyncToAsyncLLM
+
+
+class _ThreadRecordingLLM(LLMPort):
+    """Guarda a thread de cada chamada e informa o provedor por thread, como os decoradores reais."""
+
+    def __init__(self) -> None:
+        self.threads: List[int] = []
+        self._local = threading.local()
+
+    def chat(self, *, model: str, messages: List[ChatMessage]) -> str:
+        self.threads.append(threading.get_ident())
+        self._local.info = LLMCallInfo(provider="fake", provider_model=model)
+        return "resposta"
+
+    def stream_chat(self, *, model: str, messages: List[ChatMessage]) -> Iterator[str]:
+        self._local.info = LLMCallInfo(provider="fake", provider_model=model)
+        yield "res"
+        yield "posta"
+
+    def last_call_info(self) -> Optional[LLMCallInfo]:
+        return getattr(self._local, "info", None)
+
+
+def _history(turns: int) -> List[ChatMessage]:
+    return [
+        ChatMessage(role="user" if i % 2 == 0 else "assistant", content=f"mensagem {i} " + "x" * 400)
+        for i in range(turns)
+    ]
+
+
+def test_inline_summary_runs_off_the_event_loop():
+    summary_llm = _ThreadRecordingLLM()
+    uc = AsyncChatAgentUC(
+        SyncToAsyncLLM(_ThreadRecordingLLM()),
+        history_manager=HistoryManager(summary_llm, token_budget=1_000, background=False),
+    )
+
+    async def _run():
+        loop_thread = threading.get_ident()
+        response = await uc.run(model="m", history=_history(30), user_text="oi")
+        return loop_thread, response
+
+    loop_thread, response = asyncio.run(_run())
+
+    assert summary_llm.threads and loop_thread not in summary_llm.threads
+    assert response.text == "resposta"
+    assert response.call_info == LLMCallInfo(provider="fake", provider_model="m")
+
+
+def test_stream_reports_call_info():
+    uc = AsyncChatAgentUC(SyncToAsyncLLM(_ThreadRecordingLLM()))
+
+    async def _run():
+        stream = uc.stream(model="m", history=[], user_text="oi")
+        chunks = [chunk async for chunk in stream]
+        return chunks, stream.response
+
+    chunks, response = asyncio.run(_run())
+
+    assert "".join(chunks) == "resposta"
+    assert response.call_info == LLMCallInfo(provider="fake", provider_model="m")
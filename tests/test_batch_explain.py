@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from src.application.document_use_cases import BatchExplainPdfUC
+from src.infrastructure.fake_llm import FakeBatchLLMAdapter
+
+_GOAL = "Resuma os pontos principais."
+
+
+def _long_pages(n: int = 12) -> list:
+    # Acima de 18 mil caracteres: passa pelo map/reduce
+    return [f"\n--- Página {p} ---\n" + f"Cláusula {p}: prazo de entrega e multa contratual. " * 40 for p in range(1, n + 1)]
+
+
+def _uc(**kwargs) -> BatchExplainPdfUC:
+    return BatchExplainPdfUC(FakeBatchLLMAdapter(completion_s=0.05), poll_interval_s=0.01, **kwargs)
+
+
+def test_short_and_long_documents_round_trip():
+    uc = _uc(chunk_tokens=2_000)
+    short = uc.prepare("curto", user_goal=_GOAL, pdf_text="Contrato de locação com prazo de 12 meses.")
+    long = uc.prepare("longo", user_goal=_GOAL, pages=_long_pages())
+    assert not short.chunks and len(long.chunks) > 1
+
+    states = []
+    results = uc.run([short, long], model="m", progress=lambda job: states.append(job.state))
+
+    assert [r.key for r in results] == ["curto", "longo"]
+    assert all(r.error is None and r.response.text for r in results)
+    # Uma requisição para o curto, uma por trecho (map) e a final (reduce) para o longo
+    assert uc.batch_llm.submitted == 1 + len(long.chunks) + 1
+    assert states[0] == "pending" and states[-1] == "completed"
+
+
+def test_resumed_run_reuses_submitted_jobs():
+    uc = _uc(chunk_tokens=2_000)
+    items = [
+        uc.prepare("curto", user_goal=_GOAL, pdf_text="Contrato de locação."),
+        uc.prepare("longo", user_goal=_GOAL, pages=_long_pages()),
+    ]
+    saved = {}
+    first = uc.run(items, model="m", on_jobs=lambda jobs: saved.update({k: list(v) for k, v in jobs.items()}))
+    submitted = uc.batch_llm.submitted
+
+    # Execução retomada com os ids gravados: acompanha os jobs em vez de reenviar
+    again = uc.run(items, model="m", jobs=saved)
+
+    assert set(saved) == {"map", "reduce"}
+    assert uc.batch_llm.submitted == submitted
+    assert [r.response.text for r in again] == [r.response.text for r in first]
+
+
+def test_provider_errors_are_reported_per_document():
+    uc = BatchExplainPdfUC(FakeBatchLLMAdapter(error_rate=1.0), poll_interval_s=0.01)
+    item = uc.prepare("doc", user_goal=_GOAL, pdf_text="Contrato curto.")
+
+    (result,) = uc.run([item], model="m")
+
+    assert result.response is None
+    assert result.error == "falha simulada do provedor"
+
+
+def test_unfinished_job_times_out():
+    uc = BatchExplainPdfUC(FakeBatchLLMAdapter(completion_s=10), poll_interval_s=0.01, timeout_s=0.05)
+    item = uc.prepare("doc", user_goal=_GOAL, pdf_text="Contrato curto.")
+
+    with pytest.raises(TimeoutError, match="sem resultado"):
+        uc.run([item], model="m")
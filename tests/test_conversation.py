@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+import time
+
+import pytest
+
+from src.application.conversation import Conversation
+from src.domain.models import ChatMessage
+from src.infrastructure.conversation_store import SqliteConversationStore
+
+
+def _messages(n: int) -> list:
+    # Respostas longas e repetitivas (como a explicação de um PDF) comprimem bem
+    return [
+        ChatMessage(
+            role="user" if i % 2 == 0 else "assistant",
+            content=f"pergunta {i}" if i % 2 == 0 else f"resposta {i}: " + "cláusula de reajuste anual. " * 80,
+        )
+        for i in range(n)
+    ]
+
+
+def test_old_long_messages_are_compressed():
+    conversation = Conversation(_messages(10), keep_recent=2, compress_min_bytes=256)
+
+    stats = conversation.stats()
+    assert stats["compressed"] == 4  # respostas fora da janela recente
+    assert stats["bytes"] < stats["raw_bytes"]
+    assert list(conversation) == _messages(10)
+    assert conversation[-2:] == _messages(10)[-2:]
+
+
+def test_dumps_loads_round_trip_keeps_compressed_records():
+    original = Conversation(_messages(10), keep_recent=2, compress_min_bytes=256)
+
+    restored = Conversation.loads(original.dumps(), keep_recent=2, compress_min_bytes=256)
+
+    assert list(restored) == list(original)
+    assert restored.stats() == original.stats()
+    assert restored.nbytes == original.nbytes
+
+
+def test_loads_rejects_unknown_or_truncated_payload():
+    payload = Conversation(_messages(4)).dumps()
+
+    with pytest.raises(ValueError, match="desconhecido"):
+        Conversation.loads(b"XXXX" + payload[4:])
+    with pytest.raises(ValueError):
+        Conversation.loads(payload[:-5])
+
+
+def test_byte_limit_evicts_oldest_messages():
+    evicted = []
+    conversation = Conversation(max_bytes=100, compress_min_bytes=10_000, on_evict=evicted.append)
+    for i in range(10):
+        conversation.append(ChatMessage(role="user", content=f"{i:02d}" + "x" * 28))
+
+    assert len(conversation) == 3 and conversation[0].content.startswith("07")
+    assert sum(evicted) == conversation.evicted == 7
+
+
+def test_store_round_trip_and_ttl(tmp_path):
+    path = tmp_path / "conversations.sqlite"
+    store = SqliteConversationStore(path, ttl_s=0.2)
+    payload = Conversation(_messages(6), keep_recent=2, compress_min_bytes=256).dumps()
+
+    store.save("sessao", payload)
+    assert list(Conversation.loads(store.load("sessao"))) == _messages(6)
+    assert store.load("outra") is None
+
+    time.sleep(0.3)
+    assert store.load("sessao") is None  # vencida: ignorada na leitura
+
+    # A limpeza das vencidas roda na primeira gravação de cada processo
+    reopened = SqliteConversationStore(path, ttl_s=0.2)
+    reopened.save("nova", payload)
+    assert len(reopened) == 1
+
+    reopened.delete("nova")
+    assert len(reopened) == 0
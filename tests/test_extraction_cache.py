@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+import io
+import sqlite3
+
+import pytest
+
+from src.infrastructure.extraction_cache import PdfExtractionCache
+from src.infrastructure.pdf_extractor import PageExtract, PdfTextExtractor
+from src.infrastructure.image_preprocessing import PagePreprocessor, PreprocessConfig
+from src.infrastructure.vision_analyzer import ClaudeVisionAnalyzer
+
+pytest.importorskip("pypdf")
+
+from benchmarks.synthetic_pdfs import build_pdf  # noqa: E402
+
+
+def _page(n: int, text: str = "texto", method: str = "text") -> PageExtract:
+    return PageExtract(number=n, method=method, text=text)
+
+
+def _stored_size(path) -> int:
+    with sqlite3.connect(str(path)) as conn:
+        return conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM pages").fetchone()[0]
+
+
+def test_partial_pages_are_served_and_counted(tmp_path):
+    cache = PdfExtractionCache(tmp_path / "c.sqlite3")
+    cache.put_pages("doc", 5, [_page(1), _page(2)])
+
+    found = cache.get_pages("doc", range(1, 6))
+
+    assert sorted(found) == [1, 2]
+    assert cache.get_total_pages("doc") == 5
+    stats = cache.stats()
+    assert (stats.hits, stats.misses) == (2, 3)
+
+
+def test_degraded_pages_are_not_stored(tmp_path):
+    cache = PdfExtractionCache(tmp_path / "c.sqlite3")
+    cache.put_pages("doc", 2, [_page(1), PageExtract(2, "ocr", "pouco", degraded=True)])
+
+    assert sorted(cache.get_pages("doc", [1, 2])) == [1]
+
+
+def test_size_total_follows_replacements_and_reopen(tmp_path):
+    path = tmp_path / "c.sqlite3"
+    cache = PdfExtractionCache(path)
+    cache.put_pages("doc", 2, [_page(1, "a" * 100), _page(2, "b" * 50)])
+    cache.put_pages("doc", 2, [_page(1, "a" * 10)])  # regravada menor
+
+    assert cache.stats().size_bytes == _stored_size(path) == 60
+    assert PdfExtractionCache(path).stats().size_bytes == 60
+
+    cache.clear()
+    assert cache.stats().size_bytes == 0
+
+
+def test_least_recently_used_document_is_evicted(tmp_path):
+    path = tmp_path / "c.sqlite3"
+    cache = PdfExtractionCache(path, max_bytes=250)
+    cache.put_pages("antigo", 1, [_page(1, "a" * 100)])
+    cache.put_pages("usado", 1, [_page(1, "b" * 100)])
+    cache.get_pages("antigo", [1])  # "antigo" passa a ser o mais recente
+
+    cache.put_pages("novo", 1, [_page(1, "c" * 100)])
+
+    assert cache.get_total_pages("usado") is None
+    assert cache.get_total_pages("antigo") == 1
+    assert cache.get_total_pages("novo") == 1
+    assert cache.stats().evictions == 1
+    assert cache.stats().size_bytes == _stored_size(path) == 200
+
+
+def test_extractor_reads_only_missing_pages(tmp_path):
+    cache = PdfExtractionCache(tmp_path / "c.sqlite3")
+    extractor = PdfTextExtractor(cache=cache, vision=ClaudeVisionAnalyzer(client=object()))
+    pdf = build_pdf(["text"] * 4)
+
+    first = extractor.extract(pdf, max_pages=2)
+    second = extractor.extract(pdf, max_pages=4)
+
+    assert [p.number for p in first.page_results] == [1, 2]
+    assert [p.number for p in second.page_results] == [1, 2, 3, 4]
+    assert second.page_results[:2] == first.page_results
+    stats = cache.stats()
+    assert (stats.hits, stats.misses) == (2, 4)
+
+
+def test_cache_key_changes_with_extraction_config(tmp_path):
+    cache = PdfExtractionCache(tmp_path / "c.sqlite3")
+    vision = ClaudeVisionAnalyzer(client=object())
+    default = PdfTextExtractor(cache=cache, vision=vision)
+    smaller = PdfTextExtractor(
+        cache=cache, vision=vision, preprocessor=PagePreprocessor(PreprocessConfig(max_long_edge=800))
+    )
+
+    assert default.cache_version != smaller.cache_version
+    assert default.cache_version == PdfTextExtractor(cache=cache, vision=vision).cache_version
+
+
+def _diagram_png() -> bytes:
+    from PIL import Image, ImageDraw
+
+    img = Image.new("L", (400, 300), 255)
+    ImageDraw.Draw(img).rectangle((40, 40, 360, 260), outline=0, width=6)
+    out = io.BytesIO()
+    img.save(out, format="PNG")
+    return out.getvalue()
+
+
+class _StubOcrExtractor(PdfTextExtractor):
+    """OCR sem Tesseract: toda página rasterizada volta com pouco texto (candidata ao Vision)."""
+
+    ocr_calls = 0
+
+    def _extract_with_ocr(self, file_bytes, pages, progress):
+        type(self).ocr_calls += len(pages)
+        png = _diagram_png()
+        return {n: ("seta", png) for n in pages}
+
+
+class _VisionMessages:
+    def create(self, **kwargs):
+        class _Block:
+            text = "Fluxograma: início → fim"
+
+        class _Message:
+            content = [_Block()]
+
+        return _Message()
+
+
+class _VisionClient:
+    messages = _VisionMessages()
+
+
+def test_pages_without_vision_are_redone_once_vision_is_available(tmp_path, monkeypatch):
+    pytest.importorskip("PIL")
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+    cache = PdfExtractionCache(tmp_path / "c.sqlite3")
+    pdf = build_pdf(["text", "blank"])  # página 2 sem camada de texto
+    _StubOcrExtractor.ocr_calls = 0
+
+    without = _StubOcrExtractor(cache=cache, vision=ClaudeVisionAnalyzer(api_key=None))
+    first = without.extract(pdf)
+    assert first.page_results[1].method == "ocr" and first.page_results[1].degraded
+    assert sorted(cache.get_pages(cache.document_key(pdf, without.cache_version), [1, 2])) == [1]
+
+    with_vision = _StubOcrExtractor(
+        cache=cache, vision=ClaudeVisionAnalyzer(client=_VisionClient(), requests_per_minute=60_000)
+    )
+    second = with_vision.extract(pdf)
+    assert second.page_results[1].method == "vision"
+    assert _StubOcrExtractor.ocr_calls == 2  # a página 2 foi refeita, a 1 veio do cache
+
+    third = with_vision.extract(pdf)
+    assert third.page_results[1].method == "vision"
+    assert _StubOcrExtractor.ocr_calls == 2
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+from src.domain.models import ChatMessage
+from src.infrastructure.gemini_llm import _batch_request, _to_gemini
+
+
+def _messages():
+    return [
+        ChatMessage(role="system", content="prompt estático"),
+        ChatMessage(role="system", content="resumo do histórico"),
+        ChatMessage(role="user", content="pergunta 1"),
+        ChatMessage(role="assistant", content="resposta 1"),
+        ChatMessage(role="user", content="pergunta 2"),
+    ]
+
+
+def test_only_first_system_message_becomes_instruction():
+    system_instruction, contents = _to_gemini(_messages())
+
+    assert system_instruction == "prompt estático"
+    assert contents == [
+        {"role": "user", "parts": ["resumo do histórico", "pergunta 1"]},
+        {"role": "model", "parts": ["resposta 1"]},
+        {"role": "user", "parts": ["pergunta 2"]},
+    ]
+
+
+def test_batch_request_uses_the_same_mapping():
+    request = _batch_request(_messages())
+
+    assert request["system_instruction"] == {"parts": [{"text": "prompt estático"}]}
+    assert request["contents"] == [
+        {"role": "user", "parts": [{"text": "resumo do histórico"}, {"text": "pergunta 1"}]},
+        {"role": "model", "parts": [{"text": "resposta 1"}]},
+        {"role": "user", "parts": [{"text": "pergunta 2"}]},
+    ]
+    assert "system_instruction" not in _batch_request([ChatMessage(role="user", content="oi")])
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+from typing import List
+
+from src.application.history_manager import HistoryManager
+from src.domain.models import ChatMessage
+
+
+class _SummaryLLM:
+    """Devolve um resumo numerado e guarda as mensagens que recebeu."""
+
+    def __init__(self) -> None:
+        self.calls: List[List[ChatMessage]] = []
+
+    def chat(self, *, model: str, messages: List[ChatMessage]) -> str:
+        self.calls.append(messages)
+        return f"resumo {len(self.calls)}"
+
+
+def _history(turns: int, size: int = 400) -> List[ChatMessage]:
+    return [
+        ChatMessage(role="user" if i % 2 == 0 else "assistant", content=f"mensagem {i} " + "x" * size)
+        for i in range(turns)
+    ]
+
+
+def test_short_history_is_sent_whole():
+    llm = _SummaryLLM()
+    manager = HistoryManager(llm, token_budget=10_000, background=False)
+    history = _history(4)
+
+    assert manager.prepare(history, model="m") == history
+    assert llm.calls == []
+
+
+def test_inline_summary_is_used_in_the_same_call():
+    llm = _SummaryLLM()
+    manager = HistoryManager(llm, token_budget=1_000, background=False)
+    history = _history(30)
+
+    prepared = manager.prepare(history, model="m")
+
+    assert len(llm.calls) == 1
+    assert prepared[0].role == "system"
+    assert prepared[0].content.endswith("resumo 1")
+    # Nada fica de fora: o que não está no resumo chega inteiro
+    recent = prepared[1:]
+    assert recent == history[-len(recent):]
+    assert manager._summarized_upto + len(recent) == len(history)
+
+
+def test_background_summary_arrives_on_next_call():
+    llm = _SummaryLLM()
+    manager = HistoryManager(llm, token_budget=1_000)
+    history = _history(30)
+
+    first = manager.prepare(history, model="m")
+    manager.wait()
+    second = manager.prepare(history, model="m")
+
+    assert first[0].role != "system"
+    assert second[0].role == "system"
+    assert manager.summary == "resumo 1"
+
+
+def test_summary_is_incremental():
+    llm = _SummaryLLM()
+    manager = HistoryManager(llm, token_budget=1_000, background=False)
+    history = _history(30)
+    manager.prepare(history, model="m")
+
+    history += _history(6)
+    manager.prepare(history, model="m")
+
+    assert len(llm.calls) == 2
+    # A segunda chamada recebe o resumo anterior, não a conversa inteira de novo
+    prompt = llm.calls[1][-1].content
+    assert "resumo 1" in prompt
+    assert "mensagem 0 " not in prompt
+
+
+def test_reset_when_history_is_cleared():
+    llm = _SummaryLLM()
+    manager = HistoryManager(llm, token_budget=1_000, background=False)
+    manager.prepare(_history(30), model="m")
+    assert manager.summary
+
+    fresh = _history(2)
+    assert manager.prepare(fresh, model="m") == fresh
+    assert manager.summary == ""
+
+
+def test_discard_oldest_keeps_summary_valid():
+    llm = _SummaryLLM()
+    manager = HistoryManager(llm, token_budget=1_000, background=False)
+    history = _history(30)
+    manager.prepare(history, model="m")
+    summarized = manager._summarized_upto
+
+    manager.discard_oldest(4)
+    prepared = manager.prepare(history[4:], model="m")
+
+    assert manager.summary == "resumo 1"
+    assert manager._summarized_upto == summarized - 4
+    assert prepared[0].role == "system"
+    assert len(llm.calls) == 1
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+
+import pytest
+
+from src.application.job_manager import JobManager, JobStatus
+
+
+def _wait(manager: JobManager, job_id: str, timeout_s: float = 5.0) -> JobStatus:
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        job = manager.get(job_id)
+        if job is not None and job.finished:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} não terminou")
+
+
+@pytest.fixture
+def manager() -> JobManager:
+    return JobManager(max_workers=2)
+
+
+def test_same_key_reuses_running_and_finished_job(manager):
+    release = threading.Event()
+    runs = []
+
+    def work(ctx):
+        runs.append(1)
+        release.wait(5)
+        return "ok"
+
+    first = manager.submit(work, key="doc|meta|modelo")
+    assert manager.submit(work, key="doc|meta|modelo") == first  # em andamento
+
+    release.set()
+    assert _wait(manager, first).result == "ok"
+    assert manager.submit(work, key="doc|meta|modelo") == first  # concluído
+    assert len(runs) == 1
+
+
+def test_different_keys_do_not_share_results(manager):
+    # Ex.: mesmo PDF em sessões diferentes — a chave da interface inclui a sessão
+    a = manager.submit(lambda ctx: "sessão A", key="sessao-a|doc")
+    b = manager.submit(lambda ctx: "sessão B", key="sessao-b|doc")
+
+    assert a != b
+    assert _wait(manager, a).result == "sessão A"
+    assert _wait(manager, b).result == "sessão B"
+
+
+def test_failed_job_is_resubmitted(manager):
+    def boom(ctx):
+        raise ValueError("falhou")
+
+    first = manager.submit(boom, key="k")
+    job = _wait(manager, first)
+    assert job.state == "error"
+    assert "ValueError: falhou" in job.error
+
+    second = manager.submit(lambda ctx: "ok", key="k")
+    assert second != first
+    assert _wait(manager, second).result == "ok"
+
+
+def test_progress_and_partial_text(manager):
+    def work(ctx):
+        ctx.progress("ocr", 2, 4)
+        ctx.append_text("Olá, ")
+        ctx.append_text("mundo")
+        return None
+
+    job = _wait(manager, manager.submit(work))
+    assert (job.stage, job.done, job.total) == ("ocr", 2, 4)
+    assert job.partial_text == "Olá, mundo"
+    assert job.fraction == 0.5
+
+
+def test_prune_drops_oldest_finished_jobs():
+    manager = JobManager(max_workers=1, max_finished=2)
+    ids = [manager.submit(lambda ctx, i=i: i, key=f"k{i}") for i in range(3)]
+    for job_id in ids:
+        _wait(manager, job_id)
+
+    manager.submit(lambda ctx: None)  # a poda acontece no submit
+    assert manager.get(ids[0]) is None
+    assert manager.get(ids[2]) is not None
+
+
+def test_partial_text_is_joined_on_read(manager):
+    chunk_read = threading.Event()
+    resume = threading.Event()
+
+    def work(ctx):
+        for i in range(1_000):
+            ctx.append_text(f"{i},")
+        chunk_read.set()
+        resume.wait(5)
+        ctx.append_text("fim")
+        return None
+
+    job_id = manager.submit(work)
+    assert chunk_read.wait(5)
+    first = manager.get(job_id)
+    assert first.partial_text == "".join(f"{i}," for i in range(1_000))
+
+    resume.set()
+    assert _wait(manager, job_id).partial_text == first.partial_text + "fim"
+    assert first.partial_text.endswith("999,")  # snapshot lido antes não muda
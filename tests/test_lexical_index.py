@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+import shutil
+
+from src.infrastructure.lexical_index import InvertedIndex, tokenize
+
+_CONTRACT = [
+    (1, "CONTRATO DE PRESTAÇÃO DE SERVIÇOS entre as partes abaixo."),
+    (2, "Contratada: Acme Ltda, CNPJ 12.345.678/0001-90, com sede em São Paulo."),
+    (3, "CLÁUSULA 8 - Em caso de rescisão antecipada incide multa de 20% sobre o valor."),
+]
+
+
+def _segments(path):
+    return sorted(p.name for p in path.glob("seg-*.terms.json"))
+
+
+def test_tokenize_folds_plurals_and_numbers():
+    assert tokenize("Cláusulas das contratações") == ["clausula", "contratacao"]
+    assert tokenize("CNPJ 12.345.678/0001-90") == ["cnpj", "12345678000190"]
+
+
+def test_search_returns_the_matching_page(tmp_path):
+    index = InvertedIndex(tmp_path)
+    assert index.add_document(doc_id="c1", title="contrato.pdf", pages=_CONTRACT) == 3
+    index.add_document(doc_id="c2", title="aditivo.pdf", pages=[(1, "Aditivo sem penalidades.")])
+
+    hits = index.search("multas por rescisão", k=5)
+    assert [(h.doc_id, h.page) for h in hits] == [("c1", 3)]
+    assert "multa de 20%" in hits[0].snippet
+
+    # Número sem pontuação acha o CNPJ formatado
+    assert [(h.doc_id, h.page) for h in index.search("12345678000190", k=5)] == [("c1", 2)]
+    assert index.search("aditivo", k=5, doc_id="c1") == []
+    assert index.page_text("c2", 1) == "Aditivo sem penalidades."
+
+
+def test_max_per_document_spreads_hits(tmp_path):
+    index = InvertedIndex(tmp_path)
+    index.add_document(doc_id="a", title="a.pdf", pages=[(p, "prazo de entrega") for p in range(1, 4)])
+    index.add_document(doc_id="b", title="b.pdf", pages=[(1, "prazo")])
+
+    hits = index.search("prazo", k=3, max_per_document=1)
+    assert sorted(h.doc_id for h in hits) == ["a", "b"]
+
+
+def test_segments_merge_and_survive_reopen(tmp_path):
+    index = InvertedIndex(tmp_path)
+    for i in range(8):
+        index.add_document(doc_id=f"d{i}", title=f"d{i}.pdf", pages=[(1, f"documento {i} prazo")])
+
+    # Oito segmentos de uma página formam uma camada completa: viram um só
+    assert _segments(tmp_path) == ["seg-0000000000-0000000008.terms.json"]
+    before = index.search("prazo", k=10)
+
+    reopened = InvertedIndex(tmp_path)
+    assert len(reopened) == 8 and reopened.pages == 8
+    assert [(h.doc_id, h.page) for h in reopened.search("prazo", k=10)] == [(h.doc_id, h.page) for h in before]
+
+
+def test_interrupted_merge_leftovers_are_removed(tmp_path):
+    index = InvertedIndex(tmp_path)
+    backup = tmp_path / "backup"
+    backup.mkdir()
+    for i in range(7):
+        index.add_document(doc_id=f"d{i}", title=f"d{i}.pdf", pages=[(1, f"documento {i} prazo")])
+    for seg in tmp_path.glob("seg-*"):
+        shutil.copy(seg, backup / seg.name)
+
+    index.add_document(doc_id="d7", title="d7.pdf", pages=[(1, "documento 7 prazo")])
+    # Queda depois de gravar o segmento fundido e antes de apagar os originais
+    for seg in backup.iterdir():
+        shutil.copy(seg, tmp_path / seg.name)
+
+    reopened = InvertedIndex(tmp_path)
+    assert _segments(tmp_path) == ["seg-0000000000-0000000008.terms.json"]
+    assert len(reopened.search("prazo", k=10)) == 8
+
+
+def test_uncommitted_document_is_discarded(tmp_path):
+    index = InvertedIndex(tmp_path)
+    index.add_document(doc_id="c1", title="contrato.pdf", pages=_CONTRACT)
+    committed = {p.name: p.stat().st_size for p in tmp_path.iterdir()}
+
+    # Queda antes da linha em docs.jsonl (o commit): páginas, texto e segmento ficam órfãos
+    docs = (tmp_path / "docs.jsonl").read_bytes()
+    index.add_document(doc_id="c2", title="outro.pdf", pages=[(1, "penalidade exclusiva")])
+    (tmp_path / "docs.jsonl").write_bytes(docs)
+
+    reopened = InvertedIndex(tmp_path)
+    assert not reopened.has_document("c2")
+    assert reopened.search("penalidade", k=5) == []
+    assert {p.name: p.stat().st_size for p in tmp_path.iterdir()} == committed
+
+    # O índice continua aceitando documentos depois da recuperação
+    reopened.add_document(doc_id="c2", title="outro.pdf", pages=[(1, "penalidade exclusiva")])
+    assert [(h.doc_id, h.page) for h in reopened.search("penalidade", k=5)] == [("c2", 1)]
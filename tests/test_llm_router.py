@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+from typing import Iterator, List, Optional
+
+import pytest
+
+from src.domain.models import ChatMessage
+from src.domain.ports import LLMPort
+from src.infrastructure.llm_router import ProviderRoute, RoutingLLMAdapter
+
+_MESSAGES = [ChatMessage(role="user", content="oi")]
+
+
+class _ProviderError(RuntimeError):
+    def __init__(self, status_code: int) -> None:
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class _Provider(LLMPort):
+    """Responde (ou falha) depois de `delay_s` e guarda quando cada chamada começou."""
+
+    def __init__(self, name: str, *, delay_s: float = 0.0, status_code: Optional[int] = None) -> None:
+        self.name = name
+        self.delay_s = delay_s
+        self.status_code = status_code
+        self.started: List[float] = []
+        self._lock = threading.Lock()
+
+    def chat(self, *, model: str, messages: List[ChatMessage]) -> str:
+        with self._lock:
+            self.started.append(time.monotonic())
+        time.sleep(self.delay_s)
+        if self.status_code is not None:
+            raise _ProviderError(self.status_code)
+        return f"resposta de {self.name}"
+
+    def stream_chat(self, *, model: str, messages: List[ChatMessage]) -> Iterator[str]:
+        yield self.chat(model=model, messages=messages)
+
+
+def _router(*providers: _Provider, **kwargs) -> RoutingLLMAdapter:
+    return RoutingLLMAdapter([ProviderRoute(p.name, p) for p in providers], **kwargs)
+
+
+def test_failover_to_next_provider():
+    a, b = _Provider("a", status_code=503), _Provider("b")
+    router = _router(a, b, hedge=False)
+
+    assert router.chat(model="m", messages=_MESSAGES) == "resposta de b"
+    info = router.last_call_info()
+    assert (info.provider, info.failovers, info.hedged) == ("b", 1, False)
+
+
+def test_all_providers_failing_raises():
+    router = _router(_Provider("a", status_code=503), _Provider("b", status_code=500), hedge=False)
+
+    with pytest.raises(RuntimeError, match="Todos os provedores"):
+        router.chat(model="m", messages=_MESSAGES)
+
+
+def test_slow_provider_is_hedged():
+    a, b = _Provider("a", delay_s=0.5), _Provider("b")
+    router = _router(a, b, hedge_default_s=0.05, hedge_min_s=0.0)
+
+    assert router.chat(model="m", messages=_MESSAGES) == "resposta de b"
+    info = router.last_call_info()
+    assert (info.provider, info.hedged, info.failovers) == ("b", True, 0)
+
+
+def test_stream_is_hedged_on_first_chunk():
+    a, b = _Provider("a", delay_s=0.5), _Provider("b")
+    router = _router(a, b, hedge_default_s=0.05, hedge_min_s=0.0)
+
+    assert "".join(router.stream_chat(model="m", messages=_MESSAGES)) == "resposta de b"
+    assert router.last_call_info().hedged
+
+
+def test_timeout_fails_over():
+    a, b = _Provider("a", delay_s=1.0), _Provider("b")
+    router = _router(a, b, hedge=False, timeout_s=0.1)
+
+    assert router.chat(model="m", messages=_MESSAGES) == "resposta de b"
+    assert router.last_call_info().failovers == 1
+    # Timeout é falha transitória: o provedor entra em espera
+    assert router.chat(model="m", messages=_MESSAGES) == "resposta de b"
+    assert len(a.started) == 1
+
+
+def test_hedge_clock_restarts_after_failover():
+    # a falha perto do prazo de hedge; b (agora a principal) responde antes do próprio prazo
+    a = _Provider("a", delay_s=0.2, status_code=503)
+    b = _Provider("b", delay_s=0.2)
+    c = _Provider("c")
+    router = _router(a, b, c, hedge_default_s=0.3, hedge_min_s=0.0)
+
+    assert router.chat(model="m", messages=_MESSAGES) == "resposta de b"
+    info = router.last_call_info()
+    assert (info.provider, info.hedged, info.failovers) == ("b", False, 1)
+    assert c.started == []
+
+
+def test_transient_error_puts_provider_in_cooldown():
+    a, b = _Provider("a", status_code=429), _Provider("b")
+    router = _router(a, b, hedge=False, error_cooldown_s=60.0)
+
+    router.chat(model="m", messages=_MESSAGES)
+    a.status_code = None
+    assert router.chat(model="m", messages=_MESSAGES) == "resposta de b"
+    assert len(a.started) == 1
+
+
+def test_request_error_does_not_cool_down():
+    # 4xx é erro do pedido, não do provedor: a continua sendo tentado primeiro
+    a, b = _Provider("a", status_code=400), _Provider("b")
+    router = _router(a, b, hedge=False, error_cooldown_s=60.0)
+
+    router.chat(model="m", messages=_MESSAGES)
+    a.status_code = None
+    assert router.chat(model="m", messages=_MESSAGES) == "resposta de a"
+    assert len(a.started) == 2
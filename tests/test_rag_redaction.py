@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+from typing import List
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from src.application.rag_use_cases import AskDocumentsUC, DocumentIndexer  # noqa: E402
+from src.domain.models import ChatMessage  # noqa: E402
+from src.infrastructure.embedders import HashingEmbedder  # noqa: E402
+from src.infrastructure.vector_store import NumpyVectorStore  # noqa: E402
+
+_DOC = (
+    "--- Página 1 ---\n"
+    "Contratante: Ana Silva, CPF 123.456.789-09, telefone (11) 91234-5678, "
+    "e-mail ana@empresa.com.br. O prazo de vigência do contrato é de 12 meses."
+)
+
+
+class _EchoLLM:
+    def __init__(self) -> None:
+        self.messages: List[ChatMessage] = []
+
+    def chat(self, *, model: str, messages: List[ChatMessage]) -> str:
+        self.messages = messages
+        return "ok"
+
+    def last_call_info(self):
+        return None
+
+
+def test_indexed_chunks_and_prompt_carry_no_pii(tmp_path):
+    embedder = HashingEmbedder()
+    index = NumpyVectorStore(tmp_path / "index", dim=embedder.dim)
+    DocumentIndexer(embedder, index).index_document(doc_id="d1", title="contrato.pdf", text=_DOC)
+
+    llm = _EchoLLM()
+    AskDocumentsUC(llm, embedder, index).run(model="m", history=[], question="Qual o prazo de vigência?")
+
+    prompt = llm.messages[-1].content
+    assert "12 meses" in prompt
+    for pii in ("123.456.789-09", "91234-5678", "ana@empresa.com.br"):
+        assert pii not in prompt
+    assert "[CPF_REDACTED]" in prompt
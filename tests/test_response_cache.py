@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+import time
+from typing import Iterator, List
+
+import numpy as np
+
+from src.domain.models import ChatMessage
+from src.domain.ports import EmbedderPort, LLMPort
+from src.infrastructure.response_cache import CachingLLMAdapter
+
+
+class _CountingLLM(LLMPort):
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def chat(self, *, model: str, messages: List[ChatMessage]) -> str:
+        self.calls += 1
+        return f"resposta {self.calls}"
+
+    def stream_chat(self, *, model: str, messages: List[ChatMessage]) -> Iterator[str]:
+        yield self.chat(model=model, messages=messages)
+
+
+class _SameVectorEmbedder(EmbedderPort):
+    """Todo texto vira o mesmo vetor: qualquer pergunta elegível é quase-duplicata."""
+
+    @property
+    def dim(self) -> int:
+        return 2
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return np.tile(np.array([1.0, 0.0], dtype=np.float32), (len(texts), 1))
+
+
+def _ask(text: str) -> List[ChatMessage]:
+    return [ChatMessage(role="system", content="prompt"), ChatMessage(role="user", content=text)]
+
+
+def test_exact_hit_ignores_spacing():
+    llm = _CountingLLM()
+    cache = CachingLLMAdapter(llm)
+
+    first = cache.chat(model="m", messages=_ask("Qual o prazo do contrato?"))
+    second = cache.chat(model="m", messages=_ask("Qual o  prazo do contrato?  "))
+
+    assert first == second == "resposta 1"
+    assert llm.calls == 1
+    assert cache.last_call_info().cache_status == "hit"
+    # Outro modelo é outra chave
+    cache.chat(model="outro", messages=_ask("Qual o prazo do contrato?"))
+    assert llm.calls == 2
+
+
+def test_expired_entry_goes_back_to_the_llm():
+    llm = _CountingLLM()
+    cache = CachingLLMAdapter(llm, ttl_s=0.05)
+
+    cache.chat(model="m", messages=_ask("Qual o prazo?"))
+    time.sleep(0.1)
+    assert cache.chat(model="m", messages=_ask("Qual o prazo?")) == "resposta 2"
+    assert cache.last_call_info().cache_status == "miss"
+
+
+def test_time_sensitive_questions_bypass_the_cache():
+    llm = _CountingLLM()
+    cache = CachingLLMAdapter(llm)
+
+    cache.chat(model="m", messages=_ask("Qual a cotação do dólar hoje?"))
+    cache.chat(model="m", messages=_ask("Qual a cotação do dólar hoje?"))
+
+    assert llm.calls == 2
+    assert cache.last_call_info().cache_status == "bypass"
+    assert cache.stats().bypassed == 2 and cache.stats().entries == 0
+
+
+def test_semantic_match_only_for_short_questions():
+    llm = _CountingLLM()
+    cache = CachingLLMAdapter(llm, embedder=_SameVectorEmbedder(), semantic_max_chars=200)
+
+    cache.chat(model="m", messages=_ask("Qual o prazo do contrato?"))
+    assert cache.chat(model="m", messages=_ask("Em quanto tempo o contrato vence?")) == "resposta 1"
+    assert cache.last_call_info().cache_status == "semantic"
+
+    # Mensagem com documento (blocos separados por linha em branco) só acerta pela chave exata
+    with_document = "Resuma o documento.\n\nCLÁUSULA 1 - objeto do contrato"
+    assert cache.chat(model="m", messages=_ask(with_document)) == "resposta 2"
+    # Pergunta acima do limite também não entra na busca semântica
+    assert cache.chat(model="m", messages=_ask("x" * 300)) == "resposta 3"
+    assert cache.stats().semantic_hits == 1
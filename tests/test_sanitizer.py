@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from src.application.sanitizer import PiiSanitizer
+
+
+@pytest.fixture(scope="module")
+def sanitizer() -> PiiSanitizer:
+    return PiiSanitizer()
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("CPF 123.456.789-09.", "CPF [CPF_REDACTED]."),
+        ("CNPJ 12.345.678/0001-90", "CNPJ [CNPJ_REDACTED]"),
+        ("escreva para ana.silva@empresa.com.br", "escreva para [EMAIL_REDACTED]"),
+        ("a@b.c.d.e.f.g.com", "[EMAIL_REDACTED]"),
+        ("e-mail: a@b.com.", "e-mail: [EMAIL_REDACTED]."),
+        ("CEP 01310-100", "CEP [CEP_REDACTED]"),
+        ("ligue (11) 3333-4444", "ligue [TELEFONE_REDACTED]"),
+        ("ligue (21) 98765-4321", "ligue [TELEFONE_REDACTED]"),
+        ("celular 11 98765-4321", "celular [TELEFONE_REDACTED]"),
+        ("tel. +55 11 3333-4444", "tel. [TELEFONE_REDACTED]"),
+        ("tel 11 3333-4444", "tel [TELEFONE_REDACTED]"),
+        ("fone 11987654321", "fone [TELEFONE_REDACTED]"),
+        ("Telefone: 1133334444", "Telefone: [TELEFONE_REDACTED]"),
+        ("+5511987654321", "[TELEFONE_REDACTED]"),
+        ("portador do RG 12.345.678-9", "portador do [RG_REDACTED]"),
+        ("identidade nº 12345678-X", "[RG_REDACTED]"),
+    ],
+)
+def test_redacts_personal_data(sanitizer, text, expected):
+    assert sanitizer.sanitize(text).text.endswith(expected)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "item 12 2023-2024",
+        "Cláusula 10 1999-2000",
+        "vigência 2023-2024",
+        "valor de R$ 1.234.567-8",
+        "(10) 3333-4444",  # DDD inexistente
+        # Sem palavra-chave, DDD solto + fixo e número colado não são cobertos (colidem com datas e códigos)
+        "11 3333-4444",
+        "11987654321",
+        "hotel 11 3333-4444",
+        "processo 0001234-56.2023.8.26.0100",
+    ],
+)
+def test_keeps_ordinary_contract_text(sanitizer, text):
+    assert sanitizer.sanitize(text).text == text
+
+
+def test_counts_per_pattern(sanitizer):
+    result = sanitizer.sanitize("CPF 123.456.789-09 e 987.654.321-00, e-mail a@b.com")
+    assert result.counts == {"CPF": 2, "EMAIL": 1}
+    assert result.total == 3
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64])
+def test_stream_matches_full_scan(sanitizer, chunk_size):
+    text = (
+        "Contratante: ana@empresa.com.br, CPF 123.456.789-09, fone (11) 91234-5678, "
+        "RG 12.345.678-9, CEP 01310-100. Vigência 2023-2024, item 12 2023-2024. "
+    ) * 5
+    # Domínio maior que a retenção do stream: a ocorrência fica retida até terminar
+    text += "contato: x@" + ".".join(f"sub{i}" for i in range(80)) + ".com.br, tel 11 3333-4444."
+    chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+    assert "".join(sanitizer.sanitize_stream(chunks)) == sanitizer.sanitize(text).text
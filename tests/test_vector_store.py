@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+from src.domain.models import DocumentChunk
+from src.infrastructure.vector_store import NumpyVectorStore
+
+
+def _chunks(doc_id: str, n: int) -> list:
+    return [DocumentChunk(doc_id, f"{doc_id}.pdf", i + 1, i + 1, f"trecho {i} de {doc_id}") for i in range(n)]
+
+
+def _unit(rows: int, dim: int, seed: int) -> np.ndarray:
+    vectors = np.random.default_rng(seed).standard_normal((rows, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_reopened_store_returns_the_same_hits(tmp_path):
+    store = NumpyVectorStore(tmp_path, dim=8)
+    vectors = _unit(6, 8, seed=1)
+    store.add(_chunks("a", 3), vectors[:3])
+    store.add(_chunks("b", 3), vectors[3:])
+    before = store.search(vectors[4], k=2)
+
+    reopened = NumpyVectorStore(tmp_path, dim=8)
+    after = reopened.search(vectors[4], k=2)
+
+    assert len(reopened) == 6
+    assert reopened.has_document("a") and reopened.has_document("b")
+    assert [h.chunk for h in after] == [h.chunk for h in before]
+    assert after[0].chunk.text == "trecho 1 de b"
+    assert after[0].score == pytest.approx(1.0, abs=1e-5)
+
+
+def test_reopen_drops_vectors_without_metadata(tmp_path):
+    store = NumpyVectorStore(tmp_path, dim=4)
+    store.add(_chunks("a", 2), _unit(2, 4, seed=2))
+    # Escrita interrompida: vetor gravado, linha de metadados não
+    with (tmp_path / "vectors.f32").open("ab") as fh:
+        fh.write(_unit(1, 4, seed=3).tobytes())
+
+    reopened = NumpyVectorStore(tmp_path, dim=4)
+
+    assert len(reopened) == 2
+    assert (tmp_path / "vectors.f32").stat().st_size == 2 * 4 * 4
+    assert len(reopened.search(_unit(1, 4, seed=4)[0], k=5)) == 2
+
+
+def test_reopen_with_other_dimension_fails(tmp_path):
+    NumpyVectorStore(tmp_path, dim=4)
+    with pytest.raises(ValueError, match="dimensão 4"):
+        NumpyVectorStore(tmp_path, dim=8)
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+import base64
+import io
+import random
+
+import pytest
+
+pytest.importorskip("PIL")
+from PIL import Image, ImageDraw  # noqa: E402
+
+from src.infrastructure.image_preprocessing import (  # noqa: E402
+    PagePreprocessor,
+    PreprocessConfig,
+    PreprocessStats,
+)
+from src.infrastructure.pdf_extractor import PdfTextExtractor  # noqa: E402
+from src.infrastructure.vision_analyzer import ClaudeVisionAnalyzer  # noqa: E402
+
+_MAGIC = {
+    "image/png": b"\x89PNG",
+    "image/jpeg": b"\xff\xd8\xff",
+    "image/webp": b"RIFF",
+}
+
+
+def _png(img: Image.Image) -> bytes:
+    out = io.BytesIO()
+    img.save(out, format="PNG")
+    return out.getvalue()
+
+
+def _text_page() -> bytes:
+    # Texto preto em fundo branco: PNG costuma vencer o JPEG
+    img = Image.new("L", (800, 1000), 255)
+    draw = ImageDraw.Draw(img)
+    for y in range(60, 940, 24):
+        draw.text((60, y), "Cláusula 1 — objeto do contrato e obrigações das partes", fill=0)
+    return _png(img)
+
+
+def _photo_page() -> bytes:
+    # Ruído colorido: JPEG vence o PNG com folga
+    rnd = random.Random(7)
+    img = Image.new("RGB", (600, 600))
+    img.putdata([(rnd.randrange(256), rnd.randrange(256), rnd.randrange(256)) for _ in range(600 * 600)])
+    return _png(img)
+
+
+class _RecordingMessages:
+    def __init__(self) -> None:
+        self.sources = []
+
+    def create(self, **kwargs):
+        source = kwargs["messages"][0]["content"][0]["source"]
+        self.sources.append((source["media_type"], base64.standard_b64decode(source["data"])))
+
+        class _Block:
+            text = "descrição"
+
+        class _Message:
+            content = [_Block()]
+
+        return _Message()
+
+
+class _RecordingClient:
+    def __init__(self) -> None:
+        self.messages = _RecordingMessages()
+
+
+@pytest.mark.parametrize("page", [_text_page, _photo_page])
+def test_prepare_for_vision_media_type_matches_bytes(page):
+    prepared = PagePreprocessor(PreprocessConfig(vision_format="jpeg")).prepare_for_vision(page())
+    assert prepared is not None
+    payload, media_type = prepared
+    assert payload.startswith(_MAGIC[media_type])
+
+
+def test_pages_with_different_formats_keep_their_media_type():
+    pages = {1: _text_page(), 2: _photo_page()}
+    preprocessor = PagePreprocessor(PreprocessConfig(vision_format="jpeg"))
+    chosen = {n: preprocessor.prepare_for_vision(png)[1] for n, png in pages.items()}
+    # O cenário só testa algo se as páginas escolherem formatos diferentes
+    assert len(set(chosen.values())) == 2
+
+    client = _RecordingClient()
+    extractor = PdfTextExtractor(
+        vision=ClaudeVisionAnalyzer(client=client, max_concurrency=1, requests_per_minute=60_000),
+        preprocessor=preprocessor,
+    )
+    out = extractor._extract_with_vision(
+        list(pages.items()), PreprocessStats(), lambda stage, done, total: None
+    )
+
+    assert set(out) == {1, 2}
+    assert len(client.messages.sources) == 2
+    for media_type, data in client.messages.sources:
+        assert data.startswith(_MAGIC[media_type])
+    assert sorted(t for t, _ in client.messages.sources) == sorted(chosen.values())